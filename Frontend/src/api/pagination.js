@@ -0,0 +1,21 @@
+import axios from 'axios';
+
+// List endpoints return one page as a plain array; the cursor for the next
+// page comes back in this response header (absent on the last page).
+export const NEXT_CURSOR_HEADER = 'x-next-cursor';
+
+/**
+ * GET one page of a list endpoint.
+ * Pass the nextCursor from the previous page to continue, or null for page one.
+ * Returns { items, nextCursor }.
+ */
+export const fetchPage = async (url, config = {}, cursor = null) => {
+  const params = { ...(config.params || {}) };
+  if (cursor) params.cursor = cursor;
+
+  const res = await axios.get(url, { ...config, params });
+  return {
+    items: Array.isArray(res.data) ? res.data : [],
+    nextCursor: res.headers[NEXT_CURSOR_HEADER] || null,
+  };
+};
@@ -15,6 +15,7 @@ import {
     Loader2
 } from 'lucide-react';
 import { useAuthStore } from '../../authStore'; // Adjust path if needed
+import { fetchPage } from '../../api/pagination';
 
 // --- CONFIGURATION ---
 const API_BASE_URL = "http://localhost:8000"; 
@@ -56,6 +57,8 @@ export default function Certificates() {
     const { token } = useAuthStore();
     const [loading, setLoading] = useState(true);
     const [certificates, setCertificates] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null); // null = no more pages
+    const [loadingMore, setLoadingMore] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
     const [typeFilter, setTypeFilter] = useState('all');
     
@@ -74,11 +77,12 @@ export default function Certificates() {
         
         try {
             setLoading(true);
-            const res = await axios.get(
-                `${API_BASE_URL}/api/collector/certificates?search=${searchQuery}&type_filter=${typeFilter}`,
-                { headers: { Authorization: `Bearer ${token}` } }
+            const page = await fetchPage(
+                `${API_BASE_URL}/api/collector/certificates`,
+                certificatesRequest()
             );
-            setCertificates(res.data);
+            setCertificates(page.items);
+            setNextCursor(page.nextCursor);
         } catch (err) {
             console.error("Failed to fetch certificates", err);
             if (err.response?.status === 401) alert("Session expired. Please login again.");
@@ -87,6 +91,31 @@ export default function Certificates() {
         }
     };
 
+    const certificatesRequest = () => ({
+        params: { search: searchQuery, type_filter: typeFilter },
+        headers: { Authorization: `Bearer ${token}` }
+    });
+
+    // Next page of the same list (the backend sends a cursor while more rows exist)
+    const loadMoreCertificates = async () => {
+        if (!nextCursor || loadingMore) return;
+
+        try {
+            setLoadingMore(true);
+            const page = await fetchPage(
+                `${API_BASE_URL}/api/collector/certificates`,
+                certificatesRequest(),
+                nextCursor
+            );
+            setCertificates(prev => [...prev, ...page.items]);
+            setNextCursor(page.nextCursor);
+        } catch (err) {
+            console.error("Failed to fetch more certificates", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         fetchCertificates();
     }, [searchQuery, typeFilter]);
@@ -296,6 +325,17 @@ export default function Certificates() {
                             )}
                         </tbody>
                     </table>
+                    {!loading && nextCursor && (
+                        <div className="px-6 py-4 border-t border-gray-700 text-center">
+                            <button
+                                onClick={loadMoreCertificates}
+                                disabled={loadingMore}
+                                className="inline-flex items-center gap-2 px-4 py-2 bg-gray-700 hover:bg-gray-600 disabled:opacity-50 rounded-lg text-sm text-gray-200 transition-colors"
+                            >
+                                {loadingMore && <Loader2 className="animate-spin w-4 h-4" />} Load more
+                            </button>
+                        </div>
+                    )}
                 </div>
             </div>
 
@@ -1,5 +1,4 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import { 
     Truck, 
@@ -13,6 +12,7 @@ import {
     ArrowRight
 } from 'lucide-react';
 import { useAuthStore } from '../../authStore';
+import { fetchPage } from '../../api/pagination';
 
 // --- CONFIGURATION ---
 const API_BASE_URL = "http://localhost:8000";
@@ -24,6 +24,8 @@ export default function CollectorDashboard() {
   
   // State for Data
   const [scheduledPickups, setScheduledPickups] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // null = no more pages
+  const [loadingMore, setLoadingMore] = useState(false);
   const [stats, setStats] = useState({
     totalCredits: 0,
     activeTrucks: 8, // Mock
@@ -38,21 +40,11 @@ export default function CollectorDashboard() {
         setLoading(true);
         const headers = { Authorization: `Bearer ${token}` };
 
-        // 1. Fetch Pending Pickups (Scheduled)
-        const response = await axios.get(`${API_BASE_URL}/api/collector/pending`, { headers });
-        const data = response.data;
+        // 1. Fetch Pending Pickups (Scheduled), first page
+        const page = await fetchPage(`${API_BASE_URL}/api/collector/pending`, { headers });
 
-        setScheduledPickups(data);
-
-        // 2. Calculate Stats dynamically
-        const pendingCount = data.length;
-        const totalCredits = data.reduce((acc, curr) => acc + (curr.total_credits || 0), 0);
-
-        setStats(prev => ({
-          ...prev,
-          pendingItems: pendingCount,
-          totalCredits: totalCredits
-        }));
+        setScheduledPickups(page.items);
+        setNextCursor(page.nextCursor);
 
       } catch (error) {
         console.error("Dashboard data error:", error);
@@ -64,6 +56,37 @@ export default function CollectorDashboard() {
     if (token) fetchData();
   }, [token]);
 
+  // 2. Calculate Stats dynamically (over the pages loaded so far)
+  useEffect(() => {
+    const totalCredits = scheduledPickups.reduce((acc, curr) => acc + (curr.total_credits || 0), 0);
+
+    setStats(prev => ({
+      ...prev,
+      pendingItems: scheduledPickups.length,
+      totalCredits: totalCredits
+    }));
+  }, [scheduledPickups]);
+
+  // Next page of pending pickups (the backend sends a cursor while more rows exist)
+  const loadMorePickups = async () => {
+    if (!nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(
+        `${API_BASE_URL}/api/collector/pending`,
+        { headers: { Authorization: `Bearer ${token}` } },
+        nextCursor
+      );
+      setScheduledPickups(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more pickups:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-screen bg-gray-900">
@@ -236,6 +259,17 @@ export default function CollectorDashboard() {
                     )}
                 </tbody>
             </table>
+            {nextCursor && (
+                <div className="px-6 py-4 border-t border-gray-700 text-center">
+                    <button
+                        onClick={loadMorePickups}
+                        disabled={loadingMore}
+                        className="inline-flex items-center gap-2 px-4 py-2 bg-gray-700 hover:bg-gray-600 disabled:opacity-50 rounded-lg text-sm text-gray-200 transition-colors"
+                    >
+                        {loadingMore && <Loader2 className="animate-spin w-4 h-4" />} Load more
+                    </button>
+                </div>
+            )}
         </div>
       </div>
 
@@ -14,6 +14,7 @@ import {
   ArrowRight
 } from 'lucide-react';
 import { useAuthStore } from '../../authStore';
+import { fetchPage } from '../../api/pagination';
 
 // --- CONFIGURATION ---
 const API_BASE_URL = "http://localhost:8000"; 
@@ -47,6 +48,8 @@ export default function InventoryPage() {
   const { token } = useAuthStore();
   const [loading, setLoading] = useState(true);
   const [inventory, setInventory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // null = no more pages
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedItem, setSelectedItem] = useState(null);
   const [showDetailsModal, setShowDetailsModal] = useState(false);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -60,34 +63,53 @@ export default function InventoryPage() {
       setLoading(true);
       
       // FIX 1: Correct URL (Removed '/collector')
-      const res = await axios.get(
-        `${API_BASE_URL}/api/inventory/?status=${statusFilter}&search=${searchQuery}`, 
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
-      
-      // FIX 2: Map Backend Schema to Frontend State
-      // Backend sends: name, value, condition, formatted_id
-      // Frontend uses: item_name, credit_value, detected_condition, displayId
-      const mappedData = Array.isArray(res.data) ? res.data.map(item => ({
-        ...item,
-        realId: item.id,
-        displayId: item.formatted_id, // Use the ID from backend (e.g. INV-005)
-        item_name: item.name,         // Map name -> item_name
-        credit_value: item.value,     // Map value -> credit_value
-        detected_condition: item.condition // Map condition -> detected_condition
-      })) : [];
-
-      setInventory(mappedData);
+      const page = await fetchPage(`${API_BASE_URL}/api/inventory/`, inventoryRequest());
+      setInventory(page.items.map(mapInventoryItem));
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error("Failed to fetch inventory", err);
       // Optional: Handle 401 specifically
       if (err.response?.status === 401) console.warn("Token expired");
-      setInventory([]); 
+      setInventory([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const inventoryRequest = () => ({
+    params: { status: statusFilter, search: searchQuery },
+    headers: { Authorization: `Bearer ${token}` }
+  });
+
+  // FIX 2: Map Backend Schema to Frontend State
+  // Backend sends: name, value, condition, formatted_id
+  // Frontend uses: item_name, credit_value, detected_condition, displayId
+  const mapInventoryItem = (item) => ({
+    ...item,
+    realId: item.id,
+    displayId: item.formatted_id, // Use the ID from backend (e.g. INV-005)
+    item_name: item.name,         // Map name -> item_name
+    credit_value: item.value,     // Map value -> credit_value
+    detected_condition: item.condition // Map condition -> detected_condition
+  });
+
+  // Next page of the same list (the backend sends a cursor while more rows exist)
+  const loadMoreInventory = async () => {
+    if (!nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(`${API_BASE_URL}/api/inventory/`, inventoryRequest(), nextCursor);
+      setInventory(prev => [...prev, ...page.items.map(mapInventoryItem)]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more inventory", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchInventory();
   }, [statusFilter, searchQuery]); // Re-fetch when filters change
@@ -283,6 +305,17 @@ export default function InventoryPage() {
                     )}
                 </tbody>
             </table>
+            {!loading && nextCursor && (
+                <div className="px-6 py-4 border-t border-gray-700 text-center">
+                    <button
+                        onClick={loadMoreInventory}
+                        disabled={loadingMore}
+                        className="px-4 py-2 bg-gray-700 hover:bg-gray-600 disabled:opacity-50 rounded-lg text-sm text-gray-200 transition-colors"
+                    >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                </div>
+            )}
         </div>
       </div>
 
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { useAuthStore } from '../../authStore';
+import { fetchPage } from '../../api/pagination';
 import { 
   Wallet, Leaf, TrendingUp, History, Gift, Wind, 
   TreeDeciduous, ArrowUpRight, ArrowDownLeft, Calendar, 
@@ -49,6 +50,8 @@ export default function CarbonWallet() {
   
   // New State for Real History
   const [transactions, setTransactions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // null = no more pages
+  const [loadingMore, setLoadingMore] = useState(false);
   
   const [loading, setLoading] = useState(true);
   const [processingReward, setProcessingReward] = useState(false);
@@ -66,13 +69,14 @@ export default function CarbonWallet() {
       setLoading(true);
       
       // Parallel Request: Get Stats AND History
-      const [walletRes, historyRes] = await Promise.all([
+      const [walletRes, historyPage] = await Promise.all([
         axios.get(`${API_BASE_URL}/api/wallet/me`, getAuthHeaders()),
-        axios.get(`${API_BASE_URL}/api/wallet/history`, getAuthHeaders())
+        fetchPage(`${API_BASE_URL}/api/wallet/history`, getAuthHeaders())
       ]);
 
       setWallet(walletRes.data);
-      setTransactions(historyRes.data); // Save real history
+      setTransactions(historyPage.items); // Save real history (first page)
+      setNextCursor(historyPage.nextCursor);
       
     } catch (error) {
       console.error("Error fetching wallet data:", error);
@@ -88,6 +92,22 @@ export default function CarbonWallet() {
     fetchAllData();
   }, [token]);
 
+  // Older transactions (the backend sends a cursor while more rows exist)
+  const loadMoreTransactions = async () => {
+    if (!nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(`${API_BASE_URL}/api/wallet/history`, getAuthHeaders(), nextCursor);
+      setTransactions(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error fetching more transactions:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // 2. Handle Redeeming Rewards
   const handleRedeem = async (reward) => {
     if (wallet.carbon_balance < reward.cost) {
@@ -283,6 +303,17 @@ export default function CarbonWallet() {
                         );
                     })
                   )}
+                  {!loading && nextCursor && (
+                    <div className="p-4 text-center">
+                      <button
+                        onClick={loadMoreTransactions}
+                        disabled={loadingMore}
+                        className="px-4 py-2 text-sm font-medium text-emerald-700 bg-emerald-50 hover:bg-emerald-100 disabled:opacity-50 rounded-lg transition-colors"
+                      >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                      </button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div className="p-6 grid grid-cols-1 md:grid-cols-2 gap-4">
@@ -1,5 +1,4 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
 import { 
   History, 
   Search, 
@@ -15,6 +14,7 @@ import {
   MapPin
 } from 'lucide-react';
 import { useAuthStore } from '../../authStore';
+import { fetchPage } from '../../api/pagination';
 
 // --- CONFIGURATION ---
 const API_BASE_URL = "http://localhost:8000"; 
@@ -73,6 +73,8 @@ export default function RecycleHistory() {
   const { token } = useAuthStore();
   const [loading, setLoading] = useState(true);
   const [pickups, setPickups] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // null = no more pages
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedPickup, setSelectedPickup] = useState(null);
   const [showDetailsModal, setShowDetailsModal] = useState(false);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -85,12 +87,13 @@ export default function RecycleHistory() {
       
       try {
         setLoading(true);
-        const res = await axios.get(
+        const page = await fetchPage(
           `${API_BASE_URL}/api/pickups/history`, 
           { headers: { Authorization: `Bearer ${token}` } }
         );
-        // Ensure data is array to prevent crashes
-        setPickups(Array.isArray(res.data) ? res.data : []);
+        // fetchPage always hands back an array, so the table can't crash
+        setPickups(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("Failed to fetch history", err);
         setPickups([]); 
@@ -102,6 +105,26 @@ export default function RecycleHistory() {
     fetchHistory();
   }, [token]);
 
+  // Older pickups (the backend sends a cursor while more rows exist)
+  const loadMoreHistory = async () => {
+    if (!nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(
+        `${API_BASE_URL}/api/pickups/history`,
+        { headers: { Authorization: `Bearer ${token}` } },
+        nextCursor
+      );
+      setPickups(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more history", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // 2. FILTER LOGIC (FIXED)
   const filteredPickups = pickups.filter(pickup => {
     const matchesStatus = statusFilter === 'all' || pickup.status === statusFilter;
@@ -293,6 +316,17 @@ export default function RecycleHistory() {
               </tbody>
             </table>
           </div>
+          {!loading && nextCursor && (
+            <div className="p-4 border-t border-gray-100 text-center">
+              <button
+                onClick={loadMoreHistory}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm font-medium text-green-700 bg-green-50 hover:bg-green-100 disabled:opacity-50 rounded-lg transition-colors"
+              >
+                {loadingMore ? 'Loading...' : 'Load older pickups'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
 
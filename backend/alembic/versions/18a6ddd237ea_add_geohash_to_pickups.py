@@ -0,0 +1,75 @@
+"""add geohash to pickups
+
+Revision ID: 18a6ddd237ea
+Revises: 52dfa19c3b8a
+Create Date: 2026-10-17 16:20:43.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '18a6ddd237ea'
+down_revision: Union[str, Sequence[str], None] = '52dfa19c3b8a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GEOHASH_BACKFILL_BATCH = 5000
+
+SET_GEOHASH_FUNCTION = """
+CREATE OR REPLACE FUNCTION pickups_set_geohash() RETURNS trigger AS $$
+BEGIN
+    NEW.geohash := ST_GeoHash(NEW.location::geometry, 12);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Plain nullable column: a catalog-only change, no table rewrite.
+    # (A STORED generated column would rewrite pickups under ACCESS EXCLUSIVE.)
+    op.add_column('pickups', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # 2. New and moved pickups get their geohash from a trigger, whichever
+    # code path writes them. Installed before the backfill so nothing slips through.
+    op.execute(SET_GEOHASH_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER pickups_set_geohash "
+        "BEFORE INSERT OR UPDATE OF location ON pickups "
+        "FOR EACH ROW EXECUTE FUNCTION pickups_set_geohash()"
+    )
+
+    with op.get_context().autocommit_block():
+        # 3. Backfill existing rows in short batches, each its own transaction,
+        # so row locks are held briefly and live traffic keeps flowing
+        bind = op.get_bind()
+        while True:
+            updated = bind.execute(sa.text(
+                "UPDATE pickups SET geohash = ST_GeoHash(location::geometry, 12) "
+                "WHERE id IN (SELECT id FROM pickups WHERE geohash IS NULL AND location IS NOT NULL LIMIT :batch)"
+            ), {"batch": GEOHASH_BACKFILL_BATCH}).rowcount
+            if not updated:
+                break
+
+        # 4. Index after the backfill, without blocking writes
+        op.create_index(
+            'ix_pickups_geohash', 'pickups', ['geohash'],
+            postgresql_ops={'geohash': 'text_pattern_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_pickups_geohash', table_name='pickups', postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS pickups_set_geohash ON pickups")
+    op.execute("DROP FUNCTION IF EXISTS pickups_set_geohash()")
+    op.drop_column('pickups', 'geohash')
@@ -0,0 +1,43 @@
+"""add route plans table
+
+Revision ID: 52dfa19c3b8a
+Revises: d74376368970
+Create Date: 2026-10-17 15:02:11.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '52dfa19c3b8a'
+down_revision: Union[str, Sequence[str], None] = 'd74376368970'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'route_plans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pickup_date', sa.Date(), nullable=False),
+        sa.Column('plan', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('stops_planned', sa.Integer(), nullable=False),
+        sa.Column('stops_unassigned', sa.Integer(), nullable=False),
+        sa.Column('solver_gap', sa.Float(), nullable=True),
+        sa.Column('solve_ms', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('pickup_date')
+    )
+    op.create_index(op.f('ix_route_plans_id'), 'route_plans', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_route_plans_id'), table_name='route_plans')
+    op.drop_table('route_plans')
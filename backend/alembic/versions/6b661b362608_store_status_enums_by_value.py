@@ -0,0 +1,75 @@
+"""store status enums by value
+
+Revision ID: 6b661b362608
+Revises: dcc8d2b6e889
+Create Date: 2026-10-17 11:03:47.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b661b362608'
+down_revision: Union[str, Sequence[str], None] = 'dcc8d2b6e889'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Postgres enum type -> labels (old name -> new value).
+# Until now the types held the Python enum NAMES ('SCHEDULED') while the API
+# speaks the VALUES ('scheduled'), which is why queries cast to text.
+RENAMES = {
+    'pickupstatus': ['scheduled', 'collected', 'processed', 'completed', 'cancelled'],
+    'inventorystatus': ['pending', 'received', 'refurbishing', 'recycled'],
+}
+
+
+def _rename(type_name: str, old: str, new: str) -> None:
+    # RENAME VALUE keeps the label's OID, so existing rows and the partial
+    # index on scheduled pickups keep working without a rewrite.
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_enum e JOIN pg_type t ON t.oid = e.enumtypid
+                WHERE t.typname = '{type_name}' AND e.enumlabel = '{old}'
+            ) THEN
+                ALTER TYPE {type_name} RENAME VALUE '{old}' TO '{new}';
+            END IF;
+        END $$;
+    """)
+
+
+def _rebuild_scheduled_index(label: str) -> None:
+    # The renamed label already matches at runtime, but the predicate text in
+    # dcc8d2b6e889 still says 'SCHEDULED' while the model says 'scheduled':
+    # rebuild it with the current label so autogenerate / alembic check agree.
+    # Build the new one first and swap names, so lookups always have an index.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pickups_scheduled_new', 'pickups', ['pickup_date', 'id'],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text(f"status = '{label}'"),
+            if_not_exists=True,
+        )
+        op.drop_index('ix_pickups_scheduled', table_name='pickups', postgresql_concurrently=True, if_exists=True)
+        op.execute("ALTER INDEX ix_pickups_scheduled_new RENAME TO ix_pickups_scheduled")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for type_name, labels in RENAMES.items():
+        for label in labels:
+            _rename(type_name, label.upper(), label)
+    _rebuild_scheduled_index('scheduled')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for type_name, labels in RENAMES.items():
+        for label in labels:
+            _rename(type_name, label, label.upper())
+    _rebuild_scheduled_index('SCHEDULED')
@@ -0,0 +1,36 @@
+"""ensure gist index on pickup location
+
+Revision ID: d74376368970
+Revises: e8bd8a171630
+Create Date: 2026-10-17 12:36:51.270418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd74376368970'
+down_revision: Union[str, Sequence[str], None] = 'e8bd8a171630'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GeoAlchemy2 creates idx_pickups_location when create_all builds the
+    # table; databases built any other way may not have it. ST_DWithin and
+    # KNN (<->) in optimize-route depend on it.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pickups_location "
+            "ON pickups USING gist (location)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Owned by the model's spatial_index; leave it in place
+    pass
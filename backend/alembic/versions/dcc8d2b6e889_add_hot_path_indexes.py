@@ -0,0 +1,52 @@
+"""add hot path indexes
+
+Revision ID: dcc8d2b6e889
+Revises: 5ea2720eeaa8
+Create Date: 2026-10-17 10:12:04.318822
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dcc8d2b6e889'
+down_revision: Union[str, Sequence[str], None] = '5ea2720eeaa8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial WHERE clause)
+INDEXES = [
+    ('ix_pickups_status', 'pickups', ['status'], None),
+    # (profile_id, id) also serves history's ORDER BY id DESC LIMIT 10
+    ('ix_pickups_profile_id', 'pickups', ['profile_id', 'id'], None),
+    ('ix_pickups_scheduled', 'pickups', ['pickup_date', 'id'], "status = 'SCHEDULED'"),
+    ('ix_transactions_profile_id_created_at', 'transactions', ['profile_id', 'created_at'], None),
+    ('ix_inventory_logs_status_created_at', 'inventory_logs', ['status', 'created_at'], None),
+    ('ix_pickup_items_pickup_id', 'pickup_items', ['pickup_id'], None),
+    ('ix_certificates_pickup_id', 'certificates', ['pickup_id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, and doesn't lock writes
+    # on tables that are already large in production.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
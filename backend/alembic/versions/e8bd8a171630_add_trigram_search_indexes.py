@@ -0,0 +1,49 @@
+"""add trigram search indexes
+
+Revision ID: e8bd8a171630
+Revises: 6b661b362608
+Create Date: 2026-10-17 11:48:20.551937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8bd8a171630'
+down_revision: Union[str, Sequence[str], None] = '6b661b362608'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, column) - GIN trigram indexes serve ILIKE '%term%' and similarity()
+INDEXES = [
+    ('ix_certificates_recipient_name_trgm', 'certificates', 'recipient_name'),
+    ('ix_certificates_unique_code_trgm', 'certificates', 'unique_code'),
+    ('ix_inventory_logs_item_name_trgm', 'inventory_logs', 'item_name'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension is left installed: other objects may depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
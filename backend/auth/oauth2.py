@@ -1,14 +1,17 @@
 #auth/oauth2.py
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi import Depends, FastAPI, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session # <--- Import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.postgresConn import get_db # <--- Import DB Connection
+from database.postgresConn import get_db, get_async_db # <--- Import DB Connections
 from models.all_model import User as UserModel # <--- Import User Model
 from auth import token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Sync routes: shares the route's own get_db session (one pool connection per request)
 def get_current_user(data: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     # print("Raw token received:", data) 
     credentials_exception = HTTPException(
@@ -27,3 +30,21 @@ def get_current_user(data: str = Depends(oauth2_scheme), db: Session = Depends(g
         
     # 3. Return the full Database Object (contains .id, .profile, etc.)
     return user
+
+# Async routes: same lookup on the route's get_async_db session (no blocking on the event loop)
+async def get_current_user_async(data: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    token_data = token.verify_token(data, credentials_exception)
+
+    result = await db.execute(select(UserModel).where(UserModel.email == token_data.username))
+    user = result.scalars().first()
+
+    if user is None:
+        raise credentials_exception
+
+    return user
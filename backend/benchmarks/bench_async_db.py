@@ -0,0 +1,98 @@
+"""
+Benchmark: requests/second per worker for the async routes.
+
+Drives a running server with N concurrent clients and reports throughput and
+latency for /api/pickups/scan and /api/collector/optimize-route. Run it once
+against a checkout before the async session change and once after, both
+with a single uvicorn worker:
+
+    cd backend
+    uvicorn main:app --workers 1 --port 8000          # in another shell
+    python benchmarks/bench_async_db.py \\
+        --dropper-token $DROPPER_JWT --collector-token $COLLECTOR_JWT \\
+        --image sample.jpg --concurrency 32 --duration 30
+
+Tips for a fair comparison:
+- Scan results are cached by image hash, so a repeated image measures the DB
+  + cache path (what this change affects), not Hugging Face.
+- Set OSRM to an unreachable URL or use a radius with no stops if you only
+  want the database cost of optimize-route.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+import httpx
+
+
+async def worker(client: httpx.AsyncClient, make_request, stop_at: float, latencies: list, errors: list):
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            response = await make_request(client)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(name: str, make_request, concurrency: int, duration: float, base_url: str):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        # Warm-up so connection setup isn't part of the numbers
+        await make_request(client)
+
+        stop_at = time.perf_counter() + duration
+        await asyncio.gather(*(
+            worker(client, make_request, stop_at, latencies, errors) for _ in range(concurrency)
+        ))
+
+    ordered = sorted(latencies) or [0.0]
+    print(
+        f"{name:<16} {len(latencies) / duration:>8.1f} req/s   "
+        f"p50 {statistics.median(ordered):>7.1f} ms   "
+        f"p95 {ordered[int(0.95 * (len(ordered) - 1))]:>7.1f} ms   "
+        f"errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--dropper-token", required=True)
+    parser.add_argument("--collector-token", required=True)
+    parser.add_argument("--image", required=True, help="JPEG used for /scan")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--lat", type=float, default=19.0760)
+    parser.add_argument("--lng", type=float, default=72.8777)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image = f.read()
+
+    def scan(client):
+        return client.post(
+            "/api/pickups/scan",
+            headers={"Authorization": f"Bearer {args.dropper_token}"},
+            files={"file": ("bench.jpg", image, "image/jpeg")},
+        )
+
+    def optimize_route(client):
+        return client.get(
+            "/api/collector/optimize-route",
+            headers={"Authorization": f"Bearer {args.collector_token}"},
+            params={"latitude": args.lat, "longitude": args.lng},
+        )
+
+    print(f"concurrency={args.concurrency} duration={args.duration:.0f}s base={args.base_url}")
+    asyncio.run(run("scan", scan, args.concurrency, args.duration, args.base_url))
+    asyncio.run(run("optimize-route", optimize_route, args.concurrency, args.duration, args.base_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: image normalisation before inference and storage.
+
+Generates phone-sized photos (12 MP, camera-like noise + EXIF rotation) and
+compares the bytes we would send to Hugging Face / Supabase before and after
+ml_engine.preprocess.prepare_image.
+
+    cd backend
+    python benchmarks/bench_preprocess.py
+
+If HF_API_TOKEN is set, pass --live to also time the real detector call on
+the original vs. the normalised bytes.
+"""
+import os
+import io
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from ml_engine.preprocess import prepare_image
+
+SIZES = {
+    "8MP (3264x2448)": (3264, 2448),
+    "12MP (4032x3024)": (4032, 3024),
+}
+
+
+def make_phone_photo(width: int, height: int, seed: int = 0) -> bytes:
+    """Smooth gradients + sensor noise, saved as a high-quality JPEG with EXIF orientation."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / 180.0),
+        128 + 100 * np.cos(y / 140.0),
+        128 + 60 * np.sin((x + y) / 250.0),
+    ], axis=-1)
+    noisy = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+
+    img = Image.fromarray(noisy, "RGB")
+    exif = Image.Exif()
+    exif[0x0112] = 6 # Orientation: rotate 90 CW (portrait phone shot)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def bench_sizes(repeats: int):
+    print(f"{'input':<18} {'original':>10} {'inference':>10} {'archive':>10} {'reduction':>10} {'prep ms':>9}")
+    for label, (w, h) in SIZES.items():
+        original = make_phone_photo(w, h)
+        timings = []
+        prepared = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            prepared = prepare_image(original)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        sent_before = 2 * len(original) # Same bytes went to HF and Supabase
+        sent_after = len(prepared.inference_bytes) + len(prepared.archive_bytes)
+        print(
+            f"{label:<18} {len(original) / 1e6:>8.2f}MB {len(prepared.inference_bytes) / 1e6:>8.2f}MB "
+            f"{len(prepared.archive_bytes) / 1e6:>8.2f}MB {sent_before / sent_after:>9.1f}x "
+            f"{statistics.median(timings):>9.0f}"
+        )
+        print(f"{'':<18} inference size {prepared.width}x{prepared.height}")
+    return original, prepared
+
+
+async def bench_live(original: bytes, prepared, repeats: int):
+    from ml_engine.detector import detector
+
+    await detector.startup()
+    try:
+        for label, payload in (("original", original), ("normalised", prepared.inference_bytes)):
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                await detector.predict(payload)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"HF inference {label:<11} p50 {statistics.median(timings):.0f} ms over {repeats} calls")
+    finally:
+        await detector.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Also time real Hugging Face calls")
+    args = parser.parse_args()
+
+    original, prepared = bench_sizes(args.repeats)
+    if args.live:
+        asyncio.run(bench_live(original, prepared, args.repeats))
@@ -0,0 +1,70 @@
+"""
+Benchmark: in-process route solver (routing/solver.py) for 10, 100 and 1,000 stops.
+
+Random stops in a ~20 km city box, driver in the middle. For each size it
+reports the matrix build time, nearest-neighbour tour length, the length
+after 2-opt + Or-opt, the improvement and the solve time (capped by the
+time budget).
+
+    cd backend
+    python benchmarks/bench_route_solver.py
+    python benchmarks/bench_route_solver.py --budget-ms 2000 --runs 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing.solver import estimated_road_matrix, solve_route, ROUTE_SOLVER_TIME_BUDGET_MS
+
+CENTER = (19.0760, 72.8777)  # Mumbai
+BOX_DEG = 0.18               # ~20 km
+
+
+def run_once(stops: int, budget_ms: float, rng: np.random.Generator):
+    points = np.vstack([
+        CENTER,
+        np.column_stack([
+            CENTER[0] + (rng.random(stops) - 0.5) * BOX_DEG,
+            CENTER[1] + (rng.random(stops) - 0.5) * BOX_DEG,
+        ]),
+    ])
+
+    started = time.perf_counter()
+    matrix = estimated_road_matrix(points)
+    matrix_ms = (time.perf_counter() - started) * 1000
+
+    solution = solve_route(matrix, roundtrip=True, time_budget_ms=budget_ms)
+    return matrix_ms, solution
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--budget-ms", type=float, default=ROUTE_SOLVER_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"budget={args.budget_ms:.0f} ms  runs={args.runs}")
+    print(f"{'stops':>6} {'matrix ms':>10} {'NN km':>9} {'solved km':>10} {'gain':>7} {'solve ms':>9} {'converged':>10}")
+
+    for stops in args.sizes:
+        results = [run_once(stops, args.budget_ms, rng) for _ in range(args.runs)]
+        matrix_ms = statistics.median(r[0] for r in results)
+        initial = statistics.median(r[1].initial_distance for r in results) / 1000
+        solved = statistics.median(r[1].distance for r in results) / 1000
+        solve_ms = statistics.median(r[1].elapsed_ms for r in results)
+        converged = sum(r[1].converged for r in results)
+        print(
+            f"{stops:>6} {matrix_ms:>10.1f} {initial:>9.1f} {solved:>10.1f} "
+            f"{(1 - solved / initial) * 100:>6.1f}% {solve_ms:>9.1f} {converged:>6}/{args.runs}"
+        )
+
+
+if __name__ == "__main__":
+    main()
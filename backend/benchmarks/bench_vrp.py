@@ -0,0 +1,76 @@
+"""
+Benchmark: multi-driver day planner (routing/vrp.py).
+
+Random stops in a ~20 km city box, each booked into a Morning / Afternoon /
+Evening slot with 1-4 items, drivers starting around the centre. For each
+(stops, drivers) case it reports the construction and final total drive
+time, the improvement, how many stops could not be fitted and the solve time.
+
+    cd backend
+    python benchmarks/bench_vrp.py
+    python benchmarks/bench_vrp.py --cases 200x5 1000x20 --budget-ms 5000
+"""
+import os
+import sys
+import argparse
+import statistics
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing.vrp import solve_vrp, Vehicle, Stop, timeslot_window, clock_to_seconds, VRP_SHIFT_START, VRP_SHIFT_END, VRP_TIME_BUDGET_MS
+
+CENTER = (19.0760, 72.8777)  # Mumbai
+BOX_DEG = 0.18               # ~20 km
+TIMESLOTS = ["Morning", "Afternoon", "Evening"]
+
+
+def run_once(stops: int, drivers: int, budget_ms: float, rng: np.random.Generator):
+    shift = (clock_to_seconds(VRP_SHIFT_START), clock_to_seconds(VRP_SHIFT_END))
+    demand = rng.integers(1, 5, stops)
+    # Enough vans for the load with ~20% slack
+    capacity = int(demand.sum() * 1.2 / drivers) + 1
+
+    vehicles = [
+        Vehicle(CENTER[0] + rng.normal() * 0.01, CENTER[1] + rng.normal() * 0.01, capacity)
+        for _ in range(drivers)
+    ]
+    points = [
+        Stop(i,
+             CENTER[0] + (rng.random() - 0.5) * BOX_DEG,
+             CENTER[1] + (rng.random() - 0.5) * BOX_DEG,
+             int(demand[i]),
+             timeslot_window(TIMESLOTS[rng.integers(len(TIMESLOTS))], shift))
+        for i in range(stops)
+    ]
+    return solve_vrp(vehicles, points, time_budget_ms=budget_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", nargs="+", default=["50x3", "200x8", "500x15"],
+                        help="STOPSxDRIVERS")
+    parser.add_argument("--budget-ms", type=float, default=VRP_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"budget={args.budget_ms:.0f} ms  runs={args.runs}")
+    print(f"{'case':>9} {'initial h':>10} {'solved h':>9} {'gain':>7} {'unassigned':>11} {'solve ms':>9} {'converged':>10}")
+
+    for case in args.cases:
+        stops, drivers = (int(x) for x in case.lower().split("x"))
+        results = [run_once(stops, drivers, args.budget_ms, rng) for _ in range(args.runs)]
+        initial = statistics.median(r.initial_travel_seconds for r in results) / 3600
+        solved = statistics.median(r.travel_seconds for r in results) / 3600
+        unassigned = statistics.median(len(r.unassigned) for r in results)
+        solve_ms = statistics.median(r.elapsed_ms for r in results)
+        converged = sum(r.converged for r in results)
+        print(
+            f"{case:>9} {initial:>10.1f} {solved:>9.1f} {(1 - solved / initial) * 100:>6.1f}% "
+            f"{unassigned:>11.0f} {solve_ms:>9.1f} {converged:>6}/{args.runs}"
+        )
+
+
+if __name__ == "__main__":
+    main()
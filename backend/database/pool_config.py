@@ -0,0 +1,196 @@
+#database/pool_config.py
+import os
+import time
+import uuid
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from dotenv import load_dotenv
+
+from utils.metrics import LatencyWindow
+
+load_dotenv()
+
+# ==========================================
+# 1. PROFILES
+# ==========================================
+# "direct":    app talks to Postgres (or Supabase session pooler, port 5432)
+# "pgbouncer": app talks to PgBouncer / Supabase transaction pooler (port 6543).
+#              Transaction mode hands each transaction to any server
+#              connection, so server-side prepared statements must be off.
+PROFILES = {
+    "direct": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,   # Supabase drops idle connections; recycle before that
+        "pool_pre_ping": True,  # Detect stale connections after idle periods
+        "prepared_statements": True,
+    },
+    "pgbouncer": {
+        "pool_size": 3,         # PgBouncer does the real pooling
+        "max_overflow": 2,
+        "pool_timeout": 10,
+        "pool_recycle": 600,
+        "pool_pre_ping": True,
+        "prepared_statements": False,
+    },
+}
+
+DB_POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "direct").lower()
+
+
+def _env_int(name: str, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def pool_settings() -> dict:
+    """
+    Profile defaults overridden by env vars. Sizes are PER WORKER PROCESS:
+    if DB_TOTAL_CONNECTIONS is set, it is split across WEB_CONCURRENCY
+    workers (half for the sync engine, half for the async engine).
+    """
+    if DB_POOL_PROFILE not in PROFILES:
+        print(f"⚠️ Unknown DB_POOL_PROFILE '{DB_POOL_PROFILE}'. Using 'direct'")
+    settings = dict(PROFILES.get(DB_POOL_PROFILE, PROFILES["direct"]))
+
+    total = _env_int("DB_TOTAL_CONNECTIONS", None)
+    if total:
+        workers = max(1, _env_int("WEB_CONCURRENCY", 1))
+        per_engine = max(1, total // workers // 2)
+        settings["pool_size"] = max(1, per_engine * 2 // 3)
+        settings["max_overflow"] = max(0, per_engine - settings["pool_size"])
+
+    settings["pool_size"] = _env_int("DB_POOL_SIZE", settings["pool_size"])
+    settings["max_overflow"] = _env_int("DB_MAX_OVERFLOW", settings["max_overflow"])
+    settings["pool_timeout"] = _env_int("DB_POOL_TIMEOUT", settings["pool_timeout"])
+    settings["pool_recycle"] = _env_int("DB_POOL_RECYCLE", settings["pool_recycle"])
+    if os.getenv("DB_POOL_PRE_PING"):
+        settings["pool_pre_ping"] = os.getenv("DB_POOL_PRE_PING").lower() == "true"
+    settings["connect_timeout"] = _env_int("DB_CONNECT_TIMEOUT", 10)
+    return settings
+
+
+# ==========================================
+# 2. INSTRUMENTED POOLS
+# ==========================================
+
+class PoolMetrics:
+    """Checkout wait time and saturation for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waited = 0          # checkouts that had to wait > 1 ms
+        self.peak_checked_out = 0
+        self.wait_ms = LatencyWindow(500)
+
+    def record(self, pool, started: float, timed_out: bool = False):
+        # engine.dispose() swaps in a fresh pool, so track whichever is live
+        self.pool = pool
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if timed_out:
+            self.timeouts += 1
+            return
+        self.checkouts += 1
+        self.wait_ms.add(elapsed_ms)
+        if elapsed_ms > 1:
+            self.waited += 1
+        self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+
+    def stats(self) -> dict:
+        if self.pool is None:
+            return {"engine": self.name, "checkouts": 0}
+
+        capacity = self.pool.size() + max(0, self.pool._max_overflow)
+        checked_out = self.pool.checkedout()
+        return {
+            "engine": self.name,
+            "pool_size": self.pool.size(),
+            "max_overflow": self.pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": self.pool.checkedin(),
+            "overflow": self.pool.overflow(),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "checkouts_waited": self.waited,
+            "checkout_timeouts": self.timeouts,
+            **self.wait_ms.summary("checkout_wait"),
+        }
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+
+class _TimedCheckout:
+    """Mixin: time how long a caller waits for a connection from the pool."""
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(self, started, timed_out=True)
+            raise
+        self.metrics.record(self, started)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics = sync_pool_metrics
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+# ==========================================
+# 3. ENGINE KWARGS
+# ==========================================
+
+def _pool_kwargs(settings: dict) -> dict:
+    return {
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+    }
+
+
+def sync_engine_kwargs() -> dict:
+    settings = pool_settings()
+    # psycopg2 never uses server-side prepared statements, so it is PgBouncer-safe as is
+    return {
+        "poolclass": TimedQueuePool,
+        **_pool_kwargs(settings),
+        "connect_args": {"connect_timeout": settings["connect_timeout"]},
+    }
+
+
+def async_engine_kwargs(connect_args: dict) -> dict:
+    settings = pool_settings()
+    connect_args = {**connect_args, "timeout": settings["connect_timeout"]}
+    if not settings["prepared_statements"]:
+        # asyncpg caches prepared statements per connection; PgBouncer in
+        # transaction mode would hand them to the wrong server connection
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return {
+        "poolclass": TimedAsyncQueuePool,
+        **_pool_kwargs(settings),
+        "connect_args": connect_args,
+    }
+
+
+def pool_metrics() -> dict:
+    return {
+        "profile": DB_POOL_PROFILE,
+        "pools": [sync_pool_metrics.stats(), async_pool_metrics.stats()],
+    }
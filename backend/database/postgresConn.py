@@ -2,21 +2,53 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file
 import os
 
+from database.pool_config import sync_engine_kwargs, async_engine_kwargs
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=False)
+# Pool size / overflow / recycle / pre-ping come from database/pool_config.py
+engine = create_engine(DATABASE_URL, echo=False, **sync_engine_kwargs())
+
+
+def to_async_url(url: str):
+    """
+    Same database, asyncpg driver. asyncpg doesn't understand libpq's
+    ?sslmode=..., so it is translated into connect_args instead.
+    """
+    parsed = make_url(url).set(drivername="postgresql+asyncpg")
+    connect_args = {}
+    sslmode = parsed.query.get("sslmode")
+    if sslmode:
+        parsed = parsed.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    return parsed, connect_args
+
+
+# Async engine for async routes: Postgres round-trips no longer block the event loop
+ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = to_async_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **async_engine_kwargs(ASYNC_CONNECT_ARGS))
 
 Base = declarative_base()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: loaded objects stay readable after commit (no implicit async IO)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,16 +1,44 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
 from starlette.middleware.sessions import SessionMiddleware
 
-from database.postgresConn import engine, Base
+from database.postgresConn import engine, async_engine, Base
 from models import all_model
-from router import user_routes, auth_routes, pickup_routes, collector_routes, profile_routes, wallet_routes, inventory_routes
+from router import user_routes, auth_routes, pickup_routes, collector_routes, profile_routes, wallet_routes, inventory_routes, metrics_routes
+from ml_engine.detector import detector
+from routing.osrm import osrm
+from routing.scheduler import route_precomputer
+from utils.job_store import scan_jobs
+from utils.upload_limits import UploadLimitMiddleware
+from utils.pagination import NEXT_CURSOR_HEADER
 all_model.Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: open the shared, pooled HTTP client for the AI detector
+    await detector.startup()
+    # Startup: workers for async scan jobs
+    await scan_jobs.startup()
+    # Startup: pooled client for OSRM (trip + table services)
+    await osrm.startup()
+    # Startup: nightly pre-computation of next-day routes
+    await route_precomputer.startup()
+    yield
+    # Shutdown: stop background work, then close pooled connections cleanly
+    await route_precomputer.shutdown()
+    await scan_jobs.shutdown()
+    await detector.shutdown()
+    await osrm.shutdown()
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title="E-Drop Backend API",
-    description="Backend API for E-Drop Waste Collection System"
+    description="Backend API for E-Drop Waste Collection System",
+    lifespan=lifespan
 )
 
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET") or "change-me")
@@ -20,6 +48,9 @@ origins = [
     "http://127.0.0.1:5173",
 ]
 
+# Cap image upload sizes while the body streams in
+app.add_middleware(UploadLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Lets the browser read the next page cursor
 )
 
 @app.get("/")
@@ -41,3 +73,4 @@ app.include_router(collector_routes.router)
 app.include_router(profile_routes.router)
 app.include_router(wallet_routes.router)
 app.include_router(inventory_routes.router)
+app.include_router(metrics_routes.router)
@@ -0,0 +1,277 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import httpx
+from PIL import UnidentifiedImageError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- HTTP backend: connection pool tuning (override in .env) ---
+HF_API_URL = os.getenv("HF_API_URL", "https://router.huggingface.co/hf-inference/models/facebook/detr-resnet-50")
+HF_MAX_CONNECTIONS = int(os.getenv("HF_MAX_CONNECTIONS", "20"))
+HF_MAX_KEEPALIVE = int(os.getenv("HF_MAX_KEEPALIVE", "10"))
+HF_KEEPALIVE_EXPIRY = float(os.getenv("HF_KEEPALIVE_EXPIRY", "30"))
+HF_HTTP2 = os.getenv("HF_HTTP2", "true").lower() == "true"
+HF_BATCH_CONCURRENCY = int(os.getenv("HF_BATCH_CONCURRENCY", "8")) # Parallel calls per micro-batch
+
+# --- Local backend (ONNX export of the same DETR model, see ml_engine/export_onnx.py) ---
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "ml_engine/models/detr-resnet-50.onnx")
+LOCAL_INFERENCE_WORKERS = int(os.getenv("LOCAL_INFERENCE_WORKERS", "1"))
+LOCAL_INTRA_OP_THREADS = int(os.getenv("LOCAL_INTRA_OP_THREADS", "4"))
+
+
+class InferenceError(Exception):
+    """Raised by a backend when the model could not produce detections."""
+
+
+class InferenceRejected(InferenceError):
+    """
+    The call failed because of the request, not the backend (4xx from the
+    API, an unreadable image, a full local queue): says nothing about
+    backend health, so the circuit breaker ignores it.
+    """
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class InferenceBackend:
+    """
+    Interface every detector backend implements.
+    predict() returns raw detections: [{"label", "score", "box"}, ...]
+    """
+    name = "base"
+
+    async def startup(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def predict(self, image_bytes, content_type: str = "image/jpeg") -> list:
+        raise NotImplementedError
+
+    async def predict_batch(self, items: list) -> list:
+        """
+        items: [(image_bytes, content_type), ...]
+        Returns one entry per item: a detections list or the Exception it raised.
+        """
+        return await asyncio.gather(
+            *(self.predict(image_bytes, content_type=content_type) for image_bytes, content_type in items),
+            return_exceptions=True
+        )
+
+    def stats(self) -> dict:
+        return {}
+
+
+class HttpInferenceBackend(InferenceBackend):
+    """Hugging Face hosted inference, through one long-lived pooled client."""
+    name = "http"
+
+    def __init__(self, api_url: str = HF_API_URL, api_token: Optional[str] = None):
+        self.api_url = api_url
+        self.api_token = api_token
+        self.client: Optional[httpx.AsyncClient] = None
+        # Bounds parallel calls across all in-flight micro-batches
+        self.batch_slots = asyncio.Semaphore(HF_BATCH_CONCURRENCY)
+
+    async def startup(self):
+        """
+        Opens the long-lived client. Keep-alive connections are reused across
+        scans, so only the first request pays the TCP+TLS handshake.
+        """
+        if self.client is None:
+            self.client = self._build_client()
+
+    async def shutdown(self):
+        """Closes the pooled client and drops all idle connections."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        use_http2 = HF_HTTP2 and _http2_available()
+        if HF_HTTP2 and not use_http2:
+            print("⚠️ HTTP/2 requested but 'h2' is not installed. Falling back to HTTP/1.1")
+
+        return httpx.AsyncClient(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=HF_MAX_CONNECTIONS,
+                max_keepalive_connections=HF_MAX_KEEPALIVE,
+                keepalive_expiry=HF_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(20.0, connect=5.0), # Give the API enough time to think
+            headers={"Authorization": f"Bearer {self.api_token}"},
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Fallback for scripts that use the detector without the app lifespan
+        if self.client is None:
+            print("⚠️ Detector used before startup(). Creating pooled client lazily.")
+            self.client = self._build_client()
+        return self.client
+
+    async def predict(self, image_bytes, content_type: str = "image/jpeg") -> list:
+        response = await self._get_client().post(
+            self.api_url,
+            headers={"Content-Type": content_type}, # Must match the bytes (see ml_engine/preprocess.py)
+            content=image_bytes, # Send the bytes directly
+        )
+
+        # 408 / 429 mean the API is overloaded, any other 4xx is our request's fault
+        if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+            raise InferenceRejected(f"API Error {response.status_code}: {response.text}")
+        if response.status_code != 200:
+            raise InferenceError(f"API Error {response.status_code}: {response.text}")
+
+        return response.json()
+
+    async def predict_batch(self, items: list) -> list:
+        # The hosted API has no batch endpoint: fan out, but never past HF_BATCH_CONCURRENCY
+        async def bounded(image_bytes, content_type):
+            async with self.batch_slots:
+                return await self.predict(image_bytes, content_type=content_type)
+
+        return await asyncio.gather(
+            *(bounded(image_bytes, content_type) for image_bytes, content_type in items),
+            return_exceptions=True
+        )
+
+    def stats(self) -> dict:
+        """
+        httpx does not expose pool state publicly, so we read it from the
+        underlying httpcore pool and degrade gracefully if that changes.
+        """
+        in_use = 0
+        idle = 0
+        http2 = False
+        if self.client is not None:
+            http2 = bool(getattr(self.client, "_http2", False))
+            try:
+                pool = self.client._transport._pool
+                for conn in pool.connections:
+                    if conn.is_closed():
+                        continue
+                    if conn.is_idle():
+                        idle += 1
+                    else:
+                        in_use += 1
+            except AttributeError:
+                pass
+
+        return {
+            "client_open": self.client is not None,
+            "http2": http2,
+            "max_connections": HF_MAX_CONNECTIONS,
+            "max_keepalive_connections": HF_MAX_KEEPALIVE,
+            "connections_in_use": in_use,
+            "connections_idle": idle,
+        }
+
+
+class LocalOnnxBackend(InferenceBackend):
+    """
+    In-process CPU inference on an ONNX export of facebook/detr-resnet-50.
+    The model runs in a dedicated process pool so a forward pass never blocks
+    the event loop (or holds the GIL of the web worker).
+    """
+    name = "local"
+
+    def __init__(self, model_path: str = LOCAL_MODEL_PATH, workers: int = LOCAL_INFERENCE_WORKERS,
+                 intra_op_threads: int = LOCAL_INTRA_OP_THREADS, min_score: float = 0.25):
+        self.model_path = model_path
+        self.workers = workers
+        self.intra_op_threads = intra_op_threads
+        self.min_score = min_score
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    async def startup(self):
+        if self.pool is not None:
+            return
+        if not os.path.exists(self.model_path):
+            print(f"❌ CRITICAL ERROR: ONNX model not found at {self.model_path} (run ml_engine/export_onnx.py)")
+
+        # 'spawn' so workers don't inherit the event loop, DB pool or open sockets
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path, self.intra_op_threads),
+        )
+
+    async def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def predict(self, image_bytes, content_type: str = "image/jpeg") -> list:
+        if self.pool is None:
+            await self.startup()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.pool, _infer, bytes(image_bytes), self.min_score)
+        except UnidentifiedImageError as e:
+            raise InferenceRejected(f"Unreadable image: {e}") from e
+        except Exception as e:
+            raise InferenceError(f"Local inference failed: {e}") from e
+
+    async def predict_batch(self, items: list) -> list:
+        # One padded forward pass for the whole micro-batch
+        if self.pool is None:
+            await self.startup()
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.pool, _infer_batch, [bytes(image_bytes) for image_bytes, _ in items], self.min_score
+            )
+        except Exception as e:
+            return [InferenceError(f"Local inference failed: {e}")] * len(items)
+
+        # Undecodable images come back in their own slot; the rest of the batch still ran
+        return [
+            InferenceRejected(f"Unreadable image: {result}") if isinstance(result, UnidentifiedImageError) else result
+            for result in results
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "model_path": self.model_path,
+            "pool_open": self.pool is not None,
+            "workers": self.workers,
+            "intra_op_threads": self.intra_op_threads,
+        }
+
+
+# Thin module-level wrappers so the pool pickles a plain function reference
+def _init_worker(model_path: str, intra_op_threads: int):
+    from ml_engine import onnx_worker
+    onnx_worker.init_worker(model_path, intra_op_threads)
+
+
+def _infer(image_bytes: bytes, min_score: float):
+    from ml_engine import onnx_worker
+    return onnx_worker.infer(image_bytes, min_score)
+
+
+def _infer_batch(images: list, min_score: float):
+    from ml_engine import onnx_worker
+    return onnx_worker.infer_batch(images, min_score)
+
+
+BACKENDS = {
+    "http": HttpInferenceBackend,
+    "local": LocalOnnxBackend,
+}
@@ -1,62 +1,208 @@
 import os
-import httpx
-import json
+import time
+import asyncio
+from typing import Optional
 from dotenv import load_dotenv
 
+from ml_engine.backends import BACKENDS, InferenceBackend, InferenceError, InferenceRejected
+from ml_engine.scheduler import InferenceScheduler
+from ml_engine.resilience import CircuitBreaker, CircuitOpenError
+from utils.metrics import LatencyWindow
+
 # Load .env variables
 load_dotenv()
 
+# Which backend runs the model: "http" (Hugging Face router) or "local" (ONNX on CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "http").lower()
+
+# Group concurrent scans into micro-batches (see ml_engine/scheduler.py)
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "false").lower() == "true"
+
+# Hedging: if a call is slower than the recent HEDGE_PERCENTILE latency, fire a
+# second identical call and take whichever answers first
+HEDGE_ENABLED = os.getenv("DETECTOR_HEDGE", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("DETECTOR_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("DETECTOR_HEDGE_MIN_SAMPLES", "20"))
+
+
 class EWasteDetector:
-    def __init__(self):
-        # Using the specific Router URL you provided
-        self.api_url = "https://router.huggingface.co/hf-inference/models/facebook/detr-resnet-50"
-        
+    def __init__(self, backend: InferenceBackend = None, batching: bool = INFERENCE_BATCHING,
+                 hedging: bool = HEDGE_ENABLED):
         # Make sure your .env has HF_API_TOKEN (or change this to HF_TOKEN if you prefer)
         self.api_token = os.getenv("HF_API_TOKEN")
 
-        if not self.api_token:
-            print("❌ CRITICAL ERROR: HF_API_TOKEN is missing in .env")
+        if backend is None:
+            backend_cls = BACKENDS.get(INFERENCE_BACKEND)
+            if backend_cls is None:
+                print(f"⚠️ Unknown INFERENCE_BACKEND '{INFERENCE_BACKEND}'. Using 'http'")
+                backend_cls = BACKENDS["http"]
+
+            if backend_cls is BACKENDS["http"]:
+                if not self.api_token:
+                    print("❌ CRITICAL ERROR: HF_API_TOKEN is missing in .env")
+                backend = backend_cls(api_token=self.api_token)
+            else:
+                backend = backend_cls()
 
-    async def predict(self, image_bytes):
+        self.backend = backend
+        self.scheduler = InferenceScheduler(backend) if batching else None
+        self.breaker = CircuitBreaker()
+        self.hedging = hedging
+
+        # Simple counters for the metrics endpoint
+        self.requests_in_flight = 0
+        self.total_requests = 0
+        self.latency = LatencyWindow()
+        self.success_latency = LatencyWindow() # Per attempt, drives the hedge delay
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.abandoned = 0
+        self.deadline_exceeded = 0
+
+    # --- LIFECYCLE (called from the FastAPI lifespan in main.py) ---
+    async def startup(self):
+        await self.backend.startup()
+        if self.scheduler:
+            await self.scheduler.startup()
+
+    async def shutdown(self):
+        if self.scheduler:
+            await self.scheduler.shutdown()
+        await self.backend.shutdown()
+
+    # --- METRICS ---
+    def pool_stats(self) -> dict:
         """
-        Receives raw image bytes and sends them to Hugging Face API.
+        Reports backend resource usage (HTTP connection pool or local process
+        pool) plus recent call latency.
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "image/jpeg", # Explicitly set as per your snippet
+        hedge_delay = self._hedge_delay()
+        return {
+            "backend": self.backend.name,
+            **self.backend.stats(),
+            "batching": self.scheduler is not None,
+            "requests_in_flight": self.requests_in_flight,
+            "total_requests": self.total_requests,
+            "latency_p50_ms": self.latency.percentile(0.50),
+            "latency_p95_ms": self.latency.percentile(0.95),
+            **self.breaker.stats(),
+            "hedging": self.hedging,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay else None,
+            "hedged_calls": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "abandoned_calls": self.abandoned,
+            "deadline_exceeded": self.deadline_exceeded,
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.api_url,
-                    headers=headers,
-                    content=image_bytes, # Send the bytes directly
-                    timeout=20.0 # Give the API enough time to think
-                )
-
-                if response.status_code != 200:
-                    return {"error": f"API Error {response.status_code}: {response.text}"}
-
-                results = response.json()
-                
-                # Format the results to be cleaner for your frontend
-                formatted_data = []
-                for item in results:
-                    # Filter low confidence items
-                    if item.get('score', 0) < 0.25:
-                        continue
-                        
-                    formatted_data.append({
-                        "class": item.get('label'),
-                        "confidence": round(item.get('score', 0), 2),
-                        "box": item.get('box')
-                    })
-
-                return formatted_data
-
-            except Exception as e:
-                return {"error": f"Prediction Failed: {str(e)}"}
+    @staticmethod
+    def format_results(results) -> list:
+        # Format the results to be cleaner for your frontend
+        formatted_data = []
+        for item in results:
+            # Filter low confidence items
+            if item.get('score', 0) < 0.25:
+                continue
+
+            formatted_data.append({
+                "class": item.get('label'),
+                "confidence": round(item.get('score', 0), 2),
+                "box": item.get('box')
+            })
+
+        return formatted_data
+
+    # --- RESILIENCE ---
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if we shouldn't hedge."""
+        if not self.hedging or self.breaker.state != "closed":
+            return None
+        if len(self.success_latency.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return self.success_latency.percentile(HEDGE_PERCENTILE) / 1000
+
+    async def _attempt(self, image_bytes, content_type: str):
+        """One backend call, guarded by the circuit breaker."""
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            if self.scheduler:
+                results = await self.scheduler.submit(image_bytes, content_type=content_type)
+            else:
+                results = await self.backend.predict(image_bytes, content_type=content_type)
+        except (asyncio.CancelledError, InferenceRejected):
+            # Cancelled (deadline / lost hedge) or a bad request: no verdict on the backend
+            self.breaker.record_abandoned()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        self.success_latency.add((time.perf_counter() - started) * 1000)
+        return results
+
+    async def _hedged_call(self, image_bytes, content_type: str):
+        tasks = [asyncio.create_task(self._attempt(image_bytes, content_type))]
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is None:
+                return await tasks[0]
+
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            # Primary is slower than usual: race a second call against it
+            # (unless the breaker tripped while we were waiting)
+            if not done and self.breaker.state == "closed":
+                tasks.append(asyncio.create_task(self._attempt(image_bytes, content_type)))
+                self.hedged += 1
+
+            errors = []
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            # Losers and deadline victims are cancelled, not left running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    self.abandoned += 1
+
+    async def predict(self, image_bytes, content_type: str = "image/jpeg", deadline: Optional[float] = None):
+        """
+        Receives image bytes and runs them through the configured backend.
+        deadline: time.monotonic() value propagated from the route; the call
+        is abandoned (504) once it passes.
+        """
+        self.requests_in_flight += 1
+        self.total_requests += 1
+        started = time.perf_counter()
+        try:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                raise asyncio.TimeoutError
+
+            results = await asyncio.wait_for(self._hedged_call(image_bytes, content_type), timeout)
+            return self.format_results(results)
+
+        except asyncio.TimeoutError:
+            # Not a breaker failure: the cancelled attempt already reported itself as abandoned
+            self.deadline_exceeded += 1
+            return {"error": "Detector did not answer within the request deadline", "status_code": 504}
+        except CircuitOpenError as e:
+            return {"error": str(e), "status_code": 503}
+        except InferenceError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": f"Prediction Failed: {str(e)}"}
+        finally:
+            self.requests_in_flight -= 1
+            self.latency.add((time.perf_counter() - started) * 1000)
 
 # Create the instance to be imported by scan_routes.py
-detector = EWasteDetector()
\ No newline at end of file
+detector = EWasteDetector()
@@ -0,0 +1,50 @@
+"""
+One-off export of facebook/detr-resnet-50 to ONNX for the local backend.
+
+    cd backend
+    pip install torch transformers timm onnx
+    python ml_engine/export_onnx.py --out ml_engine/models/detr-resnet-50.onnx
+
+Then set INFERENCE_BACKEND=local (and pip install onnxruntime) on the server.
+The export tools are only needed on the machine that builds the model file.
+"""
+import os
+import argparse
+
+
+def export(out_path: str, opset: int):
+    import torch
+    from transformers import DetrForObjectDetection
+
+    model = DetrForObjectDetection.from_pretrained("facebook/detr-resnet-50", revision="no_timm")
+    model.eval()
+
+    # Portrait phone photo after ml_engine.preprocess (shortest edge 800).
+    # pixel_mask lets the local backend pad mixed-size images into one batch.
+    dummy = torch.randn(2, 3, 1067, 800)
+    dummy_mask = torch.ones(2, 1067, 800, dtype=torch.int64)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    torch.onnx.export(
+        model,
+        (dummy, dummy_mask),
+        out_path,
+        input_names=["pixel_values", "pixel_mask"],
+        output_names=["logits", "pred_boxes"],
+        dynamic_axes={
+            "pixel_values": {0: "batch", 2: "height", 3: "width"},
+            "pixel_mask": {0: "batch", 1: "height", 2: "width"},
+            "logits": {0: "batch"},
+            "pred_boxes": {0: "batch"},
+        },
+        opset_version=opset,
+    )
+    print(f"✅ Exported to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="ml_engine/models/detr-resnet-50.onnx")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export(args.out, args.opset)
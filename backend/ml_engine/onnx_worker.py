@@ -0,0 +1,141 @@
+"""
+Runs inside the local inference process pool (see LocalOnnxBackend).
+Everything here must be importable in a fresh 'spawn' process and keep
+its state in module globals, one ONNX session per worker process.
+"""
+import io
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from ml_engine.preprocess import detr_size
+
+# DETR was trained on COCO. Index -> label, same names the HF API returns.
+COCO_LABELS = {
+    1: "person", 2: "bicycle", 3: "car", 4: "motorcycle", 5: "airplane", 6: "bus",
+    7: "train", 8: "truck", 9: "boat", 10: "traffic light", 11: "fire hydrant",
+    13: "stop sign", 14: "parking meter", 15: "bench", 16: "bird", 17: "cat",
+    18: "dog", 19: "horse", 20: "sheep", 21: "cow", 22: "elephant", 23: "bear",
+    24: "zebra", 25: "giraffe", 27: "backpack", 28: "umbrella", 31: "handbag",
+    32: "tie", 33: "suitcase", 34: "frisbee", 35: "skis", 36: "snowboard",
+    37: "sports ball", 38: "kite", 39: "baseball bat", 40: "baseball glove",
+    41: "skateboard", 42: "surfboard", 43: "tennis racket", 44: "bottle",
+    46: "wine glass", 47: "cup", 48: "fork", 49: "knife", 50: "spoon", 51: "bowl",
+    52: "banana", 53: "apple", 54: "sandwich", 55: "orange", 56: "broccoli",
+    57: "carrot", 58: "hot dog", 59: "pizza", 60: "donut", 61: "cake", 62: "chair",
+    63: "couch", 64: "potted plant", 65: "bed", 67: "dining table", 70: "toilet",
+    72: "tv", 73: "laptop", 74: "mouse", 75: "remote", 76: "keyboard",
+    77: "cell phone", 78: "microwave", 79: "oven", 80: "toaster", 81: "sink",
+    82: "refrigerator", 84: "book", 85: "clock", 86: "vase", 87: "scissors",
+    88: "teddy bear", 89: "hair drier", 90: "toothbrush",
+}
+
+# ImageNet normalisation used by the DETR image processor
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+_session = None
+_input_name = None
+_has_mask = False
+
+
+def init_worker(model_path: str, intra_op_threads: int):
+    """Process pool initializer: load the model once per worker."""
+    global _session, _input_name, _has_mask
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    _session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+    inputs = [i.name for i in _session.get_inputs()]
+    _input_name = inputs[0]
+    _has_mask = "pixel_mask" in inputs
+
+
+def _to_tensor(image_bytes: bytes):
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    target = detr_size(*img.size)
+    if target != img.size:
+        img = img.resize(target, Image.BILINEAR)
+
+    pixels = (np.asarray(img, dtype=np.float32) / 255.0 - MEAN) / STD
+    return pixels.transpose(2, 0, 1), img.size # CHW, (width, height)
+
+
+def _postprocess(logits, boxes, width: int, height: int, min_score: float):
+    """DETR head -> HF-style [{"label", "score", "box": {xmin, ymin, xmax, ymax}}]."""
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probs = exp / exp.sum(axis=-1, keepdims=True)
+    probs = probs[:, :-1] # Last class is "no object"
+
+    labels = probs.argmax(axis=-1)
+    scores = probs.max(axis=-1)
+
+    results = []
+    for label, score, (cx, cy, w, h) in zip(labels, scores, boxes):
+        if score < min_score:
+            continue
+        results.append({
+            "label": COCO_LABELS.get(int(label), f"LABEL_{int(label)}"),
+            "score": float(score),
+            "box": {
+                "xmin": int(round((cx - w / 2) * width)),
+                "ymin": int(round((cy - h / 2) * height)),
+                "xmax": int(round((cx + w / 2) * width)),
+                "ymax": int(round((cy + h / 2) * height)),
+            },
+        })
+    return results
+
+
+def infer(image_bytes: bytes, min_score: float):
+    """One forward pass on the CPU. Returns raw detections in HF API format."""
+    result = infer_batch([image_bytes], min_score)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def infer_batch(images: list, min_score: float):
+    """
+    Batched forward pass. Images are zero-padded to the largest one in the
+    batch and the pixel mask tells DETR which pixels are real. Boxes come back
+    normalised to each image's own (unpadded) size.
+
+    Each image is decoded on its own: one that PIL can't read gets its
+    UnidentifiedImageError back in its slot, the rest of the batch still runs.
+    """
+    results = [None] * len(images)
+    tensors = {}
+    for i, image_bytes in enumerate(images):
+        try:
+            tensors[i] = _to_tensor(image_bytes)
+        except UnidentifiedImageError as e:
+            results[i] = e
+    if not tensors:
+        return results
+
+    # Older exports without a pixel_mask input can only run one image at a time
+    if not _has_mask and len(tensors) > 1:
+        for i in tensors:
+            results[i] = infer_batch([images[i]], min_score)[0]
+        return results
+
+    batch = list(tensors.items())
+    max_h = max(t.shape[1] for _, (t, _) in batch)
+    max_w = max(t.shape[2] for _, (t, _) in batch)
+    pixels = np.zeros((len(batch), 3, max_h, max_w), dtype=np.float32)
+    mask = np.zeros((len(batch), max_h, max_w), dtype=np.int64)
+    for row, (_, (t, _)) in enumerate(batch):
+        pixels[row, :, :t.shape[1], :t.shape[2]] = t
+        mask[row, :t.shape[1], :t.shape[2]] = 1
+
+    feeds = {_input_name: pixels}
+    if _has_mask:
+        feeds["pixel_mask"] = mask
+
+    logits, boxes = _session.run(None, feeds)[:2]
+    for row, (i, (_, (width, height))) in enumerate(batch):
+        results[i] = _postprocess(logits[row], boxes[row], width, height, min_score)
+    return results
@@ -0,0 +1,97 @@
+import os
+import io
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+from utils.upload_limits import BufferReader
+from utils.phash import perceptual_hash
+
+load_dotenv()
+
+# Optional HEIC/HEIF support (iPhone photos). pip install pillow-heif
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+# DETR (facebook/detr-resnet-50) resizes every input to shortest edge 800,
+# longest edge 1333. Anything bigger is just wasted upload + decode time.
+DETR_SHORTEST_EDGE = 800
+DETR_LONGEST_EDGE = 1333
+INFERENCE_QUALITY = int(os.getenv("IMAGE_INFERENCE_QUALITY", "85"))
+
+# Archival copy kept in Supabase as pickup proof
+ARCHIVE_MAX_EDGE = int(os.getenv("IMAGE_ARCHIVE_MAX_EDGE", "2048"))
+ARCHIVE_QUALITY = int(os.getenv("IMAGE_ARCHIVE_QUALITY", "80"))
+ARCHIVE_FORMAT = os.getenv("IMAGE_ARCHIVE_FORMAT", "JPEG").upper() # JPEG or WEBP
+
+CONTENT_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp"}
+
+
+@dataclass
+class PreparedImage:
+    """Two encodings of one upload: a small one for the model, a larger one for storage."""
+    inference_bytes: bytes
+    inference_content_type: str
+    archive_bytes: bytes
+    archive_content_type: str
+    archive_extension: str
+    width: int
+    height: int
+    phash: int # 64-bit perceptual hash for near-duplicate detection
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "WEBP":
+        img.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def detr_size(width: int, height: int):
+    """Target size the DETR processor would use, never upscaling."""
+    short, long = min(width, height), max(width, height)
+    scale = min(DETR_SHORTEST_EDGE / short, DETR_LONGEST_EDGE / long, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def prepare_image(image_bytes) -> PreparedImage:
+    """
+    Decodes the upload, applies EXIF orientation, strips metadata and returns
+    a model-sized JPEG plus a configurable archival copy.
+    CPU bound: call it through asyncio.to_thread from async routes.
+    """
+    img = Image.open(BufferReader(image_bytes)) # No extra copy of the upload
+
+    # JPEG only: let libjpeg decode at 1/2, 1/4 or 1/8 scale straight away
+    img.draft("RGB", (ARCHIVE_MAX_EDGE, ARCHIVE_MAX_EDGE))
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # 1. Archival copy (bounded, re-encoded, no EXIF)
+    archive = img.copy()
+    archive.thumbnail((ARCHIVE_MAX_EDGE, ARCHIVE_MAX_EDGE), Image.LANCZOS)
+    archive_bytes = _encode(archive, ARCHIVE_FORMAT, ARCHIVE_QUALITY)
+
+    # 2. Inference copy at the resolution DETR actually uses
+    target = detr_size(*archive.size)
+    inference = archive if target == archive.size else archive.resize(target, Image.BILINEAR)
+    inference_bytes = _encode(inference, "JPEG", INFERENCE_QUALITY)
+
+    return PreparedImage(
+        inference_bytes=inference_bytes,
+        inference_content_type="image/jpeg",
+        archive_bytes=archive_bytes,
+        archive_content_type=CONTENT_TYPES.get(ARCHIVE_FORMAT, "image/jpeg"),
+        archive_extension=EXTENSIONS.get(ARCHIVE_FORMAT, "jpg"),
+        width=inference.size[0],
+        height=inference.size[1],
+        phash=perceptual_hash(inference),
+    )
@@ -0,0 +1,92 @@
+import os
+import time
+from dotenv import load_dotenv
+
+from ml_engine.backends import InferenceError
+
+load_dotenv()
+
+# --- Circuit breaker (override in .env) ---
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))         # fail fast for this long
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))    # trial calls when reopening
+
+
+class CircuitOpenError(InferenceError):
+    """The detector is failing: reject immediately instead of waiting on it."""
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls go through, consecutive failures are counted
+    open      -> calls fail fast until BREAKER_OPEN_SECONDS have passed
+    half_open -> a few probe calls go through; one success closes the
+                 breaker, one failure opens it again
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, half_open_probes: int = BREAKER_HALF_OPEN_PROBES):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+
+        # Metrics
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call must not go out."""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.short_circuited += 1
+                raise CircuitOpenError("Detector temporarily unavailable, please retry shortly")
+            self.state = "half_open"
+            self.probes_in_flight = 0
+
+        if self.state == "half_open":
+            if self.probes_in_flight >= self.half_open_probes:
+                self.short_circuited += 1
+                raise CircuitOpenError("Detector is recovering, please retry shortly")
+            self.probes_in_flight += 1
+
+    def record_success(self):
+        if self.state == "half_open":
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_abandoned(self):
+        """
+        A call ended without telling us anything about backend health
+        (cancelled: lost a hedge race / hit the deadline; or InferenceRejected).
+        """
+        if self.state == "half_open":
+            self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def record_failure(self):
+        if self.state == "half_open":
+            self._open()
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+        print(f"⚠️ Detector circuit breaker OPEN for {self.open_seconds:.0f}s")
+
+    def stats(self) -> dict:
+        return {
+            "breaker_state": self.state,
+            "breaker_consecutive_failures": self.consecutive_failures,
+            "breaker_times_opened": self.times_opened,
+            "breaker_short_circuited": self.short_circuited,
+        }
@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+from typing import Optional
+from dotenv import load_dotenv
+
+from ml_engine.backends import InferenceBackend, InferenceError, InferenceRejected
+from utils.metrics import LatencyWindow
+
+load_dotenv()
+
+# --- Batching window (override in .env) ---
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "20"))
+BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", "256"))
+
+
+class InferenceScheduler:
+    """
+    Micro-batching in front of an InferenceBackend.
+
+    Scans that arrive within BATCH_MAX_WAIT_MS of the first queued one (up to
+    BATCH_MAX_SIZE) are handed to backend.predict_batch() together: one
+    batched forward pass on the local backend, bounded parallel calls on the
+    HTTP backend. Every caller gets its own result (or exception) back.
+    """
+
+    def __init__(self, backend: InferenceBackend, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, max_queue: int = BATCH_MAX_QUEUE):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight = set() # Keep references so running batches aren't garbage collected
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.batch_sizes = {}                    # size -> count
+        self.window_wait = LatencyWindow()       # how long the first item waited for company
+        self.batch_latency = LatencyWindow()     # backend time per batch
+
+    # --- LIFECYCLE ---
+    async def startup(self):
+        if self._worker is None:
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # Fail whatever is still waiting instead of leaving callers hanging
+        while self.queue is not None and not self.queue.empty():
+            _, _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(InferenceError("Inference scheduler stopped"))
+
+    # --- PUBLIC API ---
+    async def submit(self, image_bytes, content_type: str = "image/jpeg") -> list:
+        if self._worker is None:
+            await self.startup()
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((image_bytes, content_type, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise InferenceRejected("Inference queue is full, please retry shortly")
+
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue": self.max_queue,
+            "batches_in_flight": len(self._inflight),
+            "batches": self.batches,
+            "items": self.items,
+            "rejected": self.rejected,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_counts": dict(sorted(self.batch_sizes.items())),
+            **self.window_wait.summary("window_wait"),
+            **self.batch_latency.summary("batch_latency"),
+        }
+
+    # --- WORKER ---
+    async def _collect(self) -> list:
+        """Blocks for the first item, then gathers more until full or the window closes."""
+        batch = [await self.queue.get()]
+        deadline = batch[0][3] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            # Drop callers that already gave up (client disconnected, deadline hit)
+            batch = [entry for entry in batch if not entry[2].done()]
+            if not batch:
+                continue
+
+            self.window_wait.add((time.perf_counter() - batch[0][3]) * 1000)
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+
+            # Run the batch in the background so the next window can open right away
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        started = time.perf_counter()
+        try:
+            results = await self.backend.predict_batch([(entry[0], entry[1]) for entry in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        self.batch_latency.add((time.perf_counter() - started) * 1000)
+
+        # A backend that answers with the wrong shape must not leave callers waiting
+        if not isinstance(results, list) or len(results) != len(batch):
+            results = [InferenceError("Backend returned no result for this scan")] * len(batch)
+
+        for (_, _, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -2,16 +2,24 @@
 import enum
 from sqlalchemy import (
     Column, Integer, String, Float, Date, Enum,
-    ForeignKey, DateTime, Text, Boolean
+    ForeignKey, DateTime, Text, Boolean, Index, FetchedValue, text, DDL, event
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from typing import Optional
+from sqlalchemy.dialects.postgresql import JSONB
 from geoalchemy2 import Geography # Required for PostGIS
 
 # Import the single, shared Base object
 from database.postgresConn import Base
 
+# Trigram (gin_trgm_ops) search indexes need the extension before create_all builds them
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def trigram_index(name: str, column: str) -> Index:
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
 # ==========================================
 # 1. ENUMS
 # ==========================================
@@ -47,6 +55,10 @@ class TransactionType(str, enum.Enum):
     REDEEM = "redeem"   # Buying rewards
     ADJUSTMENT = "adjustment"
 
+def stored_by_value(enum_cls):
+    """Postgres enum labels = the Python values ('scheduled'), same as the API."""
+    return Enum(enum_cls, values_callable=lambda members: [m.value for m in members])
+
 # ==========================================
 # 2. MODELS
 # ==========================================
@@ -92,11 +104,19 @@ class Pickup(Base):
     The Logistics Ticket. Managed by Drivers.
     """
     __tablename__ = "pickups"
+    __table_args__ = (
+        Index("ix_pickups_status", "status"),
+        Index("ix_pickups_profile_id", "profile_id", "id"),
+        # Partial index: collector routes only ever look at scheduled pickups
+        Index("ix_pickups_scheduled", "pickup_date", "id", postgresql_where=text("status = 'scheduled'")),
+        # Prefix (LIKE 'te7u%') lookups when drilling into a map cluster
+        Index("ix_pickups_geohash", "geohash", postgresql_ops={"geohash": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
     
-    status = Column(Enum(PickupStatus), default=PickupStatus.SCHEDULED)
+    status = Column(stored_by_value(PickupStatus), default=PickupStatus.SCHEDULED)
     
     # Scheduling Details
     pickup_date = Column(Date, nullable=True) 
@@ -104,6 +124,8 @@ class Pickup(Base):
     
     # Location (PostGIS)
     location = Column(Geography(geometry_type='POINT', srid=4326), nullable=False)
+    # Filled by the pickups_set_geohash trigger on every insert/update of location; its prefixes are the map clusters
+    geohash = Column(String(12), FetchedValue(), FetchedValue(for_update=True), nullable=True)
     address_text = Column(String, nullable=True)
     
     # Image Proof (Added recently)
@@ -120,11 +142,27 @@ class Pickup(Base):
     # The actual inventory records created after collection (Warehouse)
     inventory_logs = relationship("InventoryLog", back_populates="pickup")
 
+
+# Same trigger as migration 18a6ddd237ea, for databases built by create_all
+event.listen(Pickup.__table__, "after_create", DDL("""
+CREATE OR REPLACE FUNCTION pickups_set_geohash() RETURNS trigger AS $$
+BEGIN
+    NEW.geohash := ST_GeoHash(NEW.location::geometry, 12);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER pickups_set_geohash
+    BEFORE INSERT OR UPDATE OF location ON pickups
+    FOR EACH ROW EXECUTE FUNCTION pickups_set_geohash();
+"""))
+
 class PickupItem(Base):
     """
     The User's Manifest. What they CLAIM they are giving.
     """
     __tablename__ = "pickup_items"
+    __table_args__ = (Index("ix_pickup_items_pickup_id", "pickup_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     pickup_id = Column(Integer, ForeignKey("pickups.id"), nullable=False)
@@ -143,6 +181,10 @@ class InventoryLog(Base):
     Created automatically when a driver marks a pickup as 'COLLECTED'.
     """
     __tablename__ = "inventory_logs"
+    __table_args__ = (
+        Index("ix_inventory_logs_status_created_at", "status", "created_at"),
+        trigram_index("ix_inventory_logs_item_name_trgm", "item_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -155,7 +197,7 @@ class InventoryLog(Base):
     value = Column(Integer)
     
     # Lifecycle Status (Managed by Warehouse)
-    status = Column(Enum(InventoryStatus), default=InventoryStatus.RECEIVED)
+    status = Column(stored_by_value(InventoryStatus), default=InventoryStatus.RECEIVED)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -165,6 +207,11 @@ class InventoryLog(Base):
 
 class Certificate(Base):
     __tablename__ = "certificates"
+    __table_args__ = (
+        Index("ix_certificates_pickup_id", "pickup_id"),
+        trigram_index("ix_certificates_recipient_name_trgm", "recipient_name"),
+        trigram_index("ix_certificates_unique_code_trgm", "unique_code"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     unique_code = Column(String, unique=True, index=True) # e.g., CERT-001
@@ -185,6 +232,7 @@ class Certificate(Base):
 # 2. Add Transaction Table
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (Index("ix_transactions_profile_id_created_at", "profile_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
@@ -197,3 +245,20 @@ class Transaction(Base):
     
     profile = relationship("Profile", back_populates="transactions")
 
+class RoutePlan(Base):
+    """
+    Routes for one pickup date, pre-computed overnight so the morning
+    rush is served from storage instead of the solver.
+    """
+    __tablename__ = "route_plans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pickup_date = Column(Date, unique=True, nullable=False)
+
+    plan = Column(JSONB, nullable=False)           # same shape as POST /api/collector/plan-routes
+    stops_planned = Column(Integer, nullable=False)
+    stops_unassigned = Column(Integer, nullable=False, default=0)
+    solver_gap = Column(Float, nullable=True)      # 1 - lower bound / planned drive time
+    solve_ms = Column(Float, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -3,12 +3,14 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from authlib.integrations.starlette_client import OAuth
 import uuid
 import random
 from datetime import datetime, timedelta, timezone # Updated imports
 
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 from models.all_model import User as UserModel, UserRole
 from schemas.all_schema import TokenWithUser, ForgotPasswordRequest, VerifyOtpRequest, ResetPasswordRequest
 from auth import hashing, token
@@ -73,7 +75,7 @@ async def login_via_google(request: Request, role: str = Query("dropper", enum=[
 
 
 @router.get("/google/callback", name="auth_google_callback")
-async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
+async def auth_google_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         token_google = await oauth.google.authorize_access_token(request)
         user_info = token_google.get('userinfo')
@@ -87,7 +89,8 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail=f"Could not validate Google credentials: {e}")
 
     user_email = user_info['email']
-    user = db.query(UserModel).filter(UserModel.email == user_email).first()
+    result = await db.execute(select(UserModel).where(UserModel.email == user_email))
+    user = result.scalars().first()
 
     if not user:
         # --- NEW USER REGISTRATION VIA GOOGLE ---
@@ -106,10 +109,10 @@ async def auth_google_callback(request: Request, db: Session = Depends(get_db)):
             )
 
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user) 
+            await db.flush() # Assigns new_user.id
 
-            create_profile_for_user(db, new_user.id)
+            # Shared helper (commits the user and profile together)
+            await db.run_sync(create_profile_for_user, new_user.id)
             
             user = new_user
 
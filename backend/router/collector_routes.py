@@ -1,18 +1,31 @@
 import os
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import cast, String 
+import asyncio
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, selectinload, defer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast, or_, not_, literal_column, text
+from sqlalchemy.dialects.postgresql import array_agg
 from typing import List, Optional
-from geoalchemy2.shape import to_shape
 from geoalchemy2.elements import WKTElement
-from datetime import datetime, time
-
-from database.postgresConn import get_db
-from models.all_model import Pickup, PickupItem, Profile, User, PickupStatus, UserRole, Certificate, InventoryLog, InventoryStatus, Transaction, TransactionType
-
-from schemas.all_schema import PickupResponse, CertificateResponse, CertificateCreate, DetectedItem
-from auth.oauth2 import get_current_user
+from geoalchemy2 import Geography, Geometry
+from datetime import datetime, time, date
+
+from database.postgresConn import get_db, get_async_db
+from models.all_model import Pickup, PickupItem, Profile, User, PickupStatus, UserRole, Certificate, InventoryLog, InventoryStatus, Transaction, TransactionType, RoutePlan
+
+from schemas.all_schema import PickupResponse, CertificateResponse, CertificateCreate, DetectedItem, RoutePlanRequest, PickupStatusEnum
+from auth.oauth2 import get_current_user, get_current_user_async
+from routing.solver import solve_route, estimated_road_matrix, estimated_duration, tour_length, haversine_m, ROUTE_DETOUR_FACTOR
+from routing.osrm import osrm, OsrmError, OSRM_TABLE_MAX
+from routing.cache import route_cache, snap_to_cell, coord_key
+from routing.live_routes import live_routes
+from routing.vrp import VRP_TIME_BUDGET_MS, VRP_MAX_TIME_BUDGET_MS
+from routing.day_plan import fetch_day_pickups, solve_day_plan
+from utils.search import normalize_search, is_searchable, apply_trigram_search, search_limit
+from utils.pagination import keyset_page, set_next_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
+from utils.geohash import zoom_to_precision, clean_prefix, CLUSTER_MAX_CELLS, CLUSTER_IDS_MAX
+from utils.tile_cache import tile_cache, TILE_MIN_ZOOM, TILE_MAX_ZOOM, TILE_EXTENT, TILE_BUFFER
 
 router = APIRouter(
     prefix="/api/collector",
@@ -32,19 +45,27 @@ def ensure_collector_role(user: User):
 # --- 1. VIEW PENDING PICKUPS (FIXED) ---
 @router.get("/pending", response_model=List[PickupResponse])
 def get_pending_pickups(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     ensure_collector_role(current_user)
     
-    # Fetch all SCHEDULED pickups
-    pickups = db.query(Pickup).filter(
-        cast(Pickup.status, String) == "SCHEDULED"
-    ).all()
+    # Fetch SCHEDULED pickups, oldest booking first.
+    # selectinload: all items of the page in ONE extra query (not one per pickup);
+    # the location isn't shown in this list, so don't ship its WKB either.
+    query = db.query(Pickup).options(
+        selectinload(Pickup.items),
+        defer(Pickup.location),
+    ).filter(Pickup.status == PickupStatus.SCHEDULED)
+    pickups, next_cursor = keyset_page(query, [Pickup.id], cursor, limit, descending=False)
+    set_next_cursor(response, next_cursor)
     
     response_list = []
     for p in pickups:
-        # 1. Calculate Total Value
+        # 1. Calculate Total Value (items are already loaded)
         total_val = sum(item.credit_value for item in p.items)
         
         # 2. Time Logic
@@ -92,116 +113,493 @@ async def get_osrm_route(
     radius_km: int = 50, # Default search radius
     # NEW: Accept list of IDs to force into the route (e.g., ?include_ids=1&include_ids=5)
     include_ids: List[int] = Query(default=[]), 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    # Stops the collector removed from the map
+    exclude_ids: List[int] = Query(default=[]),
+    # 'osrm' = road route from OSRM (falls back to 'local' if it fails), 'local' = in-process solver
+    solver: str = Query(default="osrm", pattern="^(osrm|local)$"),
+    # Route one day's pickups; omitted = every scheduled pickup, whatever its date
+    pickup_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     ensure_collector_role(current_user)
 
-    # 1. Fetch ALL Scheduled Pickups
-    all_pickups = db.query(Pickup).filter(
-        cast(Pickup.status, String) == "SCHEDULED"
-    ).all()
-    
-    route_pickups = []  # These will get the BLUE line
-    other_pickups = []  # These will be GREY markers
-
-    for p in all_pickups:
-        if not p.location: continue
-        
-        try:
-            point = to_shape(p.location)
-            
-            # Simple Distance Calc (1 deg lat ~= 111km)
-            dist = ((point.y - latitude)**2 + (point.x - longitude)**2)**0.5 * 111
-            
-            # LOGIC: Include if nearby OR if user manually selected it
-            if dist <= radius_km or p.id in include_ids:
-                route_pickups.append(p)
-            else:
-                other_pickups.append(p)
-        except Exception as e:
-            print(f"Location parse error for pickup {p.id}: {e}")
-            continue
+    # 1. Let PostGIS pick the stops: nearby (or manually included) ones get
+    # the BLUE line, the closest few others are GREY markers.
+    route_pickups, other_pickups = await fetch_route_candidates(
+        db, latitude, longitude, radius_km, include_ids, exclude_ids, pickup_date
+    )
+    all_pickups = route_pickups + other_pickups
 
     # If no local pickups and no manual overrides, return unoptimized map
     if not route_pickups:
         return build_response(stops=other_pickups, route_geo=None)
 
-    # 2. Prepare Coordinates for OSRM (Only for route_pickups)
-    coords_list = [f"{longitude},{latitude}"] # Start at Driver location
-    
-    # Map coordinates to Pickup objects (handling multiple pickups at same location)
-    pickup_map = {} 
-    
-    for p in route_pickups:
-        point = to_shape(p.location)
-        coord_str = f"{point.x},{point.y}"
-        
-        coords_list.append(coord_str)
-        
-        if coord_str not in pickup_map: 
-            pickup_map[coord_str] = []
-        pickup_map[coord_str].append(p)
-
-    coords_string = ";".join(coords_list)
-
-    # 3. Call OSRM API
-    url = f"http://router.project-osrm.org/trip/v1/driving/{coords_string}?source=first&overview=full&geometries=geojson"
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=15.0)
-            
-            if response.status_code != 200:
-                # Fallback if API fails
-                return build_response(stops=route_pickups + other_pickups, route_geo=None)
+    # 2. Canonical stop order (sorted coordinates) + the driver's grid cell: the
+    # same stop set from roughly the same place is one cache entry / live-route
+    # position. OSRM itself is always sent the real coordinate.
+    start = snap_to_cell(latitude, longitude)
+    route_pickups = sorted(route_pickups, key=lambda p: (coord_key(p.lat, p.lng), p.id))
+
+    # 3. Already planned this shift: patch the live route (O(n)) instead of re-solving,
+    # unless the patches have made it noticeably worse than a fresh solve would be.
+    # The live route is keyed by the day it serves, so it doesn't roll over at midnight.
+    # First request of a shift starts from the nightly pre-computed plan.
+    if live_routes.get(current_user.id, pickup_date) is None:
+        await seed_from_stored_plan(db, current_user.id, pickup_date, radius_km, route_pickups)
+
+    live = live_routes.sync(
+        current_user.id, pickup_date, start, radius_km,
+        {p.id: coord_key(p.lat, p.lng) for p in route_pickups}
+    )
+    if live is not None:
+        return await respond_from_live_route(live, solver, latitude, longitude, route_pickups, other_pickups)
 
-            data = response.json()
+    if solver == "local":
+        result = await solve_locally(latitude, longitude, route_pickups, other_pickups)
+        return remember_route(current_user.id, pickup_date, start, radius_km, route_pickups, result)
 
-        if data["code"] != "Ok":
-             return build_response(stops=route_pickups + other_pickups, route_geo=None)
+    stops = [coord_key(p.lat, p.lng) for p in route_pickups]
 
+    # 4. Call OSRM (cached trip, or the configured OSRM_BASE_URL)
+    try:
+        data = await osrm.trip(coord_key(latitude, longitude), stops, [p.id for p in route_pickups])
         trip = data["trips"][0]
         waypoints = data["waypoints"]
-        
-        # 4. Re-order Stops based on OSRM result
-        ordered_stops = []
-        
-        # Process optimized stops
-        for wp in waypoints:
-            if wp["waypoint_index"] == 0: continue # Skip driver's start point
-            
-            original_coord_str = coords_list[wp["waypoint_index"]]
-            
-            if original_coord_str in pickup_map and len(pickup_map[original_coord_str]) > 0:
-                p = pickup_map[original_coord_str].pop(0)
-                ordered_stops.append(format_pickup(p, "optimized"))
+
+        # 5. Re-order Stops based on OSRM result.
+        # waypoints[] is in input order; waypoint_index is the position in the trip
+        visit_order = sorted(range(len(waypoints)), key=lambda i: waypoints[i]["waypoint_index"])
+        ordered_stops = [
+            format_pickup(route_pickups[i - 1], "optimized")
+            for i in visit_order if i != 0  # Skip driver's start point
+        ]
 
         # Add remaining 'Far Away' stops (unoptimized)
         for p in other_pickups:
             ordered_stops.append(format_pickup(p, "far_away"))
 
-        return {
+        return remember_route(current_user.id, pickup_date, start, radius_km, route_pickups, {
             "route_geometry": trip["geometry"],
             "stops": ordered_stops,
             "total_distance": trip["distance"],
-            "total_duration": trip["duration"]
-        }
+            "total_duration": trip["duration"],
+            "solver": "osrm"
+        })
         
-    except Exception as e:
+    except (OsrmError, KeyError, IndexError) as e:
         print(f"Routing Exception: {str(e)}")
-        # Fallback: Return all markers without a route line
+
+    # Fallback: order the stops in-process (straight-line route geometry).
+    # OSRM just failed, so don't wait on it again for a road matrix.
+    try:
+        result = await solve_locally(latitude, longitude, route_pickups, other_pickups, road_matrix=False)
+        return remember_route(current_user.id, pickup_date, start, radius_km, route_pickups, result)
+    except Exception as e:
+        print(f"❌ Local route solver failed: {e}")
+        # Last resort: Return all markers without a route line
         return build_response(stops=all_pickups, route_geo=None)
 
 
+# --- 2b. PLAN THE DAY (several drivers, timeslots, van capacity) ---
+@router.post("/plan-routes")
+async def plan_routes(
+    plan: RoutePlanRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Splits every scheduled pickup of `pickup_date` across the given drivers:
+    each stop is visited inside its booked timeslot, no van carries more
+    items than its capacity, and each driver returns to where they started.
+    Stops that can't fit anywhere come back in `unassigned`.
+    """
+    ensure_collector_role(current_user)
+
+    pickups = await fetch_day_pickups(db, plan.pickup_date)
+    time_budget_ms = min(plan.time_budget_ms or VRP_TIME_BUDGET_MS, VRP_MAX_TIME_BUDGET_MS)
+    return await solve_day_plan(plan.drivers, pickups, time_budget_ms)
+
+
+# --- 2c. PRE-COMPUTED ROUTES (nightly scheduler) ---
+@router.get("/planned-routes")
+async def get_planned_routes(
+    pickup_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    The routes the nightly scheduler planned for `pickup_date` (default: today),
+    straight from storage. Same shape as POST /plan-routes plus when it was planned.
+    """
+    ensure_collector_role(current_user)
+
+    stored = (await db.execute(
+        select(RoutePlan).where(RoutePlan.pickup_date == (pickup_date or date.today()))
+    )).scalar_one_or_none()
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No pre-computed routes for this date.")
+
+    return {**stored.plan, "pickup_date": stored.pickup_date, "planned_at": stored.created_at}
+
+
+# --- 2d. MAP CLUSTERS (geohash zones) ---
+@router.get("/clusters")
+async def get_pickup_clusters(
+    zoom: int = Query(default=12, ge=0, le=22),   # web-map zoom level
+    pickup_status: PickupStatusEnum = Query(default=PickupStatusEnum.SCHEDULED, alias="status"),
+    pickup_date: Optional[date] = None,
+    # Drill into one zone: only pickups whose geohash starts with it
+    prefix: Optional[str] = None,
+    # Visible map area (all four or none)
+    min_lat: Optional[float] = None,
+    min_lng: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    max_lng: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Pickups grouped into geohash cells sized for the zoom level: centroid,
+    bounds, pickup / item counts and total credits per zone, plus the pickup
+    ids (up to CLUSTER_IDS_MAX) so a zone can be dispatched as a whole.
+    """
+    ensure_collector_role(current_user)
+
+    bbox = [min_lat, min_lng, max_lat, max_lng]
+    if any(v is not None for v in bbox) and not all(v is not None for v in bbox):
+        raise HTTPException(status_code=400, detail="Pass all of min_lat, min_lng, max_lat, max_lng or none.")
+
+    precision = zoom_to_precision(zoom)
+    filters = [Pickup.status == PickupStatus(pickup_status.value), Pickup.geohash.isnot(None)]
+    if pickup_date:
+        filters.append(Pickup.pickup_date == pickup_date)
+    if prefix:
+        prefix = clean_prefix(prefix)
+        # Plain base32 (nothing to escape): LIKE 'prefix%' is a range scan on ix_pickups_geohash
+        filters.append(Pickup.geohash.like(prefix + "%"))
+        precision = max(precision, len(prefix))
+    if min_lat is not None:
+        envelope = cast(func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326),
+                        Geography(geometry_type="POLYGON", srid=4326, spatial_index=False))
+        filters.append(func.ST_Intersects(Pickup.location, envelope))
+
+    # 1. One row per pickup (items summed before grouping, so counts aren't multiplied)
+    per_pickup = (
+        select(
+            Pickup.id, Pickup.geohash,
+            func.ST_Y(_LOCATION_POINT).label("lat"),
+            func.ST_X(_LOCATION_POINT).label("lng"),
+            func.count(PickupItem.id).label("item_count"),
+            func.coalesce(func.sum(PickupItem.credit_value), 0).label("credits"),
+        )
+        .outerjoin(PickupItem, PickupItem.pickup_id == Pickup.id)
+        .where(*filters)
+        .group_by(Pickup.id)
+        .subquery()
+    )
+
+    # 2. GROUP BY the cell prefix (precision is a validated int, inlined so
+    # SELECT and GROUP BY are the same expression)
+    cell = func.left(per_pickup.c.geohash, literal_column(str(precision)))
+    query = (
+        select(
+            cell.label("cell"),
+            func.count().label("pickups"),
+            func.sum(per_pickup.c.item_count).label("items"),
+            func.sum(per_pickup.c.credits).label("credits"),
+            func.avg(per_pickup.c.lat).label("lat"),
+            func.avg(per_pickup.c.lng).label("lng"),
+            func.min(per_pickup.c.lat).label("min_lat"),
+            func.min(per_pickup.c.lng).label("min_lng"),
+            func.max(per_pickup.c.lat).label("max_lat"),
+            func.max(per_pickup.c.lng).label("max_lng"),
+            array_agg(per_pickup.c.id)[1:CLUSTER_IDS_MAX].label("pickup_ids"),
+        )
+        .group_by(cell)
+        .order_by(func.count().desc(), cell)
+        .limit(CLUSTER_MAX_CELLS + 1)
+    )
+    rows = (await db.execute(query)).all()
+
+    return {
+        "zoom": zoom,
+        "precision": precision,
+        "truncated": len(rows) > CLUSTER_MAX_CELLS,
+        "clusters": [
+            {
+                "cell": r.cell,
+                "pickups": r.pickups,
+                "items": int(r.items),
+                "credits": int(r.credits),
+                "lat": float(r.lat),
+                "lng": float(r.lng),
+                "bounds": [r.min_lng, r.min_lat, r.max_lng, r.max_lat],
+                "pickup_ids": r.pickup_ids,
+            }
+            for r in rows[:CLUSTER_MAX_CELLS]
+        ],
+    }
+
+
+# --- 2e. VECTOR TILES (collector map) ---
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+TILE_BROWSER_MAX_AGE = int(os.getenv("TILE_BROWSER_MAX_AGE", "30"))   # server cache is invalidated, browsers aren't
+
+def tile_sql(by_date: bool):
+    """
+    One 'pickups' layer: points in the tile (plus the edge buffer), with
+    the attributes the map popups need. The envelope filter runs on the
+    GiST index of pickups.location; item totals come from one lateral
+    lookup per point on ix_pickup_items_pickup_id.
+    """
+    date_filter = "AND p.pickup_date = :pickup_date" if by_date else ""
+    return text(f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS tile,
+                   ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), 4326)::geography AS area
+        ),
+        features AS (
+            SELECT ST_AsMVTGeom(ST_Transform(p.location::geometry, 3857), bounds.tile, :extent, :buffer, true) AS geom,
+                   p.id, p.status::text AS status, p.pickup_date::text AS pickup_date,
+                   p.timeslot, p.address_text, totals.items, totals.credits
+            FROM pickups p
+            CROSS JOIN bounds
+            LEFT JOIN LATERAL (
+                SELECT count(*) AS items, coalesce(sum(i.credit_value), 0) AS credits
+                FROM pickup_items i WHERE i.pickup_id = p.id
+            ) totals ON true
+            WHERE p.status = CAST(:status AS pickupstatus) {date_filter}
+              AND ST_Intersects(p.location, bounds.area)
+        )
+        SELECT ST_AsMVT(features, 'pickups', :extent, 'geom') FROM features
+    """)
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_pickup_tile(
+    z: int,
+    x: int,
+    y: int,
+    pickup_status: PickupStatusEnum = Query(default=PickupStatusEnum.SCHEDULED, alias="status"),
+    pickup_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Mapbox Vector Tile of pickups (layer 'pickups') built by PostGIS
+    ST_AsMVT. Tiles are cached per (z, x, y, status, date) and dropped when
+    a pickup inside them is booked or changes status. Below TILE_MIN_ZOOM
+    (and for empty tiles) the answer is 204: use /clusters there.
+    """
+    ensure_collector_role(current_user)
+
+    if not (0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range.")
+    if z < TILE_MIN_ZOOM:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    key = tile_cache.key(z, x, y, pickup_status.value, pickup_date)
+    tile = tile_cache.get(key)
+    if tile is None:
+        params = {
+            "z": z, "x": x, "y": y,
+            "margin": TILE_BUFFER / TILE_EXTENT,
+            "extent": TILE_EXTENT,
+            "buffer": TILE_BUFFER,
+            "status": pickup_status.value,
+        }
+        if pickup_date:
+            params["pickup_date"] = pickup_date
+        tile = bytes((await db.execute(tile_sql(pickup_date is not None), params)).scalar() or b"")
+        tile_cache.set(key, tile)
+
+    if not tile:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(
+        content=tile,
+        media_type=MVT_MEDIA_TYPE,
+        headers={"Cache-Control": f"private, max-age={TILE_BROWSER_MAX_AGE}"}
+    )
+
+
 # --- Helpers ---
+FAR_AWAY_MARKER_LIMIT = int(os.getenv("FAR_AWAY_MARKER_LIMIT", "200"))
+
+def _as_geography(latitude: float, longitude: float):
+    return cast(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), Geography(geometry_type="POINT", srid=4326, spatial_index=False))
+
+_LOCATION_POINT = cast(Pickup.location, Geometry(geometry_type="POINT", srid=4326, spatial_index=False))
+
+async def fetch_route_candidates(db: AsyncSession, latitude: float, longitude: float,
+                                 radius_km: float, include_ids: List[int], exclude_ids: List[int],
+                                 pickup_date: Optional[date] = None):
+    """
+    Scheduled pickups split into (route, far_away) rows of
+    id / address_text / image_url / status / lat / lng / distance_m.
+
+    ST_DWithin on geography is geodesic and uses the GiST index on
+    pickups.location; ST_Y/ST_X come back as plain floats, so no WKB is
+    decoded here. Far-away markers are the nearest FAR_AWAY_MARKER_LIMIT
+    (KNN <-> on the same index), so the cost follows the nearby stops,
+    not the size of the pickups table.
+    """
+    origin = _as_geography(latitude, longitude)
+    columns = [
+        Pickup.id, Pickup.address_text, Pickup.image_url, Pickup.status,
+        func.ST_Y(_LOCATION_POINT).label("lat"),
+        func.ST_X(_LOCATION_POINT).label("lng"),
+        func.ST_Distance(Pickup.location, origin).label("distance_m"),
+    ]
+    scheduled = [Pickup.status == PickupStatus.SCHEDULED, Pickup.location.isnot(None)]
+    if pickup_date is not None:
+        scheduled.append(Pickup.pickup_date == pickup_date)
+    if exclude_ids:
+        scheduled.append(Pickup.id.notin_(exclude_ids))
+
+    within = func.ST_DWithin(Pickup.location, origin, radius_km * 1000)
+    in_route = or_(within, Pickup.id.in_(include_ids)) if include_ids else within
+
+    route = (await db.execute(
+        select(*columns).where(*scheduled, in_route).order_by("distance_m")
+    )).all()
+
+    others = (await db.execute(
+        select(*columns).where(*scheduled, not_(in_route))
+        .order_by(Pickup.location.op("<->")(origin))
+        .limit(FAR_AWAY_MARKER_LIMIT)
+    )).all()
+
+    return route, others
+
+async def solve_locally(latitude: float, longitude: float, route_pickups: list, other_pickups: list,
+                        road_matrix: bool = True) -> dict:
+    """
+    Same response shape as the OSRM path, ordered by routing/solver.py.
+    Costs are OSRM road durations from the pair cache / table service when
+    available (small enough, OSRM up), else haversine x detour factor.
+    The geometry is the straight-line polyline through the stops, closed
+    back at the driver like OSRM's round trip.
+    """
+    points = [(latitude, longitude)] + [(p.lat, p.lng) for p in route_pickups]
+
+    durations = distances = None
+    if road_matrix and len(points) <= OSRM_TABLE_MAX:
+        try:
+            durations, distances = await osrm.matrix([coord_key(lat, lng) for lat, lng in points])
+        except OsrmError as e:
+            print(f"⚠️ Road matrix unavailable, using estimates: {e}")
+
+    def _solve():
+        if durations is None:
+            matrix = estimated_road_matrix(points)
+            solution = solve_route(matrix, roundtrip=True)
+            return solution, solution.distance, estimated_duration(solution.distance)
+
+        # Unroutable pairs (null -> NaN) fall back to the straight-line estimate
+        estimate = estimated_road_matrix(points)
+        distance_matrix = np.array(distances, dtype=np.float64)
+        distance_matrix = np.where(np.isnan(distance_matrix), estimate, distance_matrix)
+        duration_matrix = np.array(durations, dtype=np.float64)
+        duration_matrix = np.where(np.isnan(duration_matrix), estimated_duration(estimate), duration_matrix)
+
+        # Road matrices are asymmetric (one-way streets); the solver wants symmetric costs
+        solution = solve_route((duration_matrix + duration_matrix.T) / 2, roundtrip=True)
+        tour = np.array([0] + solution.order)
+        return (solution,
+                tour_length(tour, distance_matrix, roundtrip=True),
+                tour_length(tour, duration_matrix, roundtrip=True))
+
+    # CPU-bound for up to the time budget: keep it off the event loop
+    solution, total_distance, total_duration = await asyncio.to_thread(_solve)
+    ordered = [route_pickups[index - 1] for index in solution.order]
+
+    path = [[longitude, latitude]] + [[p.lng, p.lat] for p in ordered] + [[longitude, latitude]]
+    return {
+        "route_geometry": {"type": "LineString", "coordinates": path},
+        "stops": [format_pickup(p, "optimized") for p in ordered]
+                 + [format_pickup(p, "far_away") for p in other_pickups],
+        "total_distance": total_distance,
+        "total_duration": total_duration,
+        "solver": "local"
+    }
+
+def remember_route(collector_id: int, day: Optional[date], start: tuple, radius_km: float,
+                   route_pickups: list, result: dict) -> dict:
+    """Keeps a fully solved route as the collector's live route, so later refreshes only patch it."""
+    by_id = {p.id: p for p in route_pickups}
+    ordered = [by_id[s["id"]] for s in result["stops"] if s["tag"] == "optimized"]
+    live_routes.record(collector_id, day, start, radius_km,
+                       [(p.id, coord_key(p.lat, p.lng)) for p in ordered])
+    result["plan"] = "full"
+    return result
+
+async def seed_from_stored_plan(db: AsyncSession, collector_id: int, day: Optional[date],
+                                radius_km: float, route_pickups: list):
+    """
+    Starts a live route from the nightly plan for its day (today's for an
+    all-dates route): the planned van route sharing the most stops with this
+    refresh, in its planned order. The usual sync then patches in whatever
+    changed since the night.
+    """
+    stored = (await db.execute(
+        select(RoutePlan.plan).where(RoutePlan.pickup_date == (day or date.today()))
+    )).scalar_one_or_none()
+    if not stored or not stored["routes"]:
+        return
+
+    current = {p.id: coord_key(p.lat, p.lng) for p in route_pickups}
+    best = max(stored["routes"], key=lambda r: sum(s["id"] in current for s in r["stops"]))
+    stops = [(s["id"], current[s["id"]]) for s in best["stops"] if s["id"] in current]
+    if stops:
+        # Recorded from the van's depot; sync() then splices the collector's position into the cycle
+        depot_lng, depot_lat = best["route_geometry"]["coordinates"][0]
+        live_routes.record(collector_id, day, coord_key(depot_lat, depot_lng), radius_km, stops, precomputed=True)
+
+async def respond_from_live_route(live, solver: str, latitude: float, longitude: float,
+                                  route_pickups: list, other_pickups: list) -> dict:
+    """
+    Same response shape as a full solve, in the live route's order. With the
+    'osrm' solver the road geometry comes from OSRM's route service (fixed
+    order, cached), which is far cheaper than a new trip optimisation.
+    """
+    by_id = {p.id: p for p in route_pickups}
+    ordered = [by_id[pickup_id] for pickup_id, _ in live.stops]
+    stops = ([format_pickup(p, "optimized") for p in ordered]
+             + [format_pickup(p, "far_away") for p in other_pickups])
+
+    if solver == "osrm":
+        try:
+            data = await osrm.route(coord_key(latitude, longitude), [coord for _, coord in live.stops],
+                                    [p.id for p in ordered])
+            road = data["routes"][0]
+            return {
+                "route_geometry": road["geometry"],
+                "stops": stops,
+                "total_distance": road["distance"],
+                "total_duration": road["duration"],
+                "solver": "osrm",
+                "plan": "incremental"
+            }
+        except (OsrmError, KeyError, IndexError) as e:
+            print(f"⚠️ Road geometry unavailable, drawing straight lines: {e}")
+
+    points = [(latitude, longitude)] + [(p.lat, p.lng) for p in ordered] + [(latitude, longitude)]
+    return {
+        "route_geometry": {"type": "LineString", "coordinates": [[lng, lat] for lat, lng in points]},
+        "stops": stops,
+        "total_distance": sum(haversine_m(a, b) for a, b in zip(points[:-1], points[1:])) * ROUTE_DETOUR_FACTOR,
+        "total_duration": live.cost,
+        "solver": "local",
+        "plan": "incremental"
+    }
+
 def format_pickup(p, type_tag):
-    point = to_shape(p.location)
     return {
         "id": p.id,
         "address": p.address_text,
-        "lat": point.y,
-        "lng": point.x,
+        "lat": p.lat,
+        "lng": p.lng,
+        "distance_km": round(p.distance_m / 1000, 2),
         "image_url": p.image_url,
         "status": p.status,
         "tag": type_tag # 'optimized' or 'far_away'
@@ -279,6 +677,15 @@ def complete_pickup(
 
     db.commit()
 
+    # Status changed: cached routes through this stop are stale, live routes drop it
+    route_cache.invalidate_pickup(pickup.id)
+    live_routes.remove_pickup(pickup.id)
+    # ... and map tiles drawing it too
+    lat, lng = db.execute(
+        select(func.ST_Y(_LOCATION_POINT), func.ST_X(_LOCATION_POINT)).where(Pickup.id == pickup.id)
+    ).one()
+    tile_cache.invalidate_point(lat, lng)
+
     return {
         "message": "Pickup collected. Items moved to Warehouse Inventory.",
         "credits_awarded": total_credits,
@@ -289,8 +696,11 @@ def complete_pickup(
 # --- 4. LIST CERTIFICATES (GET) ---
 @router.get("/certificates", response_model=List[CertificateResponse])
 def get_certificates(
+    response: Response,
     search: str = "",
     type_filter: str = "all",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -302,15 +712,18 @@ def get_certificates(
     if type_filter != "all":
         query = query.filter(Certificate.cert_type == type_filter)
 
-    # Filter by Search (Name or ID)
+    # Search (Name or ID): trigram-ranked, one page. Otherwise newest-first keyset pages
+    search = normalize_search(search)
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Certificate.recipient_name.ilike(search_term)) |
-            (Certificate.unique_code.ilike(search_term))
-        )
-
-    certs = query.order_by(Certificate.id.desc()).all()
+        if not is_searchable(search):
+            return []
+        certs = apply_trigram_search(
+            query, search, [Certificate.recipient_name, Certificate.unique_code],
+            search_limit(limit), tiebreak=(Certificate.id.desc(),)
+        ).all()
+    else:
+        certs, next_cursor = keyset_page(query, [Certificate.id], cursor, limit or PAGE_DEFAULT_LIMIT)
+        set_next_cursor(response, next_cursor)
 
     # Map to Schema
     results = []
@@ -1,13 +1,15 @@
 # router/inventory_routes.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 
 from database.postgresConn import get_db
-from models.all_model import InventoryLog, User, UserRole, Pickup, Profile
+from models.all_model import InventoryLog, InventoryStatus, User, UserRole, Pickup, Profile
 from schemas.all_schema import InventoryItemResponse, InventoryStatusUpdate
 from auth.oauth2 import get_current_user
+from utils.search import normalize_search, is_searchable, apply_trigram_search, search_limit
+from utils.pagination import keyset_page, set_next_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 router = APIRouter(
     prefix="/api/inventory",
@@ -19,12 +21,23 @@ def ensure_collector_role(user: User):
     if user.role != UserRole.collector:
         raise HTTPException(status_code=403, detail="Access denied. Admin only.")
 
+def parse_inventory_status(value: str) -> InventoryStatus:
+    """'received' / 'RECEIVED' -> InventoryStatus.RECEIVED, 400 for anything else."""
+    try:
+        return InventoryStatus(value.lower())
+    except ValueError:
+        allowed = ", ".join(s.value for s in InventoryStatus)
+        raise HTTPException(status_code=400, detail=f"Invalid status '{value}'. Use one of: {allowed}")
+
 # router/inventory_routes.py
 
 @router.get("/", response_model=List[InventoryItemResponse])
 def get_live_inventory(
+    response: Response,
     status: str = "all",
     search: str = "",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -39,14 +52,24 @@ def get_live_inventory(
 
     # 2. Filters
     if status != "all":
-        query = query.filter(InventoryLog.status == status)
+        query = query.filter(InventoryLog.status == parse_inventory_status(status))
 
+    # 3. Search (trigram-ranked, one page) or newest-first keyset pages
+    search = normalize_search(search)
     if search:
-        query = query.filter(InventoryLog.item_name.ilike(f"%{search}%"))
-
-    logs = query.order_by(InventoryLog.created_at.desc()).all()
-
-    # 3. Map to Schema (The Fix is inside this loop)
+        if not is_searchable(search):
+            return []
+        logs = apply_trigram_search(
+            query, search, [InventoryLog.item_name],
+            search_limit(limit), tiebreak=(InventoryLog.created_at.desc(),)
+        ).all()
+    else:
+        logs, next_cursor = keyset_page(
+            query, [InventoryLog.created_at, InventoryLog.id], cursor, limit or PAGE_DEFAULT_LIMIT
+        )
+        set_next_cursor(response, next_cursor)
+
+    # 4. Map to Schema (The Fix is inside this loop)
     results = []
     for log in logs:
         # Safe Navigation: Check if relations exist before accessing attributes
@@ -88,7 +111,7 @@ def update_inventory_status(
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
     # Update Status
-    item.status = status_update.status
+    item.status = parse_inventory_status(status_update.status)
     db.commit()
 
-    return {"message": f"Item moved to {item.status}"}
\ No newline at end of file
+    return {"message": f"Item moved to {item.status.value}"}
\ No newline at end of file
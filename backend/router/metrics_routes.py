@@ -0,0 +1,98 @@
+# router/metrics_routes.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from auth.oauth2 import get_current_user
+from models.all_model import User, UserRole
+
+from ml_engine.detector import detector
+from utils.scan_cache import scan_cache
+from utils.job_store import scan_jobs
+from utils.phash import near_duplicates
+from database.pool_config import pool_metrics
+from routing.osrm import osrm
+from routing.live_routes import live_routes
+from routing.scheduler import route_precomputer
+from utils.tile_cache import tile_cache
+
+# --- HELPER: Role Check ---
+def require_admin(current_user: User = Depends(get_current_user)):
+    """Pool sizes, queue depths and cache contents are for operators only."""
+    if current_user.role != UserRole.collector:
+        raise HTTPException(status_code=403, detail="Access denied. Admin only.")
+    return current_user
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(require_admin)]
+)
+
+@router.get("/detector")
+def get_detector_metrics():
+    """
+    Connection pool usage (in-use / idle) and recent latency of the AI detector.
+    """
+    return detector.pool_stats()
+
+@router.get("/scheduler")
+def get_scheduler_metrics():
+    """
+    Micro-batching window, queue depth and per-batch latency.
+    """
+    if detector.scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **detector.scheduler.stats()}
+
+@router.get("/scan-cache")
+def get_scan_cache_metrics():
+    """
+    Hit/miss counters and size of the content-addressed scan result cache.
+    """
+    return scan_cache.stats()
+
+@router.get("/scan-jobs")
+def get_scan_job_metrics():
+    """
+    Async scan job pool: queue depth and job outcomes.
+    """
+    return scan_jobs.stats()
+
+@router.get("/near-duplicates")
+def get_near_duplicate_report():
+    """
+    Perceptual-hash reuse report: how often a near-duplicate scan reused an
+    earlier detection result + storage object instead of calling the model.
+    """
+    return near_duplicates.report()
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """
+    Database connection pools (sync + async engine): saturation, checkout
+    wait time and checkout timeouts for this worker.
+    """
+    return pool_metrics()
+
+@router.get("/routing")
+def get_routing_metrics():
+    """
+    OSRM upstream latency / errors, route cache hit rates (trips + road matrices)
+    and how often refreshes patched a live route instead of re-solving.
+    """
+    return {**osrm.stats(), **live_routes.stats()}
+
+@router.get("/route-precompute")
+def get_route_precompute_metrics():
+    """
+    Nightly route pre-computation: runs, skips (another worker held the lock),
+    failures and the last run's duration, stops planned and solver gap.
+    """
+    return route_precomputer.stats()
+
+@router.get("/tiles")
+def get_tile_metrics():
+    """
+    Vector tile cache: tiles / bytes held, hit rate and tiles dropped by pickup changes.
+    """
+    return tile_cache.stats()
@@ -1,18 +1,25 @@
 # routers/pickup_routes.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime, time
+import time as clock
+import asyncio
+import json
 import os
 from typing import List, Optional
 
 # Import your setup
-from database.postgresConn import get_db
+from database.postgresConn import get_db, get_async_db
 from models.all_model import Pickup, PickupItem, Profile, User, PickupStatus, UserRole
 # Updated imports: PickupHistoryDetail/HistoryItem might not be needed anymore, 
 # but I kept them just in case. The key imports here are ScanResponse, PickupResponse, DetectedItem
 from schemas.all_schema import (
     ScanResponse, 
+    ScanJobResponse,
     DetectedItem, 
     PickupCreate, 
     PickupResponse, 
@@ -20,10 +27,19 @@ from schemas.all_schema import (
     PickupHistoryDetail, 
     HistoryItem
 )
-from auth.oauth2 import get_current_user
+from auth.oauth2 import get_current_user, get_current_user_async
 from ml_engine.detector import detector
-from utils.supabase_storage import upload_file_to_supabase
+from ml_engine.preprocess import prepare_image
+from utils.supabase_storage import upload_file_to_supabase_async, supabase
+from utils.scan_cache import scan_cache, image_key
+from utils.job_store import scan_jobs, JobQueueFull, TERMINAL_STATES
+from utils.upload_limits import read_upload
+from utils.phash import near_duplicates, PHASH_ENABLED
+from utils.pagination import keyset_page, set_next_cursor, PAGE_MAX_LIMIT
 from utils.sms_utils import send_sms_alert
+from routing.cache import coord_key
+from routing.live_routes import live_routes
+from utils.tile_cache import tile_cache
 
 router = APIRouter(
     prefix="/api/pickups",
@@ -41,6 +57,9 @@ ALLOWED_E_WASTE = {
     "tablet"
 }
 
+# Total time budget for the detector call in one scan (propagated as a deadline)
+SCAN_DEADLINE_SECONDS = float(os.getenv("SCAN_DEADLINE_SECONDS", "15"))
+
 PRICE_LIST = {
     "laptop": 500,
     "cell phone": 300,
@@ -60,14 +79,121 @@ def ensure_dropper_role(user: User):
             detail="Access denied. Only dropper can perform this action."
         )
 
-# --- 1. AI SCANNING ENDPOINT ---
-@router.post("/scan", response_model=ScanResponse)
-async def predict_ewaste(file: UploadFile = File(...),
-                         db: Session = Depends(get_db),
-                         current_user: User = Depends(get_current_user)):
-    # 1. Validate file type
+# --- SCAN PIPELINE (shared by the sync endpoint and async scan jobs) ---
+async def run_scan(contents: memoryview, file_name: str, content_type: str,
+                   deadline: Optional[float] = None, user_id: Optional[int] = None) -> dict:
+    """
+    Cache lookup -> normalise -> near-duplicate lookup -> upload + detect ->
+    map to ScanResponse fields. Raises HTTPException on AI errors.
+    deadline is a time.monotonic() value. contents is the single upload
+    buffer (see utils/upload_limits.read_upload).
+    """
+    if deadline is None:
+        deadline = clock.monotonic() + SCAN_DEADLINE_SECONDS
+
+    # --- Cache Lookup (same photo re-submitted by the same user) ---
+    cache_key = image_key(contents, user_id)
+    cached = await scan_cache.get(cache_key)
+
+    if cached:
+        # Skip both the upload and the AI call
+        uploaded_url = cached["image_url"]
+        detections = cached["detections"]
+    else:
+        # --- Normalise: EXIF rotate, downscale, re-encode ---
+        phash = None
+        try:
+            prepared = await asyncio.to_thread(prepare_image, contents)
+            inference_bytes = prepared.inference_bytes
+            inference_type = prepared.inference_content_type
+            archive_bytes = prepared.archive_bytes
+            archive_type = prepared.archive_content_type
+            base_name = os.path.splitext(file_name or "scan")[0]
+            archive_name = f"{base_name}.{prepared.archive_extension}"
+            phash = prepared.phash
+        except Exception as e:
+            # Unknown format (e.g. HEIC without pillow-heif): send the original as-is
+            print(f"⚠️ Image preprocessing skipped: {e}")
+            inference_bytes = archive_bytes = bytes(contents)
+            inference_type = archive_type = content_type
+            archive_name = file_name
+
+        # --- Near-duplicate Lookup (re-cropped / re-compressed photo of the same device) ---
+        near_match = None
+        if PHASH_ENABLED and phash is not None and user_id is not None:
+            near_match = near_duplicates.find(user_id, phash)
+
+        if near_match:
+            uploaded_url = near_match["image_url"]
+            detections = near_match["detections"]
+            await scan_cache.set(cache_key, near_match)
+        else:
+            # --- Upload to Supabase + AI PREDICTION CALL (run concurrently) ---
+            uploaded_url, detections = await asyncio.gather(
+                upload_file_to_supabase_async(
+                    file_bytes=archive_bytes, 
+                    file_name=archive_name, 
+                    content_type=archive_type
+                ),
+                detector.predict(inference_bytes, content_type=inference_type, deadline=deadline)
+            )
+        
+            # Handle AI Errors (503 breaker open, 504 deadline, 502 upstream error)
+            if isinstance(detections, dict) and "error" in detections:
+                 raise HTTPException(status_code=detections.get("status_code", 502), detail=detections["error"])
+
+            # Only cache complete results (a failed upload should be retried next time)
+            if uploaded_url or supabase is None:
+                result = {"detections": detections, "image_url": uploaded_url}
+                await scan_cache.set(cache_key, result)
+                if phash is not None and user_id is not None:
+                    near_duplicates.add(user_id, phash, result)
+        
+    # MAP RAW DATA TO SCHEMA
+    mapped_items = []
+    total_credits = 0
+
+    for obj in detections:
+        # Extract data from YOLO format
+        item_name = obj.get("class", "unknown")
+
+        if item_name not in ALLOWED_E_WASTE:
+            continue
+
+        confidence = obj.get("confidence", 0.0)
+
+        # Assign Value
+        value = PRICE_LIST.get(item_name.lower(), 10)
+        
+        # Assign Condition
+        condition = ItemConditionEnum.WORKING
+        if confidence < 0.6:
+            condition = ItemConditionEnum.SCRAP
+        elif confidence < 0.8:
+            condition = ItemConditionEnum.REPAIRABLE
+
+        # Create the Pydantic Object
+        detected_item = DetectedItem(
+            item=item_name,
+            condition=condition,
+            estimated_value=value,
+            confidence=confidence
+        )
+        
+        mapped_items.append(detected_item)
+        total_credits += value
+
+    return {
+        "detected_items": mapped_items,
+        "total_estimated_credits": total_credits,
+        "image_url": uploaded_url
+    }
+
+
+async def validate_scan_request(file: UploadFile, db: AsyncSession, current_user: User):
     ensure_dropper_role(current_user)
-    user_profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    result = await db.execute(select(Profile).where(Profile.user_id == current_user.id))
+    user_profile = result.scalars().first()
     
     if not user_profile:
         raise HTTPException(
@@ -77,68 +203,92 @@ async def predict_ewaste(file: UploadFile = File(...),
     
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
+
+
+# --- 1. AI SCANNING ENDPOINT ---
+@router.post("/scan", response_model=ScanResponse)
+async def predict_ewaste(file: UploadFile = File(...),
+                         db: AsyncSession = Depends(get_async_db),
+                         current_user: User = Depends(get_current_user_async)):
+    # 1. Validate role, profile and file type
+    await validate_scan_request(file, db, current_user)
     
     try:
-        # 2. Read and Predict
-        contents = await file.read()
-
-        # --- Upload to Supabase ---
-        uploaded_url = upload_file_to_supabase(
-            file_bytes=contents, 
-            file_name=file.filename, 
-            content_type=file.content_type
-        )
-        
-        # --- AI PREDICTION CALL ---
-        detections = await detector.predict(contents)
-    
-        # 3. Handle AI Errors
-        if isinstance(detections, dict) and "error" in detections:
-             raise HTTPException(status_code=502, detail=detections["error"])
-            
-        # 4. MAP RAW DATA TO SCHEMA
-        mapped_items = []
-        total_credits = 0
+        # 2. Read and Predict (the detector budget starts when the request arrives)
+        deadline = clock.monotonic() + SCAN_DEADLINE_SECONDS
+        contents = await read_upload(file)
+        return await run_scan(contents, file.filename, file.content_type, deadline=deadline, user_id=current_user.id)
 
-        for obj in detections:
-            # Extract data from YOLO format
-            item_name = obj.get("class", "unknown")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
-            if item_name not in ALLOWED_E_WASTE:
-                continue
 
-            confidence = obj.get("confidence", 0.0)
+# --- 1b. ASYNC SCAN MODE (returns a job id immediately) ---
+@router.post("/scan/async", response_model=ScanJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_scan_job(file: UploadFile = File(...),
+                          db: AsyncSession = Depends(get_async_db),
+                          current_user: User = Depends(get_current_user_async)):
+    """
+    Queues the scan on the bounded job pool. Fetch the result from
+    /scan/jobs/{job_id} (polling) or /scan/jobs/{job_id}/events (SSE).
+    """
+    await validate_scan_request(file, db, current_user)
+    contents = await read_upload(file)
+    file_name, content_type, user_id = file.filename, file.content_type, current_user.id
+
+    try:
+        job = scan_jobs.submit(current_user.id, lambda: run_scan(contents, file_name, content_type, user_id=user_id))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
 
-            # Assign Value
-            value = PRICE_LIST.get(item_name.lower(), 10)
-            
-            # Assign Condition
-            condition = ItemConditionEnum.WORKING
-            if confidence < 0.6:
-                condition = ItemConditionEnum.SCRAP
-            elif confidence < 0.8:
-                condition = ItemConditionEnum.REPAIRABLE
-
-            # Create the Pydantic Object
-            detected_item = DetectedItem(
-                item=item_name,
-                condition=condition,
-                estimated_value=value,
-                confidence=confidence
-            )
-            
-            mapped_items.append(detected_item)
-            total_credits += value
-
-        # 5. Return Response
-        return {
-            "detected_items": mapped_items,
-            "total_estimated_credits": total_credits,
-            "image_url": uploaded_url
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+    return job.to_dict()
+
+
+def get_own_job(job_id: str, current_user: User):
+    job = scan_jobs.get(job_id)
+    # Same 404 for "expired" and "not yours" so job ids can't be probed
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Scan job not found or expired.")
+    return job
+
+
+@router.get("/scan/jobs/{job_id}", response_model=ScanJobResponse)
+def get_scan_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return get_own_job(job_id, current_user).to_dict()
+
+
+@router.get("/scan/jobs/{job_id}/events")
+async def stream_scan_job(job_id: str, request: Request,
+                          db: AsyncSession = Depends(get_async_db),
+                          current_user: User = Depends(get_current_user_async)):
+    """
+    Server-Sent Events: one 'status' event per state change, ending with the
+    final result. Sends a keep-alive comment every 15s while waiting.
+    """
+    job = get_own_job(job_id, current_user)
+    # Auth lookup done: don't hold a pool connection for the life of the stream
+    await db.close()
+
+    async def event_stream():
+        while True:
+            seen_status = job.status
+            payload = json.dumps(jsonable_encoder(ScanJobResponse(**job.to_dict())))
+            yield f"event: status\ndata: {payload}\n\n"
+            if seen_status in TERMINAL_STATES:
+                return
+
+            while not await scan_jobs.wait_for_change(job, seen_status, timeout=15):
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # --- 2. BOOKING ENDPOINT ---
@@ -211,6 +361,13 @@ def create_pickup(
 
     db.commit()
 
+    # New stop: slot it into the live collector routes for its day (cheapest
+    # insertion) and drop the cached map tiles it appears on
+    live_routes.add_pickup(
+        new_pickup.id, coord_key(pickup_data.latitude, pickup_data.longitude), pickup_data.pickup_date.date()
+    )
+    tile_cache.invalidate_point(pickup_data.latitude, pickup_data.longitude)
+
     # --- 5. TWILIO NOTIFICATION ---
     try:
         # Construct message components
@@ -255,6 +412,9 @@ def create_pickup(
 # Replaces the old PickupHistoryDetail logic with PickupResponse logic
 @router.get("/history", response_model=List[PickupResponse])
 def get_pickup_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=PAGE_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -269,9 +429,11 @@ def get_pickup_history(
         return []
 
     # FIX: Use .options(joinedload(Pickup.items)) to actually get the items for credit calculation
-    pickups = db.query(Pickup).options(joinedload(Pickup.items)).filter(
+    query = db.query(Pickup).options(joinedload(Pickup.items)).filter(
         Pickup.profile_id == user_profile.id
-    ).order_by(Pickup.id.desc()).limit(10).all()
+    )
+    pickups, next_cursor = keyset_page(query, [Pickup.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
 
     response_list = []
     for p in pickups:
@@ -1,13 +1,14 @@
 # routers/profile_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database.postgresConn import get_db
 from models import all_model
 from schemas import all_schema
 from auth.oauth2 import get_current_user # Assuming you have this auth dependency
+from utils.pagination import keyset_page, set_next_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 router = APIRouter(
     prefix="/api/profiles",
@@ -46,16 +47,25 @@ def get_my_profile(
 # --- READ (Admin: Get All Profiles) ---
 @router.get("/", response_model=List[all_schema.ProfileResponse])
 def get_all_profiles(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    skip: int = Query(0, ge=0, deprecated=True),
     db: Session = Depends(get_db),
     current_user: all_model.User = Depends(get_current_user)
 ):
     """
     Admin only: View leaderboard or all user stats.
     """
+    # OFFSET paging is gone: fail loudly instead of quietly serving page one again
+    if skip:
+        raise HTTPException(status_code=400, detail="'skip' is no longer supported; page with the X-Next-Cursor cursor.")
+
     # TODO: Add check like `if current_user.role != "Collector": raise Forbidden`
-    profiles = db.query(all_model.Profile).offset(skip).limit(limit).all()
+    profiles, next_cursor = keyset_page(
+        db.query(all_model.Profile), [all_model.Profile.id], cursor, limit, descending=False
+    )
+    set_next_cursor(response, next_cursor)
     return profiles
 
 # --- UPDATE (System/Admin: Adjust Balance) ---
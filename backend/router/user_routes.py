@@ -1,8 +1,8 @@
 # router/user_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database.postgresConn import get_db
 # FIX: Import models and schemas with aliases to avoid name collisions
@@ -10,6 +10,7 @@ from models.all_model import User as UserModel
 from schemas.all_schema import UserResponse, UserCreate, TokenData
 from router.profile_routes import create_profile_for_user
 from auth import hashing, oauth2
+from utils.pagination import keyset_page, set_next_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 router = APIRouter(
     prefix="/api/users",
@@ -61,8 +62,14 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
     return user
 
 @router.get("/", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
-    users = db.query(UserModel).all()
+def get_all_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    db: Session = Depends(get_db)
+):
+    users, next_cursor = keyset_page(db.query(UserModel), [UserModel.id], cursor, limit, descending=False)
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.put("/me", response_model=UserResponse)
@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
-from sqlalchemy import desc
 
 from database.postgresConn import get_db
 from models.all_model import Profile, User, UserRole, Transaction, TransactionType
 from schemas.all_schema import TransactionResponse
 from auth.oauth2 import get_current_user
+from utils.pagination import keyset_page, set_next_cursor, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 
 router = APIRouter(
     prefix="/api/wallet",
@@ -162,6 +162,9 @@ def calculate_badge(co2_saved: float) -> str:
 # --- 1. GET TRANSACTION HISTORY ---
 @router.get("/history", response_model=List[TransactionResponse])
 def get_wallet_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -171,9 +174,10 @@ def get_wallet_history(
     if not profile:
         return []
 
-    history = db.query(Transaction).filter(
-        Transaction.profile_id == profile.id
-    ).order_by(desc(Transaction.created_at)).all()
+    # Newest first, keyset on (created_at, id)
+    query = db.query(Transaction).filter(Transaction.profile_id == profile.id)
+    history, next_cursor = keyset_page(query, [Transaction.created_at, Transaction.id], cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     print(f"DEBUG: Found {len(history)} transactions") # DEBUG LOG
     return history
@@ -0,0 +1,173 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Route cache config (override in .env) ---
+ROUTE_TRIP_CACHE_TTL = int(os.getenv("ROUTE_TRIP_CACHE_TTL", "900"))           # 15 min
+ROUTE_TRIP_CACHE_MAX = int(os.getenv("ROUTE_TRIP_CACHE_MAX", "500"))           # trips per worker
+ROUTE_PAIR_CACHE_MAX = int(os.getenv("ROUTE_PAIR_CACHE_MAX", "200000"))        # (from, to) pairs per worker
+ROUTE_UNROUTABLE_TTL = int(os.getenv("ROUTE_UNROUTABLE_TTL", "3600"))          # remember "no road" for 1 h
+ROUTE_START_CELL_DEG = float(os.getenv("ROUTE_START_CELL_DEG", "0.002"))       # ~200 m driver start cells
+COORD_DECIMALS = 5                                                               # ~1 m
+
+
+def coord_key(lat: float, lng: float) -> tuple:
+    return (round(lat, COORD_DECIMALS), round(lng, COORD_DECIMALS))
+
+
+def snap_to_cell(lat: float, lng: float, cell_deg: float = ROUTE_START_CELL_DEG) -> tuple:
+    """
+    Centre of the grid cell the driver is in. Cache key only (OSRM gets the
+    real position), so drivers a few metres apart share one cached trip.
+    """
+    return coord_key(
+        (lat // cell_deg + 0.5) * cell_deg,
+        (lng // cell_deg + 0.5) * cell_deg,
+    )
+
+
+class RouteCache:
+    """
+    1. Trips:  (start cell, sorted stop coordinates) -> OSRM trip response,
+               TTL + LRU, dropped as soon as one of its pickups changes status.
+    2. Pairs:  (from coord, to coord) -> (duration s, distance m) from the
+               OSRM table service. Road times don't depend on which pickups
+               are pending, so they are reused across every trip and solve.
+               Pairs OSRM can't route (null) are kept as (None, None) for
+               unroutable_ttl, so one unreachable stop doesn't force a
+               table call on every refresh.
+    """
+
+    def __init__(self, trip_ttl: int = ROUTE_TRIP_CACHE_TTL, trip_max: int = ROUTE_TRIP_CACHE_MAX,
+                 pair_max: int = ROUTE_PAIR_CACHE_MAX, unroutable_ttl: int = ROUTE_UNROUTABLE_TTL):
+        self.trip_ttl = trip_ttl
+        self.trip_max = trip_max
+        self.pair_max = pair_max
+        self.unroutable_ttl = unroutable_ttl
+
+        self._trips = OrderedDict()     # key -> (stored_at, pickup_ids, value)
+        self._trips_by_pickup = {}      # pickup_id -> {key, ...}
+        self._pairs = OrderedDict()     # (from, to) -> (duration, distance, expires_at or None)
+        self._lock = threading.Lock()   # complete_pickup invalidates from a threadpool worker
+
+        # Metrics
+        self.trip_hits = 0
+        self.trip_misses = 0
+        self.trip_invalidations = 0
+        self.matrix_hits = 0      # every pair of a requested matrix was cached
+        self.matrix_misses = 0
+
+    # --- 1. Trips ---
+    @staticmethod
+    def trip_key(start: tuple, stops: list) -> tuple:
+        return (start, tuple(sorted(stops)))
+
+    def get_trip(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._trips.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.trip_ttl:
+                if entry is not None:
+                    self._drop_trip(key)
+                self.trip_misses += 1
+                return None
+            self._trips.move_to_end(key)
+            self.trip_hits += 1
+            return entry[2]
+
+    def set_trip(self, key: tuple, pickup_ids: list, value: dict):
+        with self._lock:
+            if key in self._trips:
+                self._drop_trip(key)
+            self._trips[key] = (time.monotonic(), tuple(pickup_ids), value)
+            for pickup_id in pickup_ids:
+                self._trips_by_pickup.setdefault(pickup_id, set()).add(key)
+            while len(self._trips) > self.trip_max:
+                self._drop_trip(next(iter(self._trips)))
+
+    def invalidate_pickup(self, pickup_id: int):
+        """A pickup changed status: every cached trip that visits it is stale."""
+        with self._lock:
+            for key in self._trips_by_pickup.pop(pickup_id, set()):
+                if key in self._trips:
+                    self._drop_trip(key)
+                    self.trip_invalidations += 1
+
+    def _drop_trip(self, key: tuple):
+        _, pickup_ids, _ = self._trips.pop(key)
+        for pickup_id in pickup_ids:
+            keys = self._trips_by_pickup.get(pickup_id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._trips_by_pickup[pickup_id]
+
+    # --- 2. Pairs ---
+    def get_pairs(self, coords: list) -> tuple:
+        """
+        Returns (durations, distances) as nested lists for every ordered pair
+        (None where OSRM found no road, like its own table response), or
+        (None, None) if any pair is missing.
+        """
+        n = len(coords)
+        durations = [[0.0] * n for _ in range(n)]
+        distances = [[0.0] * n for _ in range(n)]
+        now = time.monotonic()
+        with self._lock:
+            for i, a in enumerate(coords):
+                for j, b in enumerate(coords):
+                    if i == j:
+                        continue
+                    pair = self._pairs.get((a, b))
+                    if pair is None or (pair[2] is not None and pair[2] <= now):
+                        self.matrix_misses += 1
+                        return None, None
+                    durations[i][j], distances[i][j], _ = pair
+            self.matrix_hits += 1
+        return durations, distances
+
+    def pair_duration(self, a: tuple, b: tuple) -> Optional[float]:
+        """
+        Cached road seconds a -> b, or None if not cached / unroutable
+        (single lookups don't count towards the hit rate).
+        """
+        pair = self._pairs.get((a, b))
+        return pair[0] if pair is not None else None
+
+    def set_pairs(self, coords: list, durations: list, distances: list):
+        unroutable_until = time.monotonic() + self.unroutable_ttl
+        with self._lock:
+            for i, a in enumerate(coords):
+                for j, b in enumerate(coords):
+                    if i == j:
+                        continue
+                    if durations[i][j] is None:
+                        self._pairs[(a, b)] = (None, None, unroutable_until)
+                    else:
+                        self._pairs[(a, b)] = (durations[i][j], distances[i][j], None)
+                    self._pairs.move_to_end((a, b))
+            while len(self._pairs) > self.pair_max:
+                self._pairs.popitem(last=False)
+
+    def stats(self) -> dict:
+        trip_lookups = self.trip_hits + self.trip_misses
+        matrix_lookups = self.matrix_hits + self.matrix_misses
+        return {
+            "trips_cached": len(self._trips),
+            "trip_hits": self.trip_hits,
+            "trip_misses": self.trip_misses,
+            "trip_hit_rate": round(self.trip_hits / trip_lookups, 3) if trip_lookups else 0.0,
+            "trip_invalidations": self.trip_invalidations,
+            "pairs_cached": len(self._pairs),
+            "matrix_hits": self.matrix_hits,
+            "matrix_misses": self.matrix_misses,
+            "matrix_hit_rate": round(self.matrix_hits / matrix_lookups, 3) if matrix_lookups else 0.0,
+        }
+
+
+# Shared instance: optimize-route reads it, pickup status changes invalidate it
+route_cache = RouteCache()
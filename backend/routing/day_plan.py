@@ -0,0 +1,122 @@
+import asyncio
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast
+from geoalchemy2 import Geometry
+
+from models.all_model import Pickup, PickupItem, PickupStatus
+from routing.vrp import solve_vrp, Vehicle, Stop, timeslot_window, clock_to_seconds, seconds_to_clock, VRP_SHIFT_START, VRP_SHIFT_END
+from routing.solver import estimated_road_matrix, estimated_duration
+from routing.osrm import osrm, OsrmError, OSRM_TABLE_MAX
+from routing.cache import coord_key
+
+# Plain lat/lng floats out of the geography column (no WKB decoding in Python)
+_LOCATION_POINT = cast(Pickup.location, Geometry(geometry_type="POINT", srid=4326, spatial_index=False))
+
+
+async def fetch_day_pickups(db: AsyncSession, pickup_date) -> list:
+    """
+    Scheduled pickups of one day as rows of id / address_text / timeslot /
+    lat / lng / items / credits, in one query (items counted in SQL).
+    """
+    query = (
+        select(
+            Pickup.id, Pickup.address_text, Pickup.timeslot,
+            func.ST_Y(_LOCATION_POINT).label("lat"),
+            func.ST_X(_LOCATION_POINT).label("lng"),
+            func.count(PickupItem.id).label("items"),
+            func.coalesce(func.sum(PickupItem.credit_value), 0).label("credits"),
+        )
+        .outerjoin(PickupItem, PickupItem.pickup_id == Pickup.id)
+        .where(
+            Pickup.status == PickupStatus.SCHEDULED,
+            Pickup.pickup_date == pickup_date,
+            Pickup.location.isnot(None),
+        )
+        .group_by(Pickup.id)
+        .order_by(Pickup.id)
+    )
+    return (await db.execute(query)).all()
+
+
+async def solve_day_plan(drivers: list, pickups: list, time_budget_ms: float) -> dict:
+    """
+    Runs routing/vrp.py over the day's pickups. Travel times are OSRM road
+    durations when the whole day fits in one table call, else estimates.
+    """
+    shift = (clock_to_seconds(VRP_SHIFT_START), clock_to_seconds(VRP_SHIFT_END))
+    vehicles = [Vehicle(d.latitude, d.longitude, d.capacity, d.name) for d in drivers]
+    stops = [
+        Stop(p.id, p.lat, p.lng, max(p.items, 1), timeslot_window(p.timeslot, shift))
+        for p in pickups
+    ]
+    points = [(v.latitude, v.longitude) for v in vehicles] + [(s.latitude, s.longitude) for s in stops]
+
+    travel = distance = None
+    matrix_source = "estimated"
+    if len(points) <= OSRM_TABLE_MAX:
+        try:
+            durations, distances = await osrm.matrix([coord_key(lat, lng) for lat, lng in points])
+            # Unroutable pairs come back as null: fall back to the estimate for those
+            estimate = estimated_road_matrix(points)
+            distance = np.array(distances, dtype=np.float64)
+            travel = np.array(durations, dtype=np.float64)
+            distance = np.where(np.isnan(distance), estimate, distance)
+            travel = np.where(np.isnan(travel), estimated_duration(estimate), travel)
+            matrix_source = "osrm"
+        except OsrmError as e:
+            print(f"⚠️ Road matrix unavailable, using estimates: {e}")
+
+    # CPU-bound for up to the time budget: keep it off the event loop
+    solution = await asyncio.to_thread(solve_vrp, vehicles, stops, travel, distance, time_budget_ms)
+
+    routes = []
+    for route in solution.routes:
+        vehicle = vehicles[route.vehicle]
+        ordered = [pickups[i] for i in route.stops]
+        path = ([[vehicle.longitude, vehicle.latitude]] + [[p.lng, p.lat] for p in ordered]
+                + [[vehicle.longitude, vehicle.latitude]])
+        routes.append({
+            "driver": vehicle.name or f"Driver {route.vehicle + 1}",
+            "capacity": vehicle.capacity,
+            "load": route.load,
+            "route_geometry": {"type": "LineString", "coordinates": path} if ordered else None,
+            "stops": [
+                format_day_stop(p, order, arrival)
+                for order, (p, arrival) in enumerate(zip(ordered, route.arrivals), start=1)
+            ],
+            "total_distance": route.distance_m,
+            "total_duration": route.travel_seconds,
+            "return_time": seconds_to_clock(route.end_seconds) if ordered else None,
+        })
+
+    return {
+        "routes": routes,
+        "unassigned": [format_day_stop(pickups[i]) for i in solution.unassigned],
+        "total_distance": sum(r["total_distance"] for r in routes),
+        "total_duration": solution.travel_seconds,
+        "matrix": matrix_source,
+        "solver": {
+            "initial_duration": solution.initial_travel_seconds,
+            "lower_bound": solution.lower_bound_seconds,
+            # Share of the drive time that might still be optimised away (upper bound)
+            "gap": round(1 - solution.lower_bound_seconds / solution.travel_seconds, 4) if solution.travel_seconds else 0.0,
+            "improvements": solution.improvements,
+            "elapsed_ms": round(solution.elapsed_ms, 1),
+            "converged": solution.converged,
+        },
+    }
+
+
+def format_day_stop(p, order=None, arrival=None):
+    return {
+        "id": p.id,
+        "address": p.address_text,
+        "lat": p.lat,
+        "lng": p.lng,
+        "timeslot": p.timeslot,
+        "items": p.items,
+        "credits": p.credits,
+        "order": order,
+        "arrival": seconds_to_clock(arrival) if arrival is not None else None,
+    }
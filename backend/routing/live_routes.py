@@ -0,0 +1,221 @@
+import os
+import math
+import time
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Optional
+from dotenv import load_dotenv
+
+from routing.cache import route_cache, RouteCache
+from routing.solver import haversine_m, estimated_duration, ROUTE_DETOUR_FACTOR
+
+load_dotenv()
+
+# --- Live route config (override in .env) ---
+ROUTE_REPLAN_THRESHOLD = float(os.getenv("ROUTE_REPLAN_THRESHOLD", "0.15"))     # 15% worse than expected -> full solve
+ROUTE_REPLAN_MAX_EDITS = float(os.getenv("ROUTE_REPLAN_MAX_EDITS", "0.5"))      # edits per planned stop before a full solve
+ROUTE_REPLAN_MIN_STOPS = int(os.getenv("ROUTE_REPLAN_MIN_STOPS", "4"))          # tiny routes: always solve fully
+LIVE_ROUTE_IDLE_HOURS = float(os.getenv("LIVE_ROUTE_IDLE_HOURS", "12"))         # not refreshed for this long = shift over
+
+
+@dataclass
+class LiveRoute:
+    """
+    A collector's current round trip: `start` (snapped driver cell), then
+    `stops` [(pickup_id, coord), ...] in visiting order, back to start.
+    `cost` is in seconds; `baseline_*` describe the last full solve.
+    """
+    start: tuple
+    radius_km: float
+    stops: list
+    cost: float
+    baseline_cost: float
+    baseline_stops: int
+    edits: int = 0
+    touched_at: float = 0.0
+
+
+class LiveRouteStore:
+    """
+    1. (collector_id, pickup_date) -> LiveRoute, kept after every full
+       solve (or seeded from the nightly pre-computed plan). pickup_date is
+       the day the route serves, None for a route over every scheduled
+       pickup; it never rolls over with the clock. Routes nobody refreshed
+       for LIVE_ROUTE_IDLE_HOURS are dropped.
+    2. Bookings / completions / refreshes patch it in O(n): cheapest
+       insertion for a new stop, splice-out for a finished one, and a moved
+       driver is re-inserted into the cycle as just another node.
+    3. Costs come from the road pair cache (OSRM durations), falling back
+       to the haversine estimate for pairs never fetched.
+    4. needs_replan() asks for a full solve once the patched route is
+       ROUTE_REPLAN_THRESHOLD worse than the last solve predicts for its
+       size (tour length grows ~ sqrt(stops)), or after too many edits.
+    """
+
+    def __init__(self, cache: RouteCache = route_cache):
+        self.cache = cache
+        self._routes = {}              # (collector_id, pickup_date or None) -> LiveRoute
+        self._lock = threading.Lock()  # create/complete_pickup patch from threadpool workers
+
+        # Metrics
+        self.full_solves = 0
+        self.seeded_from_plans = 0     # started from a nightly pre-computed route
+        self.incremental_updates = 0
+        self.inserts = 0
+        self.removals = 0
+        self.replans = 0               # full solves forced by needs_replan()
+
+    # --- costs ---
+    def cost(self, a: tuple, b: tuple) -> float:
+        if a == b:
+            return 0.0
+        cached = self.cache.pair_duration(a, b)
+        if cached is not None:
+            return cached
+        return estimated_duration(haversine_m(a, b) * ROUTE_DETOUR_FACTOR)
+
+    def tour_cost(self, start: tuple, coords: list) -> float:
+        cycle = [start] + coords + [start]
+        return sum(self.cost(a, b) for a, b in zip(cycle[:-1], cycle[1:]))
+
+    # --- 1. Full solves ---
+    def get(self, collector_id: int, day: Optional[date]) -> Optional[LiveRoute]:
+        return self._routes.get((collector_id, day))
+
+    def record(self, collector_id: int, day: Optional[date], start: tuple, radius_km: float, stops: list,
+               precomputed: bool = False) -> LiveRoute:
+        """Stores a solved route; stops = [(pickup_id, coord)] in visiting order."""
+        cost = self.tour_cost(start, [coord for _, coord in stops])
+        now = time.time()
+        route = LiveRoute(start, radius_km, list(stops), cost, cost, len(stops), touched_at=now)
+        with self._lock:
+            # Finished shifts are never read again
+            idle_before = now - LIVE_ROUTE_IDLE_HOURS * 3600
+            for key in [key for key, old in self._routes.items() if old.touched_at < idle_before]:
+                del self._routes[key]
+            self._routes[(collector_id, day)] = route
+            if precomputed:
+                self.seeded_from_plans += 1
+            else:
+                self.full_solves += 1
+        return route
+
+    # --- 2. Incremental edits (caller holds the lock) ---
+    def _insert(self, route: LiveRoute, pickup_id: int, coord: tuple):
+        cycle = [route.start] + [c for _, c in route.stops]
+        best_delta, best_position = math.inf, 0
+        for i, a in enumerate(cycle):
+            b = cycle[(i + 1) % len(cycle)]
+            delta = self.cost(a, coord) + self.cost(coord, b) - self.cost(a, b)
+            if delta < best_delta:
+                best_delta, best_position = delta, i
+        route.stops.insert(best_position, (pickup_id, coord))
+        route.cost += best_delta
+        route.edits += 1
+        self.inserts += 1
+
+    def _remove(self, route: LiveRoute, pickup_id: int) -> bool:
+        for i, (stop_id, coord) in enumerate(route.stops):
+            if stop_id == pickup_id:
+                prev = route.stops[i - 1][1] if i > 0 else route.start
+                nxt = route.stops[i + 1][1] if i + 1 < len(route.stops) else route.start
+                route.cost -= self.cost(prev, coord) + self.cost(coord, nxt) - self.cost(prev, nxt)
+                del route.stops[i]
+                route.edits += 1
+                self.removals += 1
+                return True
+        return False
+
+    def _move_start(self, route: LiveRoute, start: tuple):
+        """Driver moved: splice the old start out of the cycle, insert the new one, rotate."""
+        if route.stops:
+            first, last = route.stops[0][1], route.stops[-1][1]
+            route.cost -= self.cost(last, route.start) + self.cost(route.start, first) - self.cost(last, first)
+            coords = [c for _, c in route.stops]
+            best_delta, best_position = math.inf, 0
+            for i, a in enumerate(coords):
+                b = coords[(i + 1) % len(coords)]
+                delta = self.cost(a, start) + self.cost(start, b) - self.cost(a, b)
+                if delta < best_delta:
+                    best_delta, best_position = delta, i
+            route.stops = route.stops[best_position + 1:] + route.stops[:best_position + 1]
+            route.cost += best_delta
+        # Not counted as an edit: the driver moves on every refresh, the cost check covers it
+        route.start = start
+
+    def needs_replan(self, route: LiveRoute) -> bool:
+        stops = len(route.stops)
+        if stops < ROUTE_REPLAN_MIN_STOPS or route.baseline_stops < ROUTE_REPLAN_MIN_STOPS:
+            return True
+        if route.edits > ROUTE_REPLAN_MAX_EDITS * route.baseline_stops:
+            return True
+        expected = route.baseline_cost * math.sqrt(stops / route.baseline_stops)
+        return route.cost > expected * (1 + ROUTE_REPLAN_THRESHOLD)
+
+    # --- 3. Entry points ---
+    def sync(self, collector_id: int, day: Optional[date], start: tuple, radius_km: float,
+             current: dict) -> Optional[LiveRoute]:
+        """
+        Brings the stored route in line with a refresh: `current` maps
+        pickup_id -> coord of every stop that should be on the route.
+        Returns a snapshot of the patched route, or None when a full solve
+        is needed.
+        """
+        with self._lock:
+            route = self._routes.get((collector_id, day))
+            if route is None:
+                return None
+
+            for pickup_id in [stop_id for stop_id, _ in route.stops if stop_id not in current]:
+                self._remove(route, pickup_id)
+            if start != route.start:
+                self._move_start(route, start)
+            planned = {stop_id for stop_id, _ in route.stops}
+            for pickup_id, coord in current.items():
+                if pickup_id not in planned:
+                    self._insert(route, pickup_id, coord)
+            route.radius_km = radius_km
+            route.touched_at = time.time()
+
+            if self.needs_replan(route):
+                self.replans += 1
+                return None
+            self.incremental_updates += 1
+            # Bookings may patch the stored route while the caller is still using it
+            return replace(route, stops=list(route.stops))
+
+    def add_pickup(self, pickup_id: int, coord: tuple, pickup_date: Optional[date]):
+        """
+        New booking: slot it into every live route for its day (or over
+        every day) whose search radius covers it.
+        """
+        with self._lock:
+            for (_, day), route in self._routes.items():
+                if day is not None and day != pickup_date:
+                    continue
+                if haversine_m(route.start, coord) <= route.radius_km * 1000:
+                    self._insert(route, pickup_id, coord)
+
+    def remove_pickup(self, pickup_id: int):
+        """Pickup collected / cancelled: splice it out of every live route."""
+        with self._lock:
+            for route in self._routes.values():
+                self._remove(route, pickup_id)
+
+    def stats(self) -> dict:
+        solves = self.full_solves + self.incremental_updates
+        return {
+            "live_routes": len(self._routes),
+            "full_solves": self.full_solves,
+            "seeded_from_plans": self.seeded_from_plans,
+            "incremental_updates": self.incremental_updates,
+            "incremental_rate": round(self.incremental_updates / solves, 3) if solves else 0.0,
+            "replans": self.replans,
+            "stops_inserted": self.inserts,
+            "stops_removed": self.removals,
+        }
+
+
+# Shared instance: optimize-route reads/records it, bookings and completions patch it
+live_routes = LiveRouteStore()
@@ -0,0 +1,150 @@
+import os
+import time
+from typing import Optional
+import httpx
+from dotenv import load_dotenv
+
+from routing.cache import route_cache, RouteCache, snap_to_cell
+from utils.metrics import LatencyWindow
+
+load_dotenv()
+
+# --- OSRM (override in .env; point OSRM_BASE_URL at a self-hosted container in production) ---
+OSRM_BASE_URL = os.getenv("OSRM_BASE_URL", "http://router.project-osrm.org").rstrip("/")
+OSRM_PROFILE = os.getenv("OSRM_PROFILE", "driving")
+OSRM_TIMEOUT = float(os.getenv("OSRM_TIMEOUT", "15"))
+OSRM_TABLE_MAX = int(os.getenv("OSRM_TABLE_MAX", "100"))   # osrm-routed --max-table-size (demo server: 100)
+
+
+class OsrmError(Exception):
+    """OSRM could not be reached or returned a non-Ok response."""
+
+
+def _coords_string(coords: list) -> str:
+    # OSRM wants lng,lat
+    return ";".join(f"{lng},{lat}" for lat, lng in coords)
+
+
+class OsrmClient:
+    """
+    Long-lived pooled client for the OSRM trip and table services, in front
+    of the route cache. Records upstream latency and failures.
+    """
+
+    def __init__(self, base_url: str = OSRM_BASE_URL, cache: RouteCache = route_cache):
+        self.base_url = base_url
+        self.cache = cache
+        self.client: Optional[httpx.AsyncClient] = None
+
+        # Metrics
+        self.trip_latency = LatencyWindow()
+        self.table_latency = LatencyWindow()
+        self.upstream_errors = 0
+
+    async def startup(self):
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=OSRM_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        print(f"✅ OSRM client ready ({self.base_url})")
+
+    async def shutdown(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _get(self, path: str, params: dict, latency: LatencyWindow) -> dict:
+        if self.client is None:
+            # Used outside the app lifespan (scripts): open the client lazily
+            await self.startup()
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(path, params=params)
+        except httpx.HTTPError as e:
+            self.upstream_errors += 1
+            raise OsrmError(f"OSRM unreachable: {type(e).__name__}") from e
+        latency.add((time.perf_counter() - started) * 1000)
+
+        if response.status_code != 200:
+            self.upstream_errors += 1
+            raise OsrmError(f"OSRM returned HTTP {response.status_code}")
+        data = response.json()
+        if data.get("code") != "Ok":
+            self.upstream_errors += 1
+            raise OsrmError(f"OSRM returned code {data.get('code')}")
+        return data
+
+    async def trip(self, start: tuple, stops: list, pickup_ids: list) -> dict:
+        """
+        Round trip from the driver's real position `start` through `stops`
+        ((lat, lng) tuples, already in canonical sorted order so cached
+        waypoint indices stay valid). Cached under the start's grid cell.
+        """
+        key = self.cache.trip_key(snap_to_cell(*start), stops)
+        cached = self.cache.get_trip(key)
+        if cached is not None:
+            return cached
+
+        data = await self._get(
+            f"/trip/v1/{OSRM_PROFILE}/{_coords_string([start] + stops)}",
+            {"source": "first", "overview": "full", "geometries": "geojson"},
+            self.trip_latency,
+        )
+        self.cache.set_trip(key, pickup_ids, data)
+        return data
+
+    async def route(self, start: tuple, stops: list, pickup_ids: list) -> dict:
+        """
+        Road geometry for a round trip from the driver's real position
+        `start` visiting `stops` in the given order (no re-ordering by OSRM).
+        Shares the trip cache (keyed by the start's grid cell) and its
+        invalidation.
+        """
+        key = ("route", snap_to_cell(*start), tuple(stops))
+        cached = self.cache.get_trip(key)
+        if cached is not None:
+            return cached
+
+        data = await self._get(
+            f"/route/v1/{OSRM_PROFILE}/{_coords_string([start] + stops + [start])}",
+            {"overview": "full", "geometries": "geojson"},
+            self.trip_latency,
+        )
+        self.cache.set_trip(key, pickup_ids, data)
+        return data
+
+    async def matrix(self, coords: list) -> tuple:
+        """
+        (durations s, distances m) between every pair of `coords`, from the
+        pair cache when possible, otherwise one table call. Raises OsrmError
+        if the table is too large for the server or OSRM fails.
+        """
+        durations, distances = self.cache.get_pairs(coords)
+        if durations is not None:
+            return durations, distances
+
+        if len(coords) > OSRM_TABLE_MAX:
+            raise OsrmError(f"{len(coords)} points exceed OSRM_TABLE_MAX={OSRM_TABLE_MAX}")
+
+        data = await self._get(
+            f"/table/v1/{OSRM_PROFILE}/{_coords_string(coords)}",
+            {"annotations": "duration,distance"},
+            self.table_latency,
+        )
+        self.cache.set_pairs(coords, data["durations"], data["distances"])
+        return data["durations"], data["distances"]
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "upstream_errors": self.upstream_errors,
+            **self.trip_latency.summary("trip_upstream"),
+            **self.table_latency.summary("table_upstream"),
+            **self.cache.stats(),
+        }
+
+
+# Shared instance, opened/closed in main.py's lifespan
+osrm = OsrmClient()
@@ -0,0 +1,179 @@
+import os
+import time
+import asyncio
+from datetime import datetime, date, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+from database.postgresConn import async_engine, AsyncSessionLocal
+from models.all_model import RoutePlan
+from routing.vrp import Vehicle, VRP_DEFAULT_CAPACITY, VRP_MAX_TIME_BUDGET_MS
+from routing.day_plan import fetch_day_pickups, solve_day_plan
+
+load_dotenv()
+
+# --- Nightly route pre-computation (override in .env) ---
+ROUTE_PRECOMPUTE_ENABLED = os.getenv("ROUTE_PRECOMPUTE_ENABLED", "true").lower() == "true"
+ROUTE_PRECOMPUTE_AT = os.getenv("ROUTE_PRECOMPUTE_AT", "02:00")                 # server local time
+ROUTE_PRECOMPUTE_DAYS = int(os.getenv("ROUTE_PRECOMPUTE_DAYS", "1"))            # tomorrow (+ following days)
+ROUTE_PRECOMPUTE_DRIVERS = int(os.getenv("ROUTE_PRECOMPUTE_DRIVERS", "1"))
+ROUTE_PRECOMPUTE_CAPACITY = int(os.getenv("ROUTE_PRECOMPUTE_CAPACITY", str(VRP_DEFAULT_CAPACITY)))
+ROUTE_PRECOMPUTE_TIME_BUDGET_MS = float(os.getenv("ROUTE_PRECOMPUTE_TIME_BUDGET_MS", str(VRP_MAX_TIME_BUDGET_MS)))
+# Where the vans leave from; unset = the centre of the day's pickups
+ROUTE_DEPOT_LAT = os.getenv("ROUTE_DEPOT_LAT")
+ROUTE_DEPOT_LNG = os.getenv("ROUTE_DEPOT_LNG")
+
+# pg_advisory_lock key: one precompute run across every worker / replica
+ADVISORY_LOCK_KEY = 0x45_44_52_4F_50   # "EDROP"
+
+
+def seconds_until(clock: str, now: Optional[datetime] = None) -> float:
+    """Seconds from `now` to the next HH:MM (today if still ahead, else tomorrow)."""
+    now = now or datetime.now()
+    hours, minutes = (int(part) for part in clock.split(":"))
+    target = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class RoutePrecomputer:
+    """
+    Background task started in main.py's lifespan. Every night at
+    ROUTE_PRECOMPUTE_AT it plans the next ROUTE_PRECOMPUTE_DAYS days of
+    scheduled pickups (routing/vrp.py) and upserts them into route_plans.
+
+    Every worker runs the timer; a Postgres advisory lock lets exactly one
+    of them do the work, and dates already planned today are skipped, so a
+    worker that wakes late doesn't repeat the run.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.skipped_locked = 0
+        self.failures = 0
+        self.last_run: Optional[dict] = None
+
+    async def startup(self):
+        if not ROUTE_PRECOMPUTE_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+        print(f"✅ Route precompute scheduled daily at {ROUTE_PRECOMPUTE_AT}")
+
+    async def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(seconds_until(ROUTE_PRECOMPUTE_AT))
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Route precompute failed: {e}")
+
+    async def run_once(self, force: bool = False) -> Optional[dict]:
+        """Plans the coming days if this worker wins the advisory lock. Returns the run summary."""
+        async with async_engine.connect() as lock_conn:
+            # Transaction-scoped lock: held while this transaction stays open,
+            # released on rollback, and safe behind pgbouncer's transaction pooling
+            locked = (await lock_conn.execute(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_KEY)))).scalar()
+            if not locked:
+                self.skipped_locked += 1
+                print("⚠️ Route precompute already running on another worker, skipping")
+                return None
+            try:
+                return await self._plan_days(force)
+            finally:
+                await lock_conn.rollback()
+
+    async def _plan_days(self, force: bool) -> dict:
+        started = time.perf_counter()
+        started_at = datetime.now()
+        tomorrow = date.today() + timedelta(days=1)
+        summary = {"started_at": started_at.isoformat(timespec="seconds"), "dates": []}
+
+        for offset in range(ROUTE_PRECOMPUTE_DAYS):
+            pickup_date = tomorrow + timedelta(days=offset)
+            async with AsyncSessionLocal() as db:
+                if not force and await self._planned_today(db, pickup_date):
+                    summary["dates"].append({"pickup_date": pickup_date.isoformat(), "skipped": True})
+                    continue
+
+                pickups = await fetch_day_pickups(db, pickup_date)
+                if not pickups:
+                    summary["dates"].append({"pickup_date": pickup_date.isoformat(), "stops_planned": 0})
+                    continue
+
+                plan = await solve_day_plan(self._fleet(pickups), pickups, ROUTE_PRECOMPUTE_TIME_BUDGET_MS)
+                stops_planned = sum(len(route["stops"]) for route in plan["routes"])
+                row = {
+                    "pickup_date": pickup_date,
+                    "plan": plan,
+                    "stops_planned": stops_planned,
+                    "stops_unassigned": len(plan["unassigned"]),
+                    "solver_gap": plan["solver"]["gap"],
+                    "solve_ms": plan["solver"]["elapsed_ms"],
+                }
+                upsert = insert(RoutePlan).values(**row)
+                await db.execute(upsert.on_conflict_do_update(
+                    index_elements=[RoutePlan.pickup_date],
+                    set_={**{key: upsert.excluded[key] for key in row if key != "pickup_date"},
+                          "created_at": func.now()},
+                ))
+                await db.commit()
+
+                summary["dates"].append({
+                    "pickup_date": pickup_date.isoformat(),
+                    "stops_planned": stops_planned,
+                    "stops_unassigned": row["stops_unassigned"],
+                    "solver_gap": row["solver_gap"],
+                    "solve_ms": row["solve_ms"],
+                })
+
+        summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        summary["stops_planned"] = sum(d.get("stops_planned", 0) for d in summary["dates"])
+        self.runs += 1
+        self.last_run = summary
+        print(f"✅ Route precompute: {summary['stops_planned']} stops in {summary['duration_ms']} ms")
+        return summary
+
+    @staticmethod
+    async def _planned_today(db, pickup_date: date) -> bool:
+        created_at = (await db.execute(
+            select(RoutePlan.created_at).where(RoutePlan.pickup_date == pickup_date)
+        )).scalar_one_or_none()
+        return created_at is not None and created_at.astimezone().date() == date.today()
+
+    @staticmethod
+    def _fleet(pickups: list) -> list:
+        if ROUTE_DEPOT_LAT and ROUTE_DEPOT_LNG:
+            depot = (float(ROUTE_DEPOT_LAT), float(ROUTE_DEPOT_LNG))
+        else:
+            depot = (sum(p.lat for p in pickups) / len(pickups), sum(p.lng for p in pickups) / len(pickups))
+        return [
+            Vehicle(depot[0], depot[1], ROUTE_PRECOMPUTE_CAPACITY, f"Van {i + 1}")
+            for i in range(ROUTE_PRECOMPUTE_DRIVERS)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ROUTE_PRECOMPUTE_ENABLED,
+            "runs_at": ROUTE_PRECOMPUTE_AT,
+            "runs": self.runs,
+            "skipped_locked": self.skipped_locked,
+            "failures": self.failures,
+            "last_run": self.last_run,
+        }
+
+
+# Shared instance, started/stopped in main.py's lifespan
+route_precomputer = RoutePrecomputer()
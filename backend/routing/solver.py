@@ -0,0 +1,195 @@
+import os
+import math
+import time
+from dataclasses import dataclass
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Solver config (override in .env) ---
+ROUTE_SOLVER_TIME_BUDGET_MS = float(os.getenv("ROUTE_SOLVER_TIME_BUDGET_MS", "300"))
+ROUTE_DETOUR_FACTOR = float(os.getenv("ROUTE_DETOUR_FACTOR", "1.3"))   # road metres per straight-line metre
+ROUTE_AVG_SPEED_KMH = float(os.getenv("ROUTE_AVG_SPEED_KMH", "25"))    # city driving incl. stops
+
+EARTH_RADIUS_M = 6_371_008.8
+OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+EPSILON = 1e-6
+
+
+# ==========================================
+# 1. DISTANCE MATRIX
+# ==========================================
+
+def haversine_matrix(points) -> np.ndarray:
+    """(n, 2) array of (lat, lng) in degrees -> (n, n) great-circle metres."""
+    rad = np.radians(np.asarray(points, dtype=np.float64))
+    lat = rad[:, 0][:, None]
+    lng = rad[:, 1][:, None]
+    a = (np.sin((lat - lat.T) / 2) ** 2
+         + np.cos(lat) * np.cos(lat.T) * np.sin((lng - lng.T) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_m(a: tuple, b: tuple) -> float:
+    """Great-circle metres between two (lat, lng) points, without numpy overhead."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(h, 1.0)))
+
+
+def estimated_road_matrix(points) -> np.ndarray:
+    """Haversine scaled by ROUTE_DETOUR_FACTOR: a stand-in for road distance."""
+    return haversine_matrix(points) * ROUTE_DETOUR_FACTOR
+
+
+def estimated_duration(distance_m: float) -> float:
+    """Seconds at ROUTE_AVG_SPEED_KMH."""
+    return distance_m / (ROUTE_AVG_SPEED_KMH * 1000 / 3600)
+
+
+# ==========================================
+# 2. SOLVER
+# ==========================================
+
+@dataclass
+class RouteSolution:
+    order: list               # matrix indices in visiting order, start (0) excluded
+    distance: float           # same unit as the matrix
+    initial_distance: float   # nearest-neighbour tour, before local search
+    improvements: int
+    elapsed_ms: float
+    converged: bool           # False = stopped by the time budget
+
+
+def tour_length(tour: np.ndarray, dist: np.ndarray, roundtrip: bool) -> float:
+    length = float(dist[tour[:-1], tour[1:]].sum())
+    if roundtrip and len(tour) > 1:
+        length += float(dist[tour[-1], tour[0]])
+    return length
+
+
+def nearest_neighbour(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    tour = np.empty(n, dtype=np.int64)
+    tour[0] = current = start
+    visited[start] = True
+    for position in range(1, n):
+        current = int(np.where(visited, np.inf, dist[current]).argmin())
+        tour[position] = current
+        visited[current] = True
+    return tour
+
+
+def _two_opt_pass(tour: np.ndarray, dist: np.ndarray, roundtrip: bool, deadline: float) -> int:
+    """
+    One sweep of 2-opt (reverse tour[i+1..j]), best move per i, vectorised
+    over j. Position 0 is the driver and never moves. Returns moves applied.
+    """
+    m = len(tour)
+    moves = 0
+    for i in range(m - 2):
+        if time.perf_counter() > deadline:
+            break
+        a, b = tour[i], tour[i + 1]
+        js = np.arange(i + 2, m)
+        c = tour[js]
+        has_next = js + 1 < m
+        nxt = np.where(has_next, tour[np.minimum(js + 1, m - 1)], tour[0])
+
+        # Open path: the last stop has no outgoing edge to replace
+        closing = has_next | roundtrip
+        delta = dist[a, c] - dist[a, b] + np.where(closing, dist[b, nxt] - dist[c, nxt], 0.0)
+
+        best = int(delta.argmin())
+        if delta[best] < -EPSILON:
+            j = int(js[best])
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+            moves += 1
+    return moves
+
+
+def _or_opt_pass(tour: np.ndarray, dist: np.ndarray, roundtrip: bool, deadline: float):
+    """
+    One sweep of Or-opt: move a run of 1-3 consecutive stops (optionally
+    reversed) to the cheapest other place in the tour. Returns (tour, moves).
+    """
+    moves = 0
+    for length in OR_OPT_SEGMENT_LENGTHS:
+        i = 1
+        while i + length <= len(tour):
+            if time.perf_counter() > deadline:
+                return tour, moves
+
+            segment = tour[i:i + length]
+            first, last = segment[0], segment[-1]
+            prev = tour[i - 1]
+            if i + length < len(tour):
+                nxt = tour[i + length]
+                removal_gain = dist[prev, first] + dist[last, nxt] - dist[prev, nxt]
+            elif roundtrip:
+                nxt = tour[0]
+                removal_gain = dist[prev, first] + dist[last, nxt] - dist[prev, nxt]
+            else:
+                removal_gain = dist[prev, first]
+
+            rest = np.concatenate((tour[:i], tour[i + length:]))
+            u = rest
+            v = np.append(rest[1:], rest[0])
+            edge = dist[u, v]
+            if not roundtrip:
+                # Appending after the last stop costs only the way in
+                edge[-1] = 0.0
+                forward = dist[u, first] + np.where(np.arange(len(u)) < len(u) - 1, dist[last, v], 0.0) - edge
+                backward = dist[u, last] + np.where(np.arange(len(u)) < len(u) - 1, dist[first, v], 0.0) - edge
+            else:
+                forward = dist[u, first] + dist[last, v] - edge
+                backward = dist[u, last] + dist[first, v] - edge
+
+            best_f, best_b = int(forward.argmin()), int(backward.argmin())
+            reverse = backward[best_b] < forward[best_f]
+            best = best_b if reverse else best_f
+            insert_cost = backward[best] if reverse else forward[best]
+
+            if insert_cost - removal_gain < -EPSILON:
+                moved = segment[::-1] if reverse else segment
+                tour = np.concatenate((rest[:best + 1], moved, rest[best + 1:]))
+                moves += 1
+            else:
+                i += 1
+    return tour, moves
+
+
+def solve_route(dist: np.ndarray, roundtrip: bool = True,
+                time_budget_ms: float = ROUTE_SOLVER_TIME_BUDGET_MS) -> RouteSolution:
+    """
+    Visiting order for matrix index 0 (the driver) + every other index:
+    nearest-neighbour construction, then 2-opt and Or-opt until no move
+    improves or the time budget runs out. 2-opt assumes a symmetric matrix;
+    asymmetric (road) matrices should be symmetrised by the caller.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    dist = np.asarray(dist, dtype=np.float64)
+
+    tour = nearest_neighbour(dist)
+    initial = tour_length(tour, dist, roundtrip)
+
+    improvements = 0
+    converged = len(tour) <= 3
+    while not converged and time.perf_counter() < deadline:
+        moves = _two_opt_pass(tour, dist, roundtrip, deadline)
+        tour, or_moves = _or_opt_pass(tour, dist, roundtrip, deadline)
+        improvements += moves + or_moves
+        converged = moves + or_moves == 0
+
+    return RouteSolution(
+        order=[int(node) for node in tour[1:]],
+        distance=tour_length(tour, dist, roundtrip),
+        initial_distance=initial,
+        improvements=improvements,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        converged=converged,
+    )
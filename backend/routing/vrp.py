@@ -0,0 +1,336 @@
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from dotenv import load_dotenv
+
+from routing.solver import estimated_road_matrix, estimated_duration
+
+load_dotenv()
+
+# --- Vehicle routing config (override in .env) ---
+VRP_TIME_BUDGET_MS = float(os.getenv("VRP_TIME_BUDGET_MS", "2000"))
+VRP_MAX_TIME_BUDGET_MS = float(os.getenv("VRP_MAX_TIME_BUDGET_MS", "10000"))
+VRP_DEFAULT_CAPACITY = int(os.getenv("VRP_DEFAULT_CAPACITY", "40"))         # items per van
+VRP_SERVICE_MINUTES = float(os.getenv("VRP_SERVICE_MINUTES", "8"))          # time spent at each stop
+VRP_SHIFT_START = os.getenv("VRP_SHIFT_START", "08:30")
+VRP_SHIFT_END = os.getenv("VRP_SHIFT_END", "20:30")
+
+# Timeslots the dropper app books (ScanItem.jsx stores the first word)
+TIMESLOT_WINDOWS = {
+    "morning": (9, 12),
+    "afternoon": (12, 16),
+    "evening": (16, 20),
+}
+_HOUR_RANGE = re.compile(r"(\d{1,2})\s*(am|pm)?\s*-\s*(\d{1,2})\s*(am|pm)?", re.IGNORECASE)
+
+
+# ==========================================
+# 1. TIME HELPERS
+# ==========================================
+
+def clock_to_seconds(value: str) -> float:
+    hours, minutes = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+def seconds_to_clock(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+def _to_24h(hour: int, meridiem: Optional[str]) -> int:
+    if meridiem and meridiem.lower() == "pm" and hour < 12:
+        return hour + 12
+    if meridiem and meridiem.lower() == "am" and hour == 12:
+        return 0
+    return hour
+
+
+def timeslot_window(timeslot: Optional[str], shift: tuple) -> tuple:
+    """
+    'Morning' / 'Afternoon (12 PM - 4 PM)' / 'Morning (9-12)' -> (start s, end s).
+    Unknown or missing timeslots can be served any time during the shift.
+    """
+    if timeslot:
+        match = _HOUR_RANGE.search(timeslot)
+        if match:
+            start_h, start_m, end_h, end_m = match.groups()
+            return (_to_24h(int(start_h), start_m or end_m) * 3600,
+                    _to_24h(int(end_h), end_m) * 3600)
+        keyword = timeslot.strip().split(" ")[0].lower()
+        if keyword in TIMESLOT_WINDOWS:
+            start_h, end_h = TIMESLOT_WINDOWS[keyword]
+            return start_h * 3600, end_h * 3600
+    return shift
+
+
+# ==========================================
+# 2. PROBLEM / SOLUTION
+# ==========================================
+
+@dataclass
+class Vehicle:
+    latitude: float
+    longitude: float
+    capacity: int = VRP_DEFAULT_CAPACITY
+    name: Optional[str] = None
+
+
+@dataclass
+class Stop:
+    id: int
+    latitude: float
+    longitude: float
+    demand: int
+    window: tuple              # (earliest start s, latest start s) since midnight
+
+
+@dataclass
+class VehicleRoute:
+    vehicle: int
+    stops: list                # indices into the stops list, in visiting order
+    arrivals: list             # service start (s since midnight) per stop
+    load: int
+    travel_seconds: float
+    distance_m: float
+    end_seconds: float         # back at the start location
+
+
+@dataclass
+class VrpSolution:
+    routes: list
+    unassigned: list           # indices into the stops list
+    travel_seconds: float
+    initial_travel_seconds: float
+    lower_bound_seconds: float  # no plan serving the same stops can drive less
+    improvements: int
+    elapsed_ms: float
+    converged: bool            # False = stopped by the time budget
+
+
+# ==========================================
+# 3. SOLVER
+# ==========================================
+
+class _Planner:
+    """
+    Node layout: 0..V-1 are the vehicles' start points (each route starts
+    and ends at its own), V..V+n-1 are the stops.
+
+    Every route keeps, per position, the service start time `begin` and the
+    latest start `latest` that keeps the rest of the route on time, so an
+    insertion is checked in O(1) per position (push-forward check) and the
+    edges of all routes are evaluated together in one vectorised pass.
+    """
+
+    def __init__(self, vehicles: list, stops: list, travel: np.ndarray, shift: tuple, service_s: float):
+        self.V = len(vehicles)
+        self.vehicles = vehicles
+        self.stops = stops
+        self.travel = travel
+        self.shift_start, self.shift_end = shift
+
+        n = len(stops)
+        self.earliest = np.concatenate([np.full(self.V, self.shift_start), [s.window[0] for s in stops]])
+        self.latest_allowed = np.concatenate([np.full(self.V, self.shift_end), [s.window[1] for s in stops]])
+        self.service = np.concatenate([np.zeros(self.V), np.full(n, service_s)])
+        self.demand = np.concatenate([np.zeros(self.V, dtype=np.int64), [s.demand for s in stops]])
+        self.capacity = np.array([v.capacity for v in vehicles], dtype=np.int64)
+
+        self.routes = [[v, v] for v in range(self.V)]
+        self.loads = np.zeros(self.V, dtype=np.int64)
+        self.begin = [None] * self.V
+        self.latest = [None] * self.V
+        self._edges = [None] * self.V   # per route: (prev, next, departure from prev, latest start at next)
+        self._flat = None               # every route's edges side by side, rebuilt after a change
+        for r in range(self.V):
+            self._refresh(r)
+
+    # --- schedule bookkeeping ---
+    def _refresh(self, r: int):
+        seq = np.array(self.routes[r])
+        legs = self.travel[seq[:-1], seq[1:]]
+
+        begin = np.empty(len(seq))
+        begin[0] = self.shift_start
+        for i in range(1, len(seq)):
+            begin[i] = max(begin[i - 1] + self.service[seq[i - 1]] + legs[i - 1], self.earliest[seq[i]])
+
+        latest = np.empty(len(seq))
+        latest[-1] = self.shift_end
+        for i in range(len(seq) - 2, -1, -1):
+            latest[i] = min(self.latest_allowed[seq[i]], latest[i + 1] - self.service[seq[i]] - legs[i])
+
+        self.begin[r] = begin
+        self.latest[r] = latest
+        self._edges[r] = (seq[:-1], seq[1:], begin[:-1] + self.service[seq[:-1]], latest[1:])
+        self._flat = None
+
+    def _all_edges(self) -> tuple:
+        if self._flat is None:
+            prev, nxt, depart, latest_next = (np.concatenate(column) for column in zip(*self._edges))
+            sizes = [len(edges[0]) for edges in self._edges]
+            route_of = np.repeat(np.arange(self.V), sizes)
+            first_edge = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            self._flat = (prev, nxt, depart, latest_next, route_of, first_edge)
+        return self._flat
+
+    def route_cost(self, r: int) -> float:
+        seq = self.routes[r]
+        return float(self.travel[seq[:-1], seq[1:]].sum())
+
+    # --- insertion ---
+    def best_insertion(self, node: int) -> tuple:
+        """(added travel, route, position) of the cheapest feasible insertion, or None."""
+        prev, nxt, depart, latest_next, route_of, first_edge = self._all_edges()
+
+        start_here = np.maximum(depart + self.travel[prev, node], self.earliest[node])
+        arrive_next = start_here + self.service[node] + self.travel[node, nxt]
+        fits = self.loads + self.demand[node] <= self.capacity
+
+        feasible = (fits[route_of]
+                    & (start_here <= self.latest_allowed[node])
+                    & (arrive_next <= latest_next))
+        if not feasible.any():
+            return None
+        added = self.travel[prev, node] + self.travel[node, nxt] - self.travel[prev, nxt]
+        added = np.where(feasible, added, np.inf)
+        edge = int(added.argmin())
+        r = int(route_of[edge])
+        return float(added[edge]), r, edge - int(first_edge[r]) + 1
+
+    def insert(self, node: int, r: int, position: int):
+        self.routes[r].insert(position, node)
+        self.loads[r] += self.demand[node]
+        self._refresh(r)
+
+    def remove(self, node: int, r: int) -> float:
+        """Removes node from route r, returns the travel saved."""
+        seq = self.routes[r]
+        i = seq.index(node)
+        saved = self.travel[seq[i - 1], node] + self.travel[node, seq[i + 1]] - self.travel[seq[i - 1], seq[i + 1]]
+        del seq[i]
+        self.loads[r] -= self.demand[node]
+        self._refresh(r)
+        return float(saved)
+
+    # --- construction + local search ---
+    def construct(self) -> list:
+        """
+        Earliest deadline first; within a deadline, the stops farthest from
+        any start first (hardest to fit later). Returns unassigned nodes.
+        """
+        nodes = np.arange(self.V, self.V + len(self.stops))
+        remoteness = self.travel[:self.V][:, nodes].min(axis=0)
+        order = nodes[np.lexsort((-remoteness, self.latest_allowed[nodes]))]
+
+        unassigned = []
+        for node in order:
+            choice = self.best_insertion(int(node))
+            if choice is None:
+                unassigned.append(int(node))
+            else:
+                self.insert(int(node), choice[1], choice[2])
+        return unassigned
+
+    def relocate_pass(self, deadline: float) -> int:
+        """Take every stop out and put it back at its cheapest feasible place (any van)."""
+        moves = 0
+        for r in range(self.V):
+            for node in list(self.routes[r][1:-1]):
+                if time.perf_counter() > deadline:
+                    return moves
+                old_position = self.routes[r].index(node)
+                saved = self.remove(node, r)
+                choice = self.best_insertion(node)
+                if choice is not None and choice[0] < saved - 1e-6:
+                    self.insert(node, choice[1], choice[2])
+                    moves += 1
+                else:
+                    self.insert(node, r, old_position)
+        return moves
+
+    def total_cost(self) -> float:
+        return sum(self.route_cost(r) for r in range(self.V))
+
+    def lower_bound(self) -> float:
+        """
+        Every visited node is left once and entered once, so the cheapest
+        way out plus the cheapest way in, halved, summed over the used vans'
+        starts and the served stops, bounds any plan (windows ignored).
+        """
+        nodes = [seq[0] for seq in self.routes if len(seq) > 2]
+        nodes += [node for seq in self.routes for node in seq[1:-1]]
+        if not nodes:
+            return 0.0
+        sub = self.travel[np.ix_(nodes, nodes)].copy()
+        np.fill_diagonal(sub, np.inf)
+        return float((sub.min(axis=1) + sub.min(axis=0)).sum() / 2)
+
+
+def solve_vrp(vehicles: list, stops: list, travel: Optional[np.ndarray] = None,
+              distance: Optional[np.ndarray] = None, time_budget_ms: float = VRP_TIME_BUDGET_MS,
+              service_minutes: float = VRP_SERVICE_MINUTES) -> VrpSolution:
+    """
+    Multi-vehicle routing with capacities and time windows: parallel
+    cheapest insertion (earliest deadline first), then relocate moves
+    within and between vans until nothing improves or the time budget ends.
+
+    travel / distance are (V+n, V+n) matrices in seconds / metres with the
+    vehicles' start points first; both default to haversine estimates.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+
+    if distance is None or travel is None:
+        points = [(v.latitude, v.longitude) for v in vehicles] + [(s.latitude, s.longitude) for s in stops]
+        distance = estimated_road_matrix(points) if distance is None else distance
+        travel = estimated_duration(distance) if travel is None else travel
+
+    shift = (clock_to_seconds(VRP_SHIFT_START), clock_to_seconds(VRP_SHIFT_END))
+    planner = _Planner(vehicles, stops, np.asarray(travel, dtype=np.float64), shift, service_minutes * 60)
+
+    unassigned = planner.construct()
+    initial = planner.total_cost()
+
+    improvements = 0
+    converged = len(stops) <= 1
+    while not converged and time.perf_counter() < deadline:
+        moves = planner.relocate_pass(deadline)
+        # Room freed up by the moves may now fit a stop that didn't fit before
+        for node in list(unassigned):
+            choice = planner.best_insertion(node)
+            if choice is not None:
+                planner.insert(node, choice[1], choice[2])
+                unassigned.remove(node)
+                moves += 1
+        improvements += moves
+        converged = moves == 0
+
+    routes = []
+    for r in range(planner.V):
+        seq = planner.routes[r]
+        legs = list(zip(seq[:-1], seq[1:]))
+        routes.append(VehicleRoute(
+            vehicle=r,
+            stops=[node - planner.V for node in seq[1:-1]],
+            arrivals=[float(t) for t in planner.begin[r][1:-1]],
+            load=int(planner.loads[r]),
+            travel_seconds=planner.route_cost(r),
+            distance_m=float(sum(distance[a, b] for a, b in legs)),
+            end_seconds=float(planner.begin[r][-1]),
+        ))
+
+    return VrpSolution(
+        routes=routes,
+        unassigned=[node - planner.V for node in unassigned],
+        travel_seconds=planner.total_cost(),
+        initial_travel_seconds=initial,
+        lower_bound_seconds=planner.lower_bound(),
+        improvements=improvements,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        converged=converged,
+    )
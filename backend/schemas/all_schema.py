@@ -72,6 +72,16 @@ class ScanResponse(BaseModel):
     total_estimated_credits: int
     image_url: Optional[str] = None # <--- Added
 
+class ScanJobResponse(BaseModel):
+    """Async scan mode: poll this (or stream it) until status is done/failed"""
+    job_id: str
+    status: str # queued, running, done, failed
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[ScanResponse] = None
+    error: Optional[str] = None
+    error_code: Optional[int] = None
+
 # --- NEW: PICKUP / DROP SCHEMAS ---
 
 class PickupItemCreate(BaseModel):
@@ -141,6 +151,19 @@ class RoutePoint(BaseModel):
     status: PickupStatusEnum
     order: int  # Sequence in the route
 
+class DriverShift(BaseModel):
+    """One van for the day: where it starts/ends and how many items it carries"""
+    name: Optional[str] = None
+    latitude: float
+    longitude: float
+    capacity: int = Field(default=40, ge=1)
+
+class RoutePlanRequest(BaseModel):
+    """Plan the scheduled pickups of one day across several drivers"""
+    pickup_date: date
+    drivers: List[DriverShift] = Field(min_length=1, max_length=50)
+    time_budget_ms: Optional[int] = Field(default=None, ge=50)
+
 class InventoryUpdate(BaseModel):
     """Used by Collectors to update item status"""
     processing_status: str
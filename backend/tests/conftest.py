@@ -0,0 +1,182 @@
+"""
+Fixtures for the database-backed tests (query plans, query counts).
+
+They need a disposable Postgres + PostGIS database with the current schema,
+named in the environment (a DATABASE_URL that only lives in .env is ignored
+on purpose, so a developer's database is never used by accident). The
+compose file brings one up and runs the suite against it:
+
+    docker compose --profile test run --rm backend-tests
+
+Locally without it those tests skip; on CI (CI set, as GitHub Actions does)
+a missing DATABASE_URL fails the run instead, so the checks can't silently
+stop running. Each test seeds its own rows inside one transaction that is
+rolled back afterwards, so nothing is left behind.
+"""
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if os.environ.get("CI") and "DATABASE_URL" not in os.environ:
+    raise pytest.UsageError("DATABASE_URL must be set on CI: the query plan and query count tests need Postgres + PostGIS.")
+
+# Seeded pickups sit in a ~5 km square in Mumbai
+SEED_LAT, SEED_LNG = 19.05, 72.85
+
+
+# --- 1. SESSION (rolled back after every test) ---
+@pytest.fixture
+def db():
+    from sqlalchemy.orm import Session
+    from database.postgresConn import engine
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Routes call commit(): inside the test transaction those become savepoints
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+# --- 2. SEED DATA ---
+def make_world(db) -> SimpleNamespace:
+    """A collector, and a dropper with a profile (no pickups yet)."""
+    from models.all_model import User, UserRole, Profile
+
+    tag = uuid.uuid4().hex[:8]
+    collector = User(email=f"collector-{tag}@example.com", hashed_password="x",
+                     full_name="Test Collector", role=UserRole.collector)
+    dropper = User(email=f"dropper-{tag}@example.com", hashed_password="x",
+                   full_name=f"Test Dropper {tag}", role=UserRole.dropper)
+    db.add_all([collector, dropper])
+    db.flush()
+
+    profile = Profile(user_id=dropper.id, carbon_balance=0, co2_saved=0.0)
+    db.add(profile)
+    db.flush()
+    return SimpleNamespace(tag=tag, collector=collector, dropper=dropper, profile=profile, pickups=[])
+
+
+def add_pickups(db, world: SimpleNamespace, count: int, status=None) -> list:
+    """
+    `count` pickups for the world's dropper, each with two items, an
+    inventory log and an EARN transaction.
+    """
+    from models.all_model import (
+        Pickup, PickupItem, PickupStatus, ItemCondition, InventoryLog, InventoryStatus,
+        Transaction, TransactionType
+    )
+
+    pickups = []
+    for i in range(len(world.pickups), len(world.pickups) + count):
+        lat = SEED_LAT + (i * 37 % 97) / 2000
+        lng = SEED_LNG + (i * 53 % 89) / 2000
+        pickup = Pickup(
+            profile_id=world.profile.id,
+            status=status or PickupStatus.SCHEDULED,
+            pickup_date=date.today() + timedelta(days=i % 7),
+            timeslot="Morning (9-12)",
+            location=f"SRID=4326;POINT({lng} {lat})",
+            address_text=f"Test address {i}",
+        )
+        pickup.items = [
+            PickupItem(item_name="Laptop", detected_condition=ItemCondition.WORKING, credit_value=100),
+            PickupItem(item_name="Phone", detected_condition=ItemCondition.SCRAP, credit_value=20),
+        ]
+        pickups.append(pickup)
+    db.add_all(pickups)
+    db.flush()
+
+    for pickup in pickups:
+        db.add(InventoryLog(pickup_id=pickup.id, item_name="Laptop", category="Laptop",
+                            value=100, status=InventoryStatus.RECEIVED))
+        db.add(Transaction(profile_id=world.profile.id, amount=120,
+                           type=TransactionType.EARN, description=f"Pickup {pickup.id}"))
+    db.flush()
+
+    world.pickups.extend(pickups)
+    return pickups
+
+
+@pytest.fixture
+def world(db):
+    return make_world(db)
+
+
+@pytest.fixture
+def seed(db, world):
+    """seed(count, status=None): adds `count` pickups to `world`."""
+    return lambda count, status=None: add_pickups(db, world, count, status)
+
+
+# --- 3. STATEMENT CAPTURE ---
+@contextmanager
+def recorded_statements(db):
+    """
+    Every (statement, parameters) the session sends to Postgres while the
+    block runs, via a before_cursor_execute listener on its connection.
+    """
+    from sqlalchemy import event
+
+    connection = db.connection()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def record_statements(db):
+    """with record_statements() as statements: ..."""
+    return lambda: recorded_statements(db)
+
+
+class _NoRows:
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def scalar_one_or_none(self):
+        return None
+
+    def scalars(self):
+        return self
+
+
+class RecordingAsyncSession:
+    """
+    Stands in for the AsyncSession of an async route: keeps the statements
+    the route builds (to EXPLAIN them on the test connection) and answers
+    every one with no rows.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return _NoRows()
+
+
+@pytest.fixture
+def recording_session():
+    return RecordingAsyncSession()
@@ -0,0 +1,58 @@
+"""
+List routes must not go N+1: the number of SQL statements a call sends is
+counted with a before_cursor_execute listener, once with 1 seeded pickup and
+again with 50, and has to be exactly the route's fixed number both times.
+"""
+import os
+
+import pytest
+
+if "DATABASE_URL" not in os.environ:
+    pytest.skip("needs DATABASE_URL (disposable Postgres + PostGIS at alembic head)", allow_module_level=True)
+
+from fastapi import Response
+
+from router.collector_routes import get_pending_pickups
+from router.inventory_routes import get_live_inventory
+from router.pickup_routes import get_pickup_history
+from utils.pagination import PAGE_MAX_LIMIT
+
+ROWS = (1, 50)
+
+# name -> (call, statements it may send however many rows come back)
+ROUTES = {
+    # pickups page + one selectinload of their items
+    "pending": (lambda db, world: get_pending_pickups(
+        response=Response(), cursor=None, limit=PAGE_MAX_LIMIT, db=db, current_user=world.collector
+    ), 2),
+    # logs joined to pickup -> profile -> user in one statement
+    "inventory": (lambda db, world: get_live_inventory(
+        response=Response(), status="received", search="", cursor=None, limit=PAGE_MAX_LIMIT,
+        db=db, current_user=world.collector
+    ), 1),
+    # the dropper's profile + pickups joined to their items
+    "history": (lambda db, world: get_pickup_history(
+        response=Response(), cursor=None, limit=PAGE_MAX_LIMIT, db=db, current_user=world.dropper
+    ), 2),
+}
+
+
+def count_statements(db, world, record_statements, route) -> tuple:
+    # Start cold: the seeded objects (and their items) must not be served from the identity map
+    db.expire_all()
+    db.refresh(world.collector)
+    db.refresh(world.dropper)
+
+    with record_statements() as statements:
+        rows = route(db, world)
+    return len(rows), len(statements)
+
+
+@pytest.mark.parametrize("name", list(ROUTES))
+def test_statement_count_is_constant(name, db, world, seed, record_statements):
+    route, expected = ROUTES[name]
+    for total in ROWS:
+        seed(total - len(world.pickups))
+        rows, statements = count_statements(db, world, record_statements, route)
+        assert rows >= total
+        assert statements == expected, f"{name}: {statements} statements for {total} pickup(s), expected {expected}"
@@ -0,0 +1,156 @@
+"""
+The hot routes must be able to run off their indexes: each test calls the
+route code itself, captures the SQL it sends and EXPLAINs it with
+enable_seqscan off. Postgres then picks any usable index, so a Seq Scan
+node on the route's table means no index covers the query any more.
+"""
+import os
+import asyncio
+
+import pytest
+
+if "DATABASE_URL" not in os.environ:
+    pytest.skip("needs DATABASE_URL (disposable Postgres + PostGIS at alembic head)", allow_module_level=True)
+
+from fastapi import Response
+from sqlalchemy import text
+
+from models.all_model import Certificate, CertificateType, PickupStatus
+from schemas.all_schema import CertificateCreate, PickupStatusEnum
+from router.collector_routes import (
+    get_pending_pickups, get_certificates, issue_certificate, get_pickup_clusters, fetch_route_candidates
+)
+from router.inventory_routes import get_live_inventory
+from router.pickup_routes import get_pickup_history
+from router.wallet_routes import get_wallet_history
+from utils.pagination import NEXT_CURSOR_HEADER, PAGE_DEFAULT_LIMIT
+
+SEEDED_PICKUPS = 200
+TABLES = ("users", "profiles", "pickups", "pickup_items", "inventory_logs", "certificates", "transactions")
+
+
+# --- 1. PLAN HELPERS ---
+def seq_scanned_tables(plan: dict) -> set:
+    found = set()
+    if plan.get("Node Type") == "Seq Scan":
+        found.add(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found |= seq_scanned_tables(child)
+    return found
+
+
+def explain_recorded(db, statement: str, parameters) -> dict:
+    """EXPLAIN a statement exactly as the route sent it (same SQL, same bound values)."""
+    # psycopg2 hands the json column back already parsed
+    return db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+
+
+def explain_built(db, statement) -> dict:
+    """EXPLAIN a statement an async route built (rendered with its values inlined)."""
+    sql = str(statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    return db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql).scalar()[0]["Plan"]
+
+
+def assert_no_seq_scan(plans: list, tables: set):
+    assert plans, "the route sent no statements"
+    scanned = set().union(*(seq_scanned_tables(plan) for plan in plans))
+    assert not scanned & tables, f"sequential scan on {sorted(scanned & tables)}"
+
+
+# --- 2. FIXTURES ---
+@pytest.fixture
+def hot(db, world, seed):
+    """
+    SEEDED_PICKUPS scheduled pickups plus a collected one with a certificate
+    and one still waiting for its certificate; analyzed, seq scans off.
+    """
+    seed(SEEDED_PICKUPS)
+    certified, uncertified = seed(2, status=PickupStatus.COLLECTED)
+    db.add(Certificate(unique_code=f"CERT-{world.tag}", pickup_id=certified.id,
+                       recipient_name=world.dropper.full_name, cert_type=CertificateType.INDIVIDUAL,
+                       carbon_offset_snapshot=12.0, items_count_snapshot=2))
+    db.flush()
+
+    for table in TABLES:
+        db.execute(text(f"ANALYZE {table}"))
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+
+    world.uncertified = uncertified
+    return world
+
+
+def run_recorded(db, record_statements, call) -> list:
+    with record_statements() as statements:
+        call()
+    return [explain_recorded(db, statement, parameters) for statement, parameters in statements]
+
+
+# --- 3. SYNC ROUTES (statements captured from the connection) ---
+def test_pending_pickups(db, hot, record_statements):
+    plans = run_recorded(db, record_statements, lambda: get_pending_pickups(
+        response=Response(), cursor=None, limit=PAGE_DEFAULT_LIMIT, db=db, current_user=hot.collector
+    ))
+    assert_no_seq_scan(plans, {"pickups", "pickup_items"})
+
+
+def test_pickup_history(db, hot, record_statements):
+    plans = run_recorded(db, record_statements, lambda: get_pickup_history(
+        response=Response(), cursor=None, limit=10, db=db, current_user=hot.dropper
+    ))
+    assert_no_seq_scan(plans, {"pickups", "pickup_items"})
+
+
+def test_wallet_history_pages(db, hot, record_statements):
+    first_page = Response()
+    get_wallet_history(response=first_page, cursor=None, limit=5, db=db, current_user=hot.dropper)
+    cursor = first_page.headers[NEXT_CURSOR_HEADER]
+
+    # Keyset page: WHERE profile_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at, id
+    plans = run_recorded(db, record_statements, lambda: get_wallet_history(
+        response=Response(), cursor=cursor, limit=5, db=db, current_user=hot.dropper
+    ))
+    assert_no_seq_scan(plans, {"transactions"})
+
+
+def test_inventory_by_status(db, hot, record_statements):
+    plans = run_recorded(db, record_statements, lambda: get_live_inventory(
+        response=Response(), status="received", search="", cursor=None, limit=None,
+        db=db, current_user=hot.collector
+    ))
+    assert_no_seq_scan(plans, {"inventory_logs"})
+
+
+def test_certificate_search(db, hot, record_statements):
+    plans = run_recorded(db, record_statements, lambda: get_certificates(
+        response=Response(), search=hot.dropper.full_name, type_filter="all", cursor=None, limit=None,
+        db=db, current_user=hot.collector
+    ))
+    assert_no_seq_scan(plans, {"certificates"})
+
+
+def test_issue_certificate(db, hot, record_statements):
+    payload = CertificateCreate(pickup_id=hot.uncertified.id, cert_type="individual")
+    plans = run_recorded(db, record_statements, lambda: issue_certificate(
+        payload=payload, db=db, current_user=hot.collector
+    ))
+    assert_no_seq_scan(plans, {"certificates", "pickup_items"})
+
+
+# --- 4. ASYNC ROUTES (statements built by the route, EXPLAINed here) ---
+def test_stops_within_radius(db, hot, recording_session):
+    asyncio.run(fetch_route_candidates(recording_session, 19.06, 72.86, 2, [], [], None))
+    plans = [explain_built(db, statement) for statement in recording_session.statements]
+    assert_no_seq_scan(plans, {"pickups"})
+
+
+def test_geohash_cluster_drilldown(db, hot, recording_session):
+    prefix = db.execute(
+        text("SELECT left(geohash, 6) FROM pickups WHERE id = :id"), {"id": hot.pickups[0].id}
+    ).scalar()
+    asyncio.run(get_pickup_clusters(
+        zoom=14, pickup_status=PickupStatusEnum.SCHEDULED, pickup_date=None, prefix=prefix,
+        min_lat=None, min_lng=None, max_lat=None, max_lng=None,
+        db=recording_session, current_user=hot.collector
+    ))
+    plans = [explain_built(db, statement) for statement in recording_session.statements]
+    assert_no_seq_scan(plans, {"pickups", "pickup_items"})
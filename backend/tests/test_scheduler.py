@@ -0,0 +1,69 @@
+"""
+Micro-batching with the local backend: a scan PIL can't decode is rejected
+on its own, and every other scan batched with it still gets detections.
+The ONNX session is replaced by a stub and the process pool by threads, so
+this runs without the model file.
+"""
+import io
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ml_engine import onnx_worker
+from ml_engine.backends import LocalOnnxBackend, InferenceRejected
+from ml_engine.scheduler import InferenceScheduler
+
+
+class StubSession:
+    """One confident 'laptop' (COCO 73) per image, boxed in the middle."""
+
+    def run(self, outputs, feeds):
+        batch = feeds["pixel_values"].shape[0]
+        logits = np.full((batch, 1, 92), -10.0, dtype=np.float32)
+        logits[:, 0, 73] = 10.0
+        boxes = np.tile(np.array([0.5, 0.5, 0.2, 0.2], dtype=np.float32), (batch, 1, 1))
+        return [logits, boxes]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(onnx_worker, "_session", StubSession())
+    monkeypatch.setattr(onnx_worker, "_input_name", "pixel_values")
+    monkeypatch.setattr(onnx_worker, "_has_mask", True)
+
+    backend = LocalOnnxBackend()
+    backend.pool = ThreadPoolExecutor(max_workers=1)
+    yield backend
+    backend.pool.shutdown()
+
+
+def jpeg(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "gray").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_unreadable_image_is_rejected_alone(backend):
+    scans = [jpeg(64, 48), b"not an image", jpeg(32, 32)]
+
+    async def run():
+        # One window wide enough for all three scans to land in the same batch
+        scheduler = InferenceScheduler(backend, max_batch_size=len(scans), max_wait_ms=1000)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(scheduler.submit(scan) for scan in scans), return_exceptions=True),
+                timeout=5,
+            )
+        finally:
+            await scheduler.shutdown()
+        return results, scheduler.batches
+
+    results, batches = asyncio.run(run())
+
+    assert batches == 1
+    assert isinstance(results[1], InferenceRejected)
+    for detections in (results[0], results[2]):
+        assert [d["label"] for d in detections] == ["laptop"]
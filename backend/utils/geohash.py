@@ -0,0 +1,30 @@
+# backend/utils/geohash.py
+import os
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+GEOHASH_PRECISION = 12                                                  # stored on pickups (~4 cm cells)
+CLUSTER_MAX_PRECISION = int(os.getenv("CLUSTER_MAX_PRECISION", "8"))    # ~38 m cells: below that, show pins
+CLUSTER_MAX_CELLS = int(os.getenv("CLUSTER_MAX_CELLS", "500"))
+CLUSTER_IDS_MAX = int(os.getenv("CLUSTER_IDS_MAX", "100"))              # pickup ids returned per cluster
+
+BASE32 = set("0123456789bcdefghjkmnpqrstuvwxyz")
+
+
+def zoom_to_precision(zoom: int) -> int:
+    """
+    Web-map zoom -> geohash prefix length giving ~4 cells across a 256 px
+    tile: a tile spans 360 / 2^z degrees, a precision-p cell 360 / 2^(5p/2).
+    """
+    return max(1, min(CLUSTER_MAX_PRECISION, round(2 * (zoom + 2) / 5)))
+
+
+def clean_prefix(prefix: str) -> str:
+    """Lower-cased geohash prefix, 400 if it isn't one."""
+    prefix = prefix.strip().lower()
+    if len(prefix) > GEOHASH_PRECISION or not set(prefix) <= BASE32:
+        raise HTTPException(status_code=400, detail=f"Invalid geohash prefix '{prefix}'.")
+    return prefix
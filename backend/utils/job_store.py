@@ -0,0 +1,165 @@
+# backend/utils/job_store.py
+import os
+import time
+import uuid
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+SCAN_JOB_WORKERS = int(os.getenv("SCAN_JOB_WORKERS", "4"))
+SCAN_JOB_MAX_PENDING = int(os.getenv("SCAN_JOB_MAX_PENDING", "100"))
+SCAN_JOB_TTL = int(os.getenv("SCAN_JOB_TTL", "600"))  # Seconds a finished job stays readable
+
+TERMINAL_STATES = {"done", "failed"}
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+class Job:
+    def __init__(self, user_id: int, work):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.work = work # async callable, dropped once the job finishes
+        self.status = "queued"
+        self.result = None
+        self.error: Optional[str] = None
+        self.error_code: Optional[int] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    def _set(self, status: str):
+        self.status = status
+        # Wake every listener, then arm a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "error_code": self.error_code,
+        }
+
+
+class JobStore:
+    """
+    In-process job table with a bounded worker pool and expiry.
+    Jobs live in this worker's memory only, so clients must poll the same
+    instance (fine with one uvicorn worker or sticky sessions).
+    """
+
+    def __init__(self, workers: int = SCAN_JOB_WORKERS, max_pending: int = SCAN_JOB_MAX_PENDING,
+                 ttl: int = SCAN_JOB_TTL):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+
+        self.jobs = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+        # Counters for the metrics endpoint
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    # --- LIFECYCLE ---
+    async def startup(self):
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- PUBLIC API ---
+    def submit(self, user_id: int, work) -> Job:
+        self._purge()
+        if self.queue is None:
+            raise JobQueueFull("Scan job workers are not running")
+
+        job = Job(user_id, work)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull("Too many scans in progress, please retry shortly")
+
+        self.jobs[job.id] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self.jobs.get(job_id)
+
+    async def wait_for_change(self, job: Job, seen_status: str, timeout: float) -> bool:
+        """Returns True once the job is no longer in seen_status, False on timeout."""
+        if job.status != seen_status:
+            return True
+        try:
+            await asyncio.wait_for(job._changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_pending": self.max_pending,
+            "jobs_stored": len(self.jobs),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    # --- INTERNALS ---
+    def _purge(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items() if job.expires_at and job.expires_at <= now]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            job._set("running")
+            try:
+                job.result = await job.work()
+                self.completed += 1
+                status = "done"
+            except Exception as e:
+                # HTTPException carries a status code + detail, anything else is a 500
+                job.error = str(getattr(e, "detail", e))
+                job.error_code = getattr(e, "status_code", 500)
+                self.failed += 1
+                status = "failed"
+            finally:
+                job.work = None # Release the image bytes held by the closure
+                job.finished_at = datetime.now(timezone.utc)
+                job.expires_at = time.time() + self.ttl
+
+            job._set(status)
+
+
+# Shared instance for async scan jobs (started in the lifespan in main.py)
+scan_jobs = JobStore()
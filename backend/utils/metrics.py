@@ -0,0 +1,29 @@
+# backend/utils/metrics.py
+from collections import deque
+
+
+class LatencyWindow:
+    """
+    Keeps the last N samples (milliseconds) and reports percentiles.
+    Small and lock-free: only ever touched from the event loop.
+    """
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value_ms: float):
+        self.samples.append(value_ms)
+
+    def percentile(self, p: float):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return round(ordered[index], 1)
+
+    def summary(self, prefix: str) -> dict:
+        return {
+            f"{prefix}_p50_ms": self.percentile(0.50),
+            f"{prefix}_p95_ms": self.percentile(0.95),
+            f"{prefix}_p99_ms": self.percentile(0.99),
+        }
@@ -0,0 +1,75 @@
+# backend/utils/pagination.py
+import os
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "100"))   # page size when no limit is sent
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "500"))
+
+# Every list endpoint is paged (PAGE_DEFAULT_LIMIT rows unless `limit` says
+# otherwise, never more than PAGE_MAX_LIMIT). The body stays a plain JSON
+# array because the existing response_models and every frontend page consume
+# one; wrapping it would break all of them at once. The cursor for the next
+# page travels in this header instead (exposed through CORS in main.py).
+# Absent = last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """Opaque cursor -> one value per sort column. Anything malformed is a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of keys")
+        return [
+            datetime.fromisoformat(v) if col.type.python_type is datetime else col.type.python_type(v)
+            for v, col in zip(values, columns)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def keyset_page(query, columns: list, cursor: Optional[str], limit: int, descending: bool = True):
+    """
+    Applies keyset pagination to a Query ordered by `columns` (e.g.
+    (created_at, id) or (id,)): WHERE (cols) < (last seen) ORDER BY cols
+    LIMIT limit + 1. Cost is the same for page 1 and page 1000, unlike OFFSET.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    ordering = [c.desc() if descending else c.asc() for c in columns]
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    if cursor:
+        last = decode_cursor(cursor, columns)
+        bound = tuple_(*last) if len(columns) > 1 else last[0]
+        query = query.filter(key < bound if descending else key > bound)
+
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last_row = rows[-1]
+    return rows, encode_cursor([getattr(last_row, c.key) for c in columns])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,122 @@
+# backend/utils/phash.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "6"))        # Hamming bits out of 64
+PHASH_INDEX_MAX = int(os.getenv("PHASH_INDEX_MAX", "50000"))          # Entries kept per worker
+PHASH_ENABLED = os.getenv("PHASH_ENABLED", "true").lower() == "true"
+
+HASH_SIZE = 8
+SAMPLE_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so we don't need scipy for one 32x32 transform."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+_DCT = _dct_matrix(SAMPLE_SIZE)
+
+
+def perceptual_hash(img: Image.Image) -> int:
+    """
+    64-bit pHash: 32x32 greyscale -> 2D DCT -> compare the 8x8 lowest
+    frequencies to their median. Robust to re-compression, resizing and
+    small crops; changes a lot when the subject changes.
+    """
+    small = img.convert("L").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.float64)
+    coeffs = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+
+    # The DC term is overall brightness: leave it out of the median
+    median = np.median(coeffs.flatten()[1:])
+    bits = (coeffs > median).flatten()
+    return int(sum(1 << i for i, bit in enumerate(bits) if bit))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    Recent scan results keyed by perceptual hash, scoped per user so one
+    dropper never gets another dropper's photo back. Lookups are a
+    vectorised XOR + popcount over the user's hashes.
+    """
+
+    def __init__(self, max_distance: int = PHASH_MAX_DISTANCE, max_entries: int = PHASH_INDEX_MAX):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+
+        # (user_id, hash) -> value, oldest first
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+        # Counters for the report endpoint
+        self.lookups = 0
+        self.reuses = 0
+        self.distance_counts = {}
+
+    def find(self, user_id: int, phash: int) -> Optional[dict]:
+        with self._lock:
+            self.lookups += 1
+            hashes = self._by_user.get(user_id)
+            if not hashes:
+                return None
+
+            candidates = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            distances = np.bitwise_count(candidates ^ np.uint64(phash))
+            best = int(distances.argmin())
+            distance = int(distances[best])
+            if distance > self.max_distance:
+                return None
+
+            key = (user_id, int(candidates[best]))
+            self._entries.move_to_end(key)
+            self.reuses += 1
+            self.distance_counts[distance] = self.distance_counts.get(distance, 0) + 1
+            return self._entries[key]
+
+    def add(self, user_id: int, phash: int, value: dict):
+        with self._lock:
+            key = (user_id, phash)
+            if key not in self._entries:
+                self._by_user.setdefault(user_id, set()).add(phash)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                (old_user, old_hash), _ = self._entries.popitem(last=False)
+                user_hashes = self._by_user[old_user]
+                user_hashes.discard(old_hash)
+                if not user_hashes:
+                    del self._by_user[old_user]
+
+    def report(self) -> dict:
+        return {
+            "enabled": PHASH_ENABLED,
+            "max_distance": self.max_distance,
+            "entries": len(self._entries),
+            "users": len(self._by_user),
+            "lookups": self.lookups,
+            "reuses": self.reuses,
+            "reuse_rate": round(self.reuses / self.lookups, 3) if self.lookups else 0.0,
+            "reuse_distance_counts": dict(sorted(self.distance_counts.items())),
+        }
+
+
+# Shared instance imported by the scan route
+near_duplicates = NearDuplicateIndex()
@@ -0,0 +1,172 @@
+# backend/utils/scan_cache.py
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+SCAN_CACHE_TTL = int(os.getenv("SCAN_CACHE_TTL", "86400"))                    # 1 day
+SCAN_CACHE_MAX_BYTES = int(os.getenv("SCAN_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))  # 16 MB
+SCAN_CACHE_DIR = os.getenv("SCAN_CACHE_DIR")  # Leave empty to disable the disk tier
+
+
+def image_key(image_bytes, user_id: Optional[int] = None) -> str:
+    """
+    SHA-256 of the uploader + raw image bytes. Scoped per user: a cached
+    result carries the uploader's own storage URL.
+    """
+    digest = hashlib.sha256(f"{user_id}:".encode())
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class ScanResultCache:
+    """
+    Two-tier cache for scan results (formatted detections + uploaded URL).
+
+    Tier 1: in-memory LRU, evicted by TTL and by total payload size.
+    Tier 2: optional JSON files on disk, so results survive a restart.
+            Read and written in a worker thread, never on the event loop.
+    """
+
+    def __init__(self, ttl: int = SCAN_CACHE_TTL, max_bytes: int = SCAN_CACHE_MAX_BYTES,
+                 disk_dir: Optional[str] = SCAN_CACHE_DIR):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+
+        # key -> (expires_at, size_bytes, value)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Counters for the metrics endpoint
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # --- PUBLIC API ---
+    async def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+
+        # 1. Memory tier
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, _, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                self._drop(key)
+
+        # 2. Disk tier (promote back into memory on hit)
+        stored = await asyncio.to_thread(self._read_disk, key) if self.disk_dir else None
+        if stored and stored["expires_at"] > now:
+            with self._lock:
+                self.disk_hits += 1
+                self._put_memory(key, stored["value"], stored["expires_at"])
+            return stored["value"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, value: dict):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, value, expires_at)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "disk_tier": bool(self.disk_dir),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    # --- MEMORY TIER (call with lock held) ---
+    def _put_memory(self, key: str, value: dict, expires_at: float):
+        size = len(json.dumps(value))
+        if size > self.max_bytes:
+            return # Too big to ever fit, keep it on disk only
+
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (expires_at, size, value)
+        self._size += size
+
+        # Evict least recently used until we fit the byte budget
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    # --- DISK TIER ---
+    def _disk_path(self, key: str) -> str:
+        # Shard by prefix so one folder doesn't collect millions of files
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Scan cache read error ({key[:12]}): {e}")
+            return None
+
+        if stored.get("expires_at", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return stored
+
+    def _write_disk(self, key: str, value: dict, expires_at: float):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so a crash never leaves half a JSON behind
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Scan cache write error ({key[:12]}): {e}")
+
+
+# Shared instance imported by the scan route
+scan_cache = ScanResultCache()
@@ -0,0 +1,48 @@
+# backend/utils/search.py
+import os
+from sqlalchemy import or_, func
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+SEARCH_MIN_LENGTH = int(os.getenv("SEARCH_MIN_LENGTH", "3"))        # pg_trgm needs 3 chars to use the index
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "25"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+
+
+def normalize_search(term: str) -> str:
+    return " ".join(term.split())
+
+
+def is_searchable(term: str) -> bool:
+    """Shorter terms can't use the trigram index and would match almost everything."""
+    return len(term) >= SEARCH_MIN_LENGTH
+
+
+def search_limit(limit) -> int:
+    """Search results are ranked, not paged: a smaller cap than list pages."""
+    return min(limit or SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_trigram_search(query, term: str, columns: list, limit: int, tiebreak=()):
+    """
+    Substring match on any of `columns`, ranked by trigram word similarity.
+
+    ILIKE '%term%' is served by the GIN (gin_trgm_ops) indexes, so the match
+    stays an index scan; word_similarity() puts the closest names first.
+    """
+    pattern = f"%{_escape_like(term)}%"
+    rank = func.greatest(*[func.word_similarity(term, column) for column in columns]) \
+        if len(columns) > 1 else func.word_similarity(term, columns[0])
+
+    return (
+        query
+        .filter(or_(*[column.ilike(pattern, escape="\\") for column in columns]))
+        .order_by(rank.desc(), *tiebreak)
+        .limit(limit)
+    )
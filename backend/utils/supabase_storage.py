@@ -1,5 +1,6 @@
 import os
 import uuid
+import asyncio
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -41,4 +42,11 @@ def upload_file_to_supabase(file_bytes, file_name: str, content_type: str) -> st
 
     except Exception as e:
         print(f"Supabase Upload Error: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+async def upload_file_to_supabase_async(file_bytes, file_name: str, content_type: str) -> str:
+    """
+    Async wrapper for async routes. The Supabase client is blocking, so the
+    upload runs in a worker thread and the event loop stays free.
+    """
+    return await asyncio.to_thread(upload_file_to_supabase, file_bytes, file_name, content_type)
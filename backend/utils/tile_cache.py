@@ -0,0 +1,118 @@
+# backend/utils/tile_cache.py
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+TILE_CACHE_TTL = int(os.getenv("TILE_CACHE_TTL", "600"))                          # 10 min
+TILE_CACHE_MAX_BYTES = int(os.getenv("TILE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32 MB
+TILE_MIN_ZOOM = int(os.getenv("TILE_MIN_ZOOM", "8"))       # below this, use /clusters instead of points
+TILE_MAX_ZOOM = 22
+TILE_EXTENT = 4096                                          # MVT coordinate space per tile
+TILE_BUFFER = 64                                            # points this close to an edge go in both tiles
+
+
+def tile_pixel(lat: float, lng: float, z: int) -> tuple:
+    """Web Mercator position of a point in tile-extent units at zoom z."""
+    scale = (2 ** z) * TILE_EXTENT
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = (lng + 180.0) / 360.0 * scale
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * scale
+    return x, y
+
+
+def tiles_touching(lat: float, lng: float, z: int) -> list:
+    """(x, y) of every tile at zoom z whose buffered extent contains the point."""
+    px, py = tile_pixel(lat, lng, z)
+    last = 2 ** z - 1
+    xs = range(max(0, int((px - TILE_BUFFER) // TILE_EXTENT)), min(last, int((px + TILE_BUFFER) // TILE_EXTENT)) + 1)
+    ys = range(max(0, int((py - TILE_BUFFER) // TILE_EXTENT)), min(last, int((py + TILE_BUFFER) // TILE_EXTENT)) + 1)
+    return [(x, y) for x in xs for y in ys]
+
+
+class TileCache:
+    """
+    In-memory LRU of rendered MVT tiles keyed by (z, x, y, filters),
+    evicted by TTL and total bytes. A pickup that appears or changes status
+    drops only the tiles that can draw it (any filter), found from its
+    coordinates at each cached zoom level.
+    """
+
+    def __init__(self, ttl: int = TILE_CACHE_TTL, max_bytes: int = TILE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()   # key -> (expires_at, tile bytes)
+        self._by_tile = {}              # (z, x, y) -> {key, ...}
+        self._size = 0
+        self._lock = threading.Lock()   # complete/create_pickup invalidate from threadpool workers
+
+        # Counters for the metrics endpoint
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(z: int, x: int, y: int, *filters) -> tuple:
+        return (z, x, y) + tuple(filters)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, tile: bytes):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + self.ttl, tile)
+            self._by_tile.setdefault(key[:3], set()).add(key)
+            self._size += len(tile)
+            while self._size > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_point(self, lat: float, lng: float):
+        """A pickup at (lat, lng) appeared or changed status."""
+        with self._lock:
+            for z in {tile[0] for tile in self._by_tile}:
+                for x, y in tiles_touching(lat, lng, z):
+                    for key in list(self._by_tile.get((z, x, y), ())):
+                        self._drop(key)
+                        self.invalidations += 1
+
+    def _drop(self, key: tuple):
+        _, tile = self._entries.pop(key)
+        self._size -= len(tile)
+        keys = self._by_tile.get(key[:3])
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._by_tile[key[:3]]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "tiles_cached": len(self._entries),
+            "bytes_cached": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Shared instance: the tile endpoint fills it, pickup status changes invalidate it
+tile_cache = TileCache()
@@ -0,0 +1,157 @@
+# backend/utils/upload_limits.py
+import os
+import io
+import json
+import mmap
+from fastapi import HTTPException, UploadFile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Config (override in .env) ---
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(15 * 1024 * 1024)))           # 15 MB per request
+UPLOAD_LIMITED_PATHS = ("/api/pickups/scan",)
+
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, max_bytes: int = UPLOAD_MAX_BYTES):
+        super().__init__(
+            status_code=413,
+            detail=f"Upload too large. Maximum size is {max_bytes / (1024 * 1024):.1f} MB."
+        )
+
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI middleware that caps request bodies on image endpoints.
+    1. Rejects straight away if Content-Length is over the limit.
+    2. Otherwise counts bytes as they stream in and aborts the moment the
+       limit is crossed (chunked uploads, lying clients), before the
+       multipart parser has buffered the rest.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES, path_prefixes: tuple = UPLOAD_LIMITED_PATHS):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http"
+                or scope["method"] not in ("POST", "PUT")
+                or not scope["path"].startswith(self.path_prefixes)):
+            return await self.app(scope, receive, send)
+
+        # 1. Early rejection on the declared size
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                return await self._reject(send, 400, "Invalid Content-Length header.")
+            if declared > self.max_bytes:
+                return await self._reject(send, 413, UploadTooLarge(self.max_bytes).detail)
+
+        # 2. Enforce while streaming
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise UploadTooLarge(self.max_bytes)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except UploadTooLarge as e:
+            # Normally FastAPI turns this into a 413 itself; this covers reads outside a route
+            if not response_started:
+                await self._reject(send, 413, e.detail)
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a memoryview. Lets Pillow decode the
+    upload without io.BytesIO making another full copy of it.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        chunk = self._view[self._pos:self._pos + len(target)]
+        target[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, min(self._pos, len(self._view)))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def _spooled_buffer(spooled) -> memoryview:
+    """
+    The bytes Starlette already spooled, without copying them: a
+    SpooledTemporaryFile holds a BytesIO (whose getvalue() hands over its
+    internal buffer in CPython) until it rolls over to a temp file, which is
+    mapped read-only instead. Both outlive the UploadFile being closed.
+    """
+    raw = getattr(spooled, "_file", spooled)
+    if isinstance(raw, io.BytesIO):
+        return memoryview(raw.getvalue())
+
+    spooled.flush()
+    if os.fstat(raw.fileno()).st_size == 0:
+        return memoryview(b"")
+    return memoryview(mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+async def read_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> memoryview:
+    """
+    Returns a read-only view of the upload Starlette spooled (memory below
+    1 MB, a temp file above), enforcing max_bytes. Hashing, decoding and
+    the fallback upload all share it; no second copy is made.
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, io.SEEK_END)
+        size = file.file.tell()
+    if size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    return _spooled_buffer(file.file)[:size]